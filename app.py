@@ -1,18 +1,30 @@
 import streamlit as st
-import pandas as pd
-import base64
-from io import BytesIO
+import uuid
 from datetime import datetime
 
-from utils.file_utils import (
-    load_excel_file, 
-    validate_top50_file, 
-    validate_translator_file, 
-    validate_ool_file,
-    create_downloadable_excel,
-    create_downloadable_summary
+from utils.file_utils import check_header, HIGHLIGHT_RULES
+from utils.data_processing import MULTI_CODICE_POLICIES
+from utils.fuzzy import FUZZY_MAX_DISTANCE
+from utils.chunked import CHUNKED_MIN_BYTES
+from utils.cache import ResultCache, file_hash
+from utils.explorer import ResultExplorer
+from utils.instrumentation import STAGE_LABELS
+from utils.jobs import (
+    JobManager,
+    JobQueueFull,
+    FINISHED_STATUSES,
+    STATUS_WARTEND,
+    STATUS_LAEUFT,
+    STATUS_FEHLER,
+    STATUS_ABGEBROCHEN,
+    estimate_result_bytes,
+    is_valid_job_id
 )
-from utils.data_processing import process_all_data
+
+# Tabellen des Ergebnis-Explorers und wählbare Seitengrößen
+EXPLORER_TABLES = {'ool': "Markierte Open Order List", 'zusammenfassung': "Zusammenfassung"}
+EXPLORER_PAGE_SIZES = [25, 50, 100, 250]
+EXPLORER_ALLE = "Alle"
 
 # --- CSS Styling ---
 def local_css():
@@ -154,17 +166,14 @@ def local_css():
         }
         
         /* Download buttons */
-        .download-button {
-            display: inline-block;
+        .stDownloadButton > button {
             background-color: var(--primary);
-            color: white !important;
-            padding: 0.6rem 1.2rem;
-            text-decoration: none;
+            color: white;
+            border: none;
             border-radius: 5px;
-            margin-top: 0.5rem;
             transition: all 0.3s;
         }
-        .download-button:hover {
+        .stDownloadButton > button:hover {
             background-color: var(--secondary);
             color: white;
         }
@@ -180,6 +189,133 @@ def get_corporate_header():
     </div>
     """
 
+@st.cache_resource
+def get_job_manager():
+    # Ein Worker-Pool für alle Sitzungen des Servers
+    return JobManager()
+
+@st.cache_resource
+def get_result_cache():
+    # Fertige Ergebnisse für alle Sitzungen des Servers, z.B. wenn mehrere Kollegen dieselben Dateien hochladen
+    return ResultCache()
+
+def upload_hash(upload):
+    # Inhalts-Hash je Upload nur einmal berechnen (file_id ändert sich bei jedem neuen Upload)
+    hashes = st.session_state.setdefault('upload_hashes', {})
+    upload_id = getattr(upload, 'file_id', None) or id(upload)
+    if upload_id not in hashes:
+        hashes[upload_id] = file_hash(upload)
+    return hashes[upload_id]
+
+@st.fragment(run_every=1)
+def show_job_progress(job_id):
+    # Fortschritt des Auftrags jede Sekunde abfragen, ohne die ganze Seite neu aufzubauen
+    job_manager = get_job_manager()
+    status = job_manager.status(job_id)
+    if status is None or status['status'] in FINISHED_STATUSES:
+        # Ergebnis mit einem vollständigen Rerun anzeigen
+        st.rerun()
+    
+    if status['status'] == STATUS_WARTEND:
+        label = "Warten auf einen freien Verarbeitungsplatz..."
+    elif status.get('detail'):
+        label = f"{status['detail']}..."
+    elif status['stage'] is None:
+        label = "Verarbeitung wird gestartet..."
+    else:
+        label = f"{STAGE_LABELS[status['stage']]}..."
+    
+    st.progress(int(status['fraction'] * 100))
+    st.info(label)
+    
+    if st.button("Abbrechen"):
+        job_manager.cancel(job_id)
+        st.rerun()
+
+def ool_column_config():
+    # Anzeige der Spalten der erweiterten Open Order List
+    return {
+        "artikel no": "Artikelnummer",
+        "Abmessung": "Abmessung",
+        "Lagerbestand": st.column_config.NumberColumn(
+            "Lagerbestand",
+            format="%.2f"
+        ),
+        "Kundenauftraege": st.column_config.NumberColumn(
+            "Kundenaufträge",
+            format="%.2f"
+        ),
+        "Monatlicher Verbrauch": st.column_config.NumberColumn(
+            "Monatlicher Verbrauch",
+            format="%.2f"
+        ),
+        "Codice": "Codice"
+    }
+
+@st.cache_resource(max_entries=8)
+def get_result_explorer(job_id, table, _results):
+    # Indizes je Auftrag und Tabelle nur einmal aufbauen; die Daten bleiben auf dem Server
+    if table == 'ool':
+        return ResultExplorer.from_ool(_results['ool_df_extended'], _results['match_indices'], _results['fuzzy_indices'])
+    return ResultExplorer.from_summary(_results['summary_data'])
+
+@st.fragment
+def show_result_explorer(results):
+    # Filter, Sortierung und Blättern laden nur diesen Abschnitt neu; an den Browser geht nur die angezeigte Seite
+    tables = [table for table in EXPLORER_TABLES if table != 'ool' or results['ool_df_extended'] is not None]
+    table = st.radio("Tabelle", tables, format_func=EXPLORER_TABLES.get, horizontal=True, key='explorer_table')
+    if results['ool_df_extended'] is None:
+        st.caption("Bei blockweiser Verarbeitung liegt die vollständige Open Order List nur in der Ergebnisdatei vor.")
+    explorer = get_result_explorer(results['job'], table, results)
+    
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
+    with filter_col1:
+        codice = st.selectbox("Codice", [EXPLORER_ALLE] + explorer.codices(), key=f'explorer_codice_{table}')
+    with filter_col2:
+        artikel_prefix = st.text_input("Artikelnummer beginnt mit", key=f'explorer_artikel_{table}')
+    with filter_col3:
+        status = st.selectbox("Gefunden in OOL", [EXPLORER_ALLE] + explorer.statuses(), key=f'explorer_status_{table}')
+    
+    sort_col1, sort_col2, sort_col3 = st.columns(3)
+    with sort_col1:
+        sort_by = st.selectbox(
+            "Sortieren nach",
+            [None] + explorer.columns,
+            format_func=lambda column: "Reihenfolge der Datei" if column is None else str(column),
+            key=f'explorer_sort_{table}'
+        )
+    with sort_col2:
+        page_size = st.selectbox("Zeilen je Seite", EXPLORER_PAGE_SIZES, key='explorer_page_size')
+    with sort_col3:
+        descending = st.checkbox("Absteigend sortieren", key=f'explorer_descending_{table}')
+    
+    positions = explorer.query(
+        codice=None if codice == EXPLORER_ALLE else codice,
+        artikel_prefix=artikel_prefix.strip(),
+        status=None if status == EXPLORER_ALLE else status,
+        sort_by=sort_by,
+        descending=descending
+    )
+    if len(positions) == 0:
+        st.info("Keine Zeilen für diese Filter.")
+        return
+    
+    # Nach einer Filteränderung kann die gemerkte Seite nicht mehr existieren
+    pages = (len(positions) + page_size - 1) // page_size
+    page_key = f'explorer_page_{table}'
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = 1
+    page = st.number_input(f"Seite (von {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+    
+    st.dataframe(
+        explorer.page(positions, page, page_size),
+        use_container_width=True,
+        column_config=ool_column_config() if table == 'ool' else None
+    )
+    first = (page - 1) * page_size + 1
+    last = min(page * page_size, len(positions))
+    st.caption(f"Zeilen {first}–{last} von {len(positions)} gefilterten ({len(explorer)} insgesamt)")
+
 # Seitenkonfiguration
 st.set_page_config(
     page_title="Eberle Artikelnummern-Matching",
@@ -213,14 +349,14 @@ with main_container:
         st.markdown('<div class="caption">Eberle Italia</div>', unsafe_allow_html=True)
         top50_file = st.file_uploader("Top-50 Excel-Datei", type=["xlsx"], key="top50", label_visibility="collapsed")
         st.markdown('</div>', unsafe_allow_html=True)
-        
+    
     with col2:
         st.markdown('<div class="file-card">', unsafe_allow_html=True)
         st.markdown("<h3>Übersetzungsdatei</h3>", unsafe_allow_html=True)
         st.markdown('<div class="caption">JNEB-EBITA-ARTIKEL</div>', unsafe_allow_html=True)
         translator_file = st.file_uploader("Übersetzungsdatei", type=["xlsx"], key="translator", label_visibility="collapsed")
         st.markdown('</div>', unsafe_allow_html=True)
-        
+    
     with col3:
         st.markdown('<div class="file-card">', unsafe_allow_html=True)
         st.markdown("<h3>Open Order List</h3>", unsafe_allow_html=True)
@@ -231,161 +367,283 @@ with main_container:
     # Verarbeitungs-Button
     st.markdown("<h2>2. Datenverarbeitung</h2>", unsafe_allow_html=True)
     
+    incremental_mode = st.checkbox(
+        "Nur Änderungen seit dem letzten Lauf abgleichen",
+        help="Gleicht nur neue und geänderte Zeilen der Open Order List neu ab, sofern Top-50-Liste, Übersetzungsdatei und Einstellungen unverändert sind. Verglichen wird mit dem letzten Lauf dieser Sitzung für eine Open Order List mit demselben Dateinamen. Die Ergebnisse entsprechen einer vollständigen Verarbeitung."
+    )
+    
+    # Sehr große Open Order Lists standardmäßig blockweise verarbeiten
+    chunked_mode = st.checkbox(
+        "Speicherschonend in Blöcken verarbeiten (für sehr große Open Order Lists)",
+        value=ool_file is not None and ool_file.size >= CHUNKED_MIN_BYTES,
+        disabled=incremental_mode,
+        help="Liest, gleicht ab und exportiert die Open Order List blockweise, sodass der Speicherbedarf nicht mit der Dateigröße wächst. Nicht zusammen mit dem Abgleich nur der Änderungen möglich."
+    ) and not incremental_mode
+    
+    multi_codice_labels = {
+        'first': "Erster Codice (Reihenfolge der Top-50-Liste)",
+        'last': "Letzter Codice",
+        'all': "Alle Codices (Zeile je Codice wiederholen)"
+    }
+    multi_codice = st.selectbox(
+        "OOL-Zeilen, die von mehreren Codices gefunden werden",
+        MULTI_CODICE_POLICIES,
+        index=MULTI_CODICE_POLICIES.index('last'),
+        format_func=multi_codice_labels.get
+    )
+    
+    fuzzy_distance = 0
+    if st.checkbox("Unscharfer Abgleich (Tippfehler in der Artikelnummer)", help="Sucht für OOL-Zeilen ohne exakten Treffer übersetzte Artikelnummern mit wenigen abweichenden Zeichen. Diese Zeilen werden gelb markiert und erhalten eine Konfidenz."):
+        fuzzy_distance = st.number_input("Maximale Anzahl Tippfehler", min_value=1, max_value=3, value=FUZZY_MAX_DISTANCE)
+    
+    highlight_labels = {
+        None: "Zeilen einfärben",
+        'treffer': "Bedingte Formatierung nach Codice (kleinere Datei)",
+        'reichweite': "Bedingte Formatierung nach Reichweite (Lagerbestand / Monatlicher Verbrauch)"
+    }
+    highlight = st.selectbox(
+        "Hervorhebung in der markierten Open Order List",
+        [None] + list(HIGHLIGHT_RULES),
+        format_func=highlight_labels.get,
+        help="Mit bedingter Formatierung färbt Excel die gefundenen Zeilen anhand der Spalte Codice selbst ein. Bei der Reichweite: rot unter einem Monatsverbrauch, gelb unter drei, sonst grün."
+    )
+    
     process_button = st.button("Dateien verarbeiten", type="primary")
     
+    # Ergebnisse gehören zu genau dieser Kombination hochgeladener Dateien
+    uploads_key = None
+    if top50_file and translator_file and ool_file:
+        uploads_key = "-".join(upload_hash(upload) for upload in (top50_file, translator_file, ool_file))
+    
+    job_manager = get_job_manager()
+    result_cache = get_result_cache()
+    
     if process_button:
         # Prüfen, ob alle Dateien hochgeladen wurden
         if not top50_file or not translator_file or not ool_file:
             st.error("Bitte laden Sie alle drei Dateien hoch, bevor Sie fortfahren.")
         else:
-            # Zeige Fortschrittsanzeige
-            progress_container = st.container()
-            progress_bar = progress_container.progress(0)
-            status_text = progress_container.empty()
+            uploads = {'top50': top50_file, 'translator': translator_file, 'ool': ool_file}
             
-            # Dateien laden
-            status_text.info("Dateien werden geladen...")
-            progress_bar.progress(10)
+            # Inkrementelle Läufe hängen vom vorherigen Lauf ab und werden nicht zwischengespeichert
+            cache_key = None
+            if not incremental_mode:
+                cache_key = ResultCache.make_key(uploads_key, multi_codice, fuzzy_distance, chunked_mode, highlight)
+            cached_results = result_cache.get(cache_key) if cache_key else None
+            if cached_results is not None and job_manager.status(cached_results['job']) is None:
+                # Der Auftrag des Eintrags wurde inzwischen aufgeräumt: neu verarbeiten statt auf ihn zu verweisen
+                result_cache.discard(cache_key)
+                cached_results = None
             
-            try:
-                top50_df = load_excel_file(top50_file)
-                progress_bar.progress(20)
-                
-                translator_df = load_excel_file(translator_file)
-                progress_bar.progress(30)
-                
-                ool_df = load_excel_file(ool_file)
-                progress_bar.progress(40)
-                
-                # Validierung der Dateien
-                status_text.info("Dateien werden validiert...")
-                
-                if not validate_top50_file(top50_df):
-                    st.error("Die Top-50-Datei hat nicht das erwartete Format.")
-                    progress_bar.empty()
-                    status_text.empty()
-                elif not validate_translator_file(translator_df):
-                    st.error("Die Übersetzungsdatei hat nicht das erwartete Format.")
-                    progress_bar.empty()
-                    status_text.empty()
-                elif not validate_ool_file(ool_df):
-                    st.error("Die Open Order List hat nicht das erwartete Format.")
-                    progress_bar.empty()
-                    status_text.empty()
+            # Kopfzeilen vor dem vollständigen Einlesen prüfen, damit eine falsche Datei sofort auffällt
+            header_errors = []
+            if cached_results is None:
+                header_errors = [message for message in (check_header(upload.getvalue(), file_type) for file_type, upload in uploads.items()) if message]
+            
+            options = {
+                'uploads_key': uploads_key,
+                'cache_key': cache_key,
+                'hashes': {file_type: upload_hash(upload) for file_type, upload in uploads.items()},
+                'incremental': incremental_mode,
+                # Der Stand für den inkrementellen Abgleich gehört zu dieser Sitzung und dieser OOL-Quelle
+                'state_scope': ResultCache.make_key(st.session_state.setdefault('session_id', uuid.uuid4().hex), ool_file.name),
+                'chunked': chunked_mode,
+                'multi_codice': multi_codice,
+                'fuzzy_distance': fuzzy_distance,
+                'highlight': highlight
+            }
+            
+            if cached_results is not None:
+                # Identische Dateien und Einstellungen wurden bereits verarbeitet: Ergebnis sofort anzeigen
+                st.session_state['results'] = cached_results
+                st.session_state['result_cache_hit'] = cached_results['job']
+                st.query_params['job'] = cached_results['job']
+            elif header_errors:
+                for message in header_errors:
+                    st.error(message)
+            else:
+                try:
+                    # Die Verarbeitung läuft als Auftrag in einem Worker-Prozess
+                    job_id = job_manager.submit({file_type: upload.getvalue() for file_type, upload in uploads.items()}, options)
+                except JobQueueFull:
+                    st.error("Der Server ist ausgelastet. Bitte versuchen Sie es in einigen Minuten erneut.")
                 else:
-                    # Datenverarbeitung
-                    status_text.info("Daten werden verarbeitet...")
-                    progress_bar.progress(60)
-                    
-                    match_indices, summary_data, ool_df_extended = process_all_data(top50_df, translator_df, ool_df)
-                    
-                    progress_bar.progress(80)
-                    status_text.info("Ergebnisdateien werden erstellt...")
-                    
-                    # Erstelle herunterladbare Dateien
-                    ool_b64 = create_downloadable_excel(ool_df_extended, match_indices)
-                    summary_b64 = create_downloadable_summary(summary_data)
-                    
-                    progress_bar.progress(100)
-                    status_text.success("Verarbeitung abgeschlossen!")
-                    
-                    # Ergebnisse anzeigen
-                    st.markdown("<h2>3. Ergebnisse</h2>", unsafe_allow_html=True)
-                    
-                    # Statistik anzeigen
-                    st.markdown("<h3>Zusammenfassung</h3>", unsafe_allow_html=True)
-                    
-                    metric_col1, metric_col2, metric_col3 = st.columns(3)
-                    
-                    with metric_col1:
-                        codices_count = len({item['codice_full'] for item in summary_data})
-                        st.markdown(f"""
-                        <div class="compact-metric">
-                            <div class="metric-value">{codices_count}</div>
-                            <div class="metric-label">Verarbeitete Codices</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                    with metric_col2:
-                        artikel_count = len({item['artikelnummer'] for item in summary_data})
-                        st.markdown(f"""
-                        <div class="compact-metric">
-                            <div class="metric-value">{artikel_count}</div>
-                            <div class="metric-label">Gefundene Artikelnummern</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                    with metric_col3:
-                        mark_count = len(match_indices)
-                        st.markdown(f"""
-                        <div class="compact-metric">
-                            <div class="metric-value">{mark_count}</div>
-                            <div class="metric-label">Markierte Zeilen in OOL</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    # Download-Buttons
-                    st.markdown("<h3>Ergebnisdateien herunterladen</h3>", unsafe_allow_html=True)
-                    
-                    download_col1, download_col2 = st.columns(2)
-                    
-                    # Aktuelles Datum für Dateinamen
-                    current_date = datetime.now().strftime("%d.%m.%Y")
-                    
-                    with download_col1:
-                        ool_href = f'<a class="download-button" href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{ool_b64}" download="OOL_markiert_{current_date}.xlsx">Markierte Open Order List</a>'
-                        st.markdown(ool_href, unsafe_allow_html=True)
-                        
-                    with download_col2:
-                        summary_href = f'<a class="download-button" href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{summary_b64}" download="Zusammenfassung_{current_date}.xlsx">Zusammenfassungsdatei</a>'
-                        st.markdown(summary_href, unsafe_allow_html=True)
-                    
-                    # Vorschau der zusätzlichen Informationen
-                    if len(match_indices) > 0:
-                        st.markdown("<h3>Vorschau der zusätzlichen Informationen</h3>", unsafe_allow_html=True)
-                        
-                        preview_df = ool_df_extended.iloc[match_indices[:5] if len(match_indices) > 5 else match_indices]
-                        preview_cols = ['artikel no', 'Abmessung', 'Lagerbestand', 'Kundenauftraege', 'Monatlicher Verbrauch', 'Codice']
-                        preview_cols = [col for col in preview_cols if col in preview_df.columns]
-                        
-                        # Tabelle mit besserem Styling
-                        st.dataframe(
-                            preview_df[preview_cols],
-                            use_container_width=True,
-                            column_config={
-                                "artikel no": "Artikelnummer",
-                                "Abmessung": "Abmessung",
-                                "Lagerbestand": st.column_config.NumberColumn(
-                                    "Lagerbestand",
-                                    format="%.2f"
-                                ),
-                                "Kundenauftraege": st.column_config.NumberColumn(
-                                    "Kundenaufträge",
-                                    format="%.2f"
-                                ),
-                                "Monatlicher Verbrauch": st.column_config.NumberColumn(
-                                    "Monatlicher Verbrauch",
-                                    format="%.2f"
-                                ),
-                                "Codice": "Codice"
-                            }
-                        )
-                    else:
-                        st.info("Keine Übereinstimmungen gefunden.")
-                    
-                    # Toggle für erweiterte Informationen
-                    with st.expander("Weitere Informationen anzeigen"):
-                        st.write("Diese App hilft beim Abgleich von Artikelnummern zwischen verschiedenen ERP-Systemen.")
-                        st.write("""
-                        Das Ergebnis besteht aus zwei Excel-Dateien:
-                        1. **Markierte Open Order List**: Die OOL mit rot hervorgehobenen übereinstimmenden Zeilen und zusätzlichen Spalten für Lagerbestand, Kundenaufträge und monatlichen Verbrauch.
-                        2. **Zusammenfassungsdatei**: Eine Zusammenfassung aller verarbeiteten Codices, ihrer zugehörigen Artikelnummern und ob sie in der OOL gefunden wurden.
-                        """)
-                    
-            except Exception as e:
-                st.error(f"Bei der Verarbeitung ist ein Fehler aufgetreten: {str(e)}")
-                progress_bar.empty()
-                status_text.empty()
+                    # Die Auftrags-ID in der URL macht das Ergebnis auch nach einem Neuladen der Seite abrufbar
+                    st.query_params['job'] = job_id
+    
+    job_id = st.query_params.get('job')
+    if job_id and not is_valid_job_id(job_id):
+        # Keine von submit vergebene ID: wie "kein Auftrag" behandeln
+        del st.query_params['job']
+        job_id = None
+    job_status = job_manager.status(job_id) if job_id else None
+    
+    if job_id and job_status is None:
+        st.warning("Der Verarbeitungsauftrag wurde nicht gefunden (möglicherweise bereits gelöscht).")
+        del st.query_params['job']
+    elif job_status is not None and uploads_key is not None and job_status.get('key') != uploads_key:
+        # Eine Datei wurde geändert: Ergebnisse des alten Auftrags nicht mehr anzeigen
+        del st.query_params['job']
+        job_status = None
     
+    results = None
+    if job_status is not None:
+        if job_status['status'] in (STATUS_WARTEND, STATUS_LAEUFT):
+            show_job_progress(job_id)
+        elif job_status['status'] == STATUS_FEHLER:
+            st.error(job_status['message'])
+        elif job_status['status'] == STATUS_ABGEBROCHEN:
+            st.info("Die Verarbeitung wurde abgebrochen.")
+        else:
+            # Ergebnis nur einmal je Sitzung aus dem Auftragsverzeichnis lesen
+            results = st.session_state.get('results')
+            if results is None or results['job'] != job_id:
+                results = job_manager.result(job_id)
+                if results is not None:
+                    results['job'] = job_id
+                    if results['cache_key'] is not None:
+                        result_cache.put(results['cache_key'], results, estimate_result_bytes(results))
+                st.session_state['results'] = results
+            
+            if results is None:
+                st.warning("Das Ergebnis des Verarbeitungsauftrags ist nicht mehr vorhanden.")
+            else:
+                st.success("Verarbeitung abgeschlossen!")
+                if st.session_state.get('result_cache_hit') == job_id:
+                    st.caption("Ergebnis aus dem Server-Cache: dieselben Dateien wurden bereits mit denselben Einstellungen verarbeitet.")
+                for message in results['messages']:
+                    st.caption(message)
+    
+    # Ergebnisse des abgeschlossenen Auftrags anzeigen
+    if results is not None:
+        match_indices = results['match_indices']
+        summary_data = results['summary_data']
+        ool_df_extended = results['ool_df_extended']
+        fuzzy_indices = results['fuzzy_indices']
+        
+        # Ergebnisse anzeigen
+        st.markdown("<h2>3. Ergebnisse</h2>", unsafe_allow_html=True)
+        
+        # Statistik anzeigen
+        st.markdown("<h3>Zusammenfassung</h3>", unsafe_allow_html=True)
+        
+        metric_col1, metric_col2, metric_col3 = st.columns(3)
+        
+        with metric_col1:
+            codices_count = summary_data['codice_full'].nunique()
+            st.markdown(f"""
+            <div class="compact-metric">
+                <div class="metric-value">{codices_count}</div>
+                <div class="metric-label">Verarbeitete Codices</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with metric_col2:
+            artikel_count = summary_data['artikelnummer'].nunique()
+            st.markdown(f"""
+            <div class="compact-metric">
+                <div class="metric-value">{artikel_count}</div>
+                <div class="metric-label">Gefundene Artikelnummern</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with metric_col3:
+            mark_count = len(match_indices)
+            st.markdown(f"""
+            <div class="compact-metric">
+                <div class="metric-value">{mark_count}</div>
+                <div class="metric-label">Markierte Zeilen in OOL</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        if fuzzy_indices:
+            st.caption(f"Davon {len(fuzzy_indices)} Zeilen nur unscharf gefunden (gelb markiert, Spalte 'Konfidenz').")
+        
+        # Download-Buttons
+        st.markdown("<h3>Ergebnisdateien herunterladen</h3>", unsafe_allow_html=True)
+        
+        download_col1, download_col2 = st.columns(2)
+        
+        # Aktuelles Datum für Dateinamen
+        current_date = datetime.now().strftime("%d.%m.%Y")
+        
+        # Die Dateien entstehen erst beim Klick (im Auftragsverzeichnis gespeichert für weitere Downloads);
+        # on_click="ignore" verhindert einen unnötigen Rerun
+        xlsx_mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        
+        with download_col1:
+            st.download_button(
+                "Markierte Open Order List",
+                data=lambda: job_manager.output(job_id, 'ool', results),
+                file_name=f"OOL_markiert_{current_date}.xlsx",
+                mime=xlsx_mime,
+                on_click="ignore"
+            )
+        
+        with download_col2:
+            st.download_button(
+                "Zusammenfassungsdatei",
+                data=lambda: job_manager.output(job_id, 'zusammenfassung', results),
+                file_name=f"Zusammenfassung_{current_date}.xlsx",
+                mime=xlsx_mime,
+                on_click="ignore"
+            )
+        
+        # Vorschau der zusätzlichen Informationen
+        if len(match_indices) > 0:
+            st.markdown("<h3>Vorschau der zusätzlichen Informationen</h3>", unsafe_allow_html=True)
+            
+            # Zeilenindizes sind Labels; bei der Regel 'all' gehören mehrere Zeilen zu einem Label.
+            # Bei blockweiser Verarbeitung liefert der Auftrag nur diese Vorschauzeilen
+            if ool_df_extended is None:
+                preview_df = results['ool_preview']
+            else:
+                preview_df = ool_df_extended[ool_df_extended.index.isin(match_indices[:5])]
+            preview_cols = ['artikel no', 'Abmessung', 'Lagerbestand', 'Kundenauftraege', 'Monatlicher Verbrauch', 'Codice']
+            preview_cols = [col for col in preview_cols if col in preview_df.columns]
+            
+            # Tabelle mit besserem Styling
+            st.dataframe(
+                preview_df[preview_cols],
+                use_container_width=True,
+                column_config=ool_column_config()
+            )
+        else:
+            st.info("Keine Übereinstimmungen gefunden.")
+        
+        # Alle Ergebnisse seitenweise durchsuchen
+        st.markdown("<h3>Ergebnisse durchsuchen</h3>", unsafe_allow_html=True)
+        show_result_explorer(results)
+        
+        # Laufzeiten der Verarbeitungsschritte
+        with st.expander("Performance"):
+            st.dataframe(
+                results['metrics'].drop(columns=['stage']),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "seconds": st.column_config.NumberColumn("Dauer (s)", format="%.3f"),
+                    "rows": st.column_config.NumberColumn("Zeilen"),
+                    "peak_mb": st.column_config.NumberColumn("Spitzenspeicher (MB)", format="%.1f")
+                }
+            )
+            if not results['trace_memory']:
+                st.caption("Speichermessung ist deaktiviert (Umgebungsvariable EBERLE_TRACE_MEMORY=1 setzen).")
+            
+            cache_stats = result_cache.stats()
+            st.caption(
+                f"Ergebnis-Cache des Servers: {cache_stats['hits']} Treffer, {cache_stats['misses']} Fehlzugriffe, "
+                f"{cache_stats['evictions']} verdrängt, {cache_stats['entries']} Einträge ({cache_stats['bytes'] / (1024 * 1024):.1f} MB)"
+            )
+        
+        # Toggle für erweiterte Informationen
+        with st.expander("Weitere Informationen anzeigen"):
+            st.write("Diese App hilft beim Abgleich von Artikelnummern zwischen verschiedenen ERP-Systemen.")
+            st.write("""
+            Das Ergebnis besteht aus zwei Excel-Dateien:
+            1. **Markierte Open Order List**: Die OOL mit rot hervorgehobenen übereinstimmenden Zeilen und zusätzlichen Spalten für Lagerbestand, Kundenaufträge und monatlichen Verbrauch.
+            2. **Zusammenfassungsdatei**: Eine Zusammenfassung aller verarbeiteten Codices, ihrer zugehörigen Artikelnummern und ob sie in der OOL gefunden wurden.
+            """)
+
 # Footer
 st.markdown('<div class="footer">J.N. Eberle & Cie. GmbH © 2025</div>', unsafe_allow_html=True) 
\ No newline at end of file
@@ -1,25 +1,78 @@
 import subprocess 
 import os 
 import sys 
+import threading 
 import webbrowser 
 import time 
+import urllib.request 
+ 
+# Port des Streamlit-Servers und maximale Wartezeit beim Start (per Umgebungsvariable anpassbar) 
+PORT = int(os.environ.get("EBERLE_PORT", "8501")) 
+STARTUP_TIMEOUT = float(os.environ.get("EBERLE_STARTUP_TIMEOUT", "60")) 
+ 
+# Module, die der Server schon beim Start im Hintergrund lädt, damit die erste Seite nicht darauf wartet 
+PREWARM_MODULES = ["pandas", "openpyxl", "xlsxwriter", "utils.jobs"] 
+ 
+def prewarm_modules(): 
+    # Schwere Module importieren, während der Server startet und der Browser sich öffnet 
+    start = time.perf_counter() 
+    for name in PREWARM_MODULES: 
+        try: 
+            __import__(name) 
+        except ImportError as e: 
+            print(f"Vorladen von {name} fehlgeschlagen: {e}") 
+    print(f"Module vorgeladen ({time.perf_counter() - start:.2f} s)") 
+ 
+def serve(app_path): 
+    # Läuft im Server-Prozess: Module im Hintergrund vorladen, dann Streamlit starten 
+    threading.Thread(target=prewarm_modules, name="prewarm", daemon=True).start() 
+ 
+    from streamlit.web import cli as stcli 
+    sys.argv = ["streamlit", "run", app_path, "--server.headless", "true", "--server.port", str(PORT)] 
+    sys.exit(stcli.main()) 
+ 
+def wait_until_ready(process, url, timeout): 
+    # Health-Endpunkt abfragen, bis der Server antwortet; None bei Erfolg, sonst die Fehlermeldung 
+    deadline = time.perf_counter() + timeout 
+    while time.perf_counter() < deadline: 
+        if process.poll() is not None: 
+            return f"Der Streamlit-Server wurde unerwartet beendet (Exit-Code {process.returncode})." 
+        try: 
+            with urllib.request.urlopen(url, timeout=1) as response: 
+                if response.status == 200: 
+                    return None 
+        except OSError: 
+            pass 
+        time.sleep(0.1) 
+    return f"Der Streamlit-Server hat nach {timeout:g} s nicht geantwortet ({url}). Ausgabe oben prüfen oder EBERLE_STARTUP_TIMEOUT erhöhen." 
  
 def run_app(): 
     # Pfad zur app.py ermitteln 
     base_dir = os.path.dirname(os.path.abspath(__file__)) 
     app_path = os.path.join(base_dir, "app.py") 
     print(f"Starte App: {app_path}") 
+    start = time.perf_counter() 
  
-    # Starte Streamlit-Server 
-    cmd = [sys.executable, "-m", "streamlit", "run", app_path, "--server.headless", "true"] 
+    # Starte Streamlit-Server (dieses Skript im Server-Modus, damit Module vorgeladen werden) 
+    cmd = [sys.executable, os.path.abspath(__file__), "--serve"] 
     process = subprocess.Popen(cmd) 
+    started = time.perf_counter() 
  
-    # Warte kurz und öffne Browser 
+    # Warten, bis der Server bereit ist, und erst dann den Browser öffnen 
     print("Warte, bis der Server startet...") 
-    time.sleep(3) 
+    error = wait_until_ready(process, f"http://localhost:{PORT}/_stcore/health", STARTUP_TIMEOUT) 
+    if error is not None: 
+        print(f"Fehler: {error}") 
+        if process.poll() is None: 
+            process.terminate() 
+        sys.exit(1) 
+    ready = time.perf_counter() 
+ 
     print("Öffne Browser...") 
-    webbrowser.open("http://localhost:8501") 
+    webbrowser.open(f"http://localhost:{PORT}") 
+    opened = time.perf_counter() 
  
+    print(f"Startzeiten: Prozess {started - start:.2f} s, Server bereit {ready - start:.2f} s, Browser {opened - start:.2f} s") 
     print("App läuft. Schließen Sie die Konsole oder drücken Sie Strg+C, um die App zu beenden.") 
     # Warte auf Beendigung 
     try: 
@@ -29,4 +82,7 @@ def run_app():
         process.terminate() 
  
 if __name__ == "__main__": 
-    run_app() 
+    if "--serve" in sys.argv: 
+        serve(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")) 
+    else: 
+        run_app() 
@@ -0,0 +1,52 @@
+import io
+import re
+import zipfile
+
+import pandas as pd
+import pytest
+
+from utils.benchmark import generate_data
+
+def edge_case_data():
+    # Kleine Eingaben mit den Sonderfällen der Artikelnummern (führende 7, Text, fehlende Werte, Teilzeichenketten)
+    top50_df = pd.DataFrame({
+        'Codice': ['C1', 'C2#3', None, 'C3', 'C1#2'],
+        'Lagerbestand': [10.0, 0.0, 5.0, None, 7.0],
+        'Kundenauftraegen': [1.0, 2.0, 3.0, 4.0, 5.0],
+        'Montatlicher Verbrauch': [20.0, 1.5, 0.0, 2.0, 3.0]
+    })
+    translator_df = pd.DataFrame({f"Spalte {chr(65 + i)}": range(9) for i in range(17)})
+    translator_df['Spalte D'] = ['C1', 'C1', 'C1', 'C2', 'C2', 'C3', 'C3', 'C9', 'C2']
+    translator_df['Spalte Q'] = ['12345', '712', 'AB12', '0042', None, '99', '7777', '12345', '42.0']
+    ool_df = pd.DataFrame({
+        'artikel no': pd.array([712345, '12345', 'AB12X', 42, None, 7712, 99, '7777', 'nan', 1234], dtype=object),
+        'Abmessung': ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j'],
+        'Gesamtmenge': range(10),
+        'offene Menge': range(10, 20)
+    }, index=range(100, 110))
+    return top50_df, translator_df, ool_df
+
+@pytest.fixture(params=['synthetisch', 'sonderfaelle'])
+def inputs(request):
+    # Top-50-Liste, Übersetzungsdatei und Open Order List
+    if request.param == 'synthetisch':
+        return generate_data(12, 400, seed=1)
+    return edge_case_data()
+
+def to_xlsx(df: pd.DataFrame) -> bytes:
+    # DataFrame als Excel-Datei (ohne Index), wie sie hochgeladen wird
+    output = io.BytesIO()
+    df.to_excel(output, index=False)
+    return output.getvalue()
+
+def with_dimension(data: bytes, ref: str) -> bytes:
+    # Größenangabe des ersten Blatts ersetzen, wie sie manche Programme veraltet schreiben
+    source = zipfile.ZipFile(io.BytesIO(data))
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            content = source.read(item.filename)
+            if item.filename == 'xl/worksheets/sheet1.xml':
+                content = re.sub(rb'<dimension ref="[^"]*"/>', f'<dimension ref="{ref}"/>'.encode(), content)
+            target.writestr(item, content)
+    return output.getvalue()
@@ -0,0 +1,71 @@
+import os
+import pickle
+
+import pytest
+
+from utils.cache import CACHE_VERSION, ParsedFileCache, ResultCache, private_directory
+
+def test_put_and_get(tmp_path):
+    cache = ParsedFileCache(str(tmp_path / 'cache'))
+    cache.put('top50-abc', {'wert': 1})
+    
+    assert cache.get('top50-abc') == {'wert': 1}
+    assert cache.get('top50-fehlt') is None
+
+def test_entries_are_versioned(tmp_path):
+    cache = ParsedFileCache(str(tmp_path))
+    cache.put('eintrag', 1)
+    
+    assert os.listdir(tmp_path) == [f"v{CACHE_VERSION}-eintrag.pkl"]
+    
+    # Einträge ohne oder mit anderer Version werden nicht gelesen
+    with open(tmp_path / 'eintrag.pkl', 'wb') as f:
+        pickle.dump(2, f)
+    with open(tmp_path / f"v{CACHE_VERSION + 1}-anders.pkl", 'wb') as f:
+        pickle.dump(3, f)
+    assert cache.get('anders') is None
+
+@pytest.mark.parametrize('inhalt', [
+    b'kein pickle',
+    b'',
+    # Verweisen auf ein Modul bzw. eine Klasse, die es nicht (mehr) gibt
+    b'cutils.fehlt\nKlasse\n.',
+    b'cutils.cache\nGibtEsNicht\n.'
+])
+def test_unreadable_entries_are_misses(tmp_path, inhalt):
+    cache = ParsedFileCache(str(tmp_path))
+    with open(cache._path('kaputt'), 'wb') as f:
+        f.write(inhalt)
+    
+    assert cache.get('kaputt') is None
+
+@pytest.mark.skipif(os.name != 'posix', reason="Zugriffsrechte nur unter POSIX geprüft")
+def test_private_directory(tmp_path):
+    path = tmp_path / 'privat'
+    private_directory(str(path))
+    assert path.stat().st_mode & 0o777 == 0o700
+    
+    # Ein für andere beschreibbares eigenes Verzeichnis wird eingeschränkt
+    os.chmod(path, 0o777)
+    private_directory(str(path))
+    assert path.stat().st_mode & 0o777 == 0o700
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(max_bytes=10, ttl_seconds=60)
+    cache.put('a', 'A', 4)
+    cache.put('b', 'B', 4)
+    cache.get('a')
+    cache.put('c', 'C', 4)
+    
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A' and cache.get('c') == 'C'
+    assert cache.stats()['evictions'] == 1
+
+def test_result_cache_discard():
+    cache = ResultCache(max_bytes=10, ttl_seconds=60)
+    cache.put('a', 'A', 4)
+    cache.discard('a')
+    cache.discard('fehlt')
+    
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 0 and cache.stats()['evictions'] == 1
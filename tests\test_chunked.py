@@ -0,0 +1,49 @@
+import io
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from tests.conftest import to_xlsx, with_dimension
+from utils.chunked import process_ool_chunked
+from utils.data_processing import process_all_data
+from utils.file_utils import create_streaming_excel, iter_excel_chunks, load_excel_file
+from utils.fuzzy import fuzzy_row_indices
+
+def _cells(data):
+    worksheet = openpyxl.load_workbook(io.BytesIO(data)).worksheets[0]
+    return [[(cell.value, cell.fill.fgColor.rgb) for cell in row] for row in worksheet.iter_rows()]
+
+def test_chunks_ignore_stale_dimension():
+    df = pd.DataFrame({'artikel no': [str(1000 + i) for i in range(20)], 'a': range(20), 'b': range(20, 40), 'c': ['x'] * 20})
+    data = to_xlsx(df)
+    
+    chunks = list(iter_excel_chunks(with_dimension(data, 'A1:B5'), 'ool', 6))
+    
+    assert [len(chunk) for chunk in chunks] == [6, 6, 6, 2]
+    pd.testing.assert_frame_equal(pd.concat(chunks), load_excel_file(io.BytesIO(data), 'ool'), check_dtype=False)
+
+def test_empty_table_yields_one_empty_chunk():
+    chunks = list(iter_excel_chunks(to_xlsx(pd.DataFrame({'artikel no': []})), 'ool', 10))
+    
+    assert len(chunks) == 1 and chunks[0].shape == (0, 1)
+
+@pytest.mark.parametrize('multi_codice, fuzzy_distance, chunk_rows', [('last', 0, 7), ('all', 1, 50), ('first', 1, 13)])
+def test_chunked_equals_full_run(inputs, multi_codice, fuzzy_distance, chunk_rows):
+    top50_df, translator_df, ool_df = inputs
+    data = to_xlsx(ool_df)
+    
+    full_ool = load_excel_file(io.BytesIO(data), 'ool')
+    match_indices, summary, extended = process_all_data(top50_df, translator_df, full_ool, multi_codice=multi_codice, fuzzy_distance=fuzzy_distance)
+    expected = create_streaming_excel(extended, match_indices, fuzzy_indices=fuzzy_row_indices(extended))
+    
+    output = io.BytesIO()
+    chunk_indices, chunk_summary, chunk_fuzzy, _, rows = process_ool_chunked(
+        top50_df, translator_df, data, output, multi_codice=multi_codice, fuzzy_distance=fuzzy_distance, chunk_rows=chunk_rows
+    )
+    
+    assert rows == len(full_ool)
+    assert chunk_indices == list(match_indices)
+    assert chunk_fuzzy == list(fuzzy_row_indices(extended))
+    pd.testing.assert_frame_equal(chunk_summary, summary)
+    assert _cells(output.getvalue()) == _cells(expected)
@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+import pytest
+
+from tests.conftest import edge_case_data, to_xlsx
+from utils.benchmark import generate_data
+from utils.columnar import DICTIONARY_COLUMNS, ColumnarFileCache, load_columnar
+from utils.data_processing import process_all_data
+
+pytest.importorskip('pyarrow')
+
+def _as_loaded(df, file_type):
+    # Spalten aus DICTIONARY_COLUMNS kommen kategorial zurück
+    return df.assign(**{column: df[column].astype('category') for column in DICTIONARY_COLUMNS[file_type] if column in df.columns})
+
+@pytest.mark.parametrize('file_type, position', [('top50', 0), ('translator', 1), ('ool', 2)])
+def test_arrow_round_trip(tmp_path, file_type, position):
+    df = generate_data(12, 300, seed=2)[position]
+    cache = ColumnarFileCache(str(tmp_path))
+    
+    mapped = cache.put(f"{file_type}-abc", df, file_type)
+    
+    assert [name.endswith('.arrow') for name in os.listdir(tmp_path)] == [True]
+    pd.testing.assert_frame_equal(mapped, _as_loaded(df, file_type))
+    pd.testing.assert_frame_equal(cache.get(f"{file_type}-abc"), mapped)
+
+def test_round_trip_keeps_matching_results(tmp_path):
+    top50_df, translator_df, ool_df = edge_case_data()
+    cache = ColumnarFileCache(str(tmp_path))
+    geladen = [cache.put(f"{file_type}-x", df, file_type) for file_type, df in [('top50', top50_df), ('translator', translator_df), ('ool', ool_df.astype({'artikel no': str}))]]
+    
+    match_indices, summary, extended = process_all_data(*geladen)
+    expected_indices, expected_summary, expected_extended = process_all_data(top50_df, translator_df, ool_df.astype({'artikel no': str}))
+    
+    assert match_indices == expected_indices
+    pd.testing.assert_frame_equal(summary, expected_summary)
+    pd.testing.assert_frame_equal(extended.astype(object), expected_extended.astype(object))
+
+def test_mixed_types_fall_back_to_pickle(tmp_path):
+    df = pd.DataFrame({'artikel no': pd.array([712345, '12345', None], dtype=object)})
+    cache = ColumnarFileCache(str(tmp_path))
+    
+    cache.put('ool-gemischt', df, 'ool')
+    
+    assert [name.endswith('.pkl') for name in os.listdir(tmp_path)] == [True]
+    pd.testing.assert_frame_equal(cache.get('ool-gemischt'), df)
+
+def test_damaged_arrow_file_is_a_miss(tmp_path):
+    cache = ColumnarFileCache(str(tmp_path))
+    cache.put('top50-abc', generate_data(5, 10)[0], 'top50')
+    path = os.path.join(tmp_path, os.listdir(tmp_path)[0])
+    with open(path, 'r+b') as f:
+        f.truncate(20)
+    
+    assert cache.get('top50-abc') is None
+
+def test_load_columnar_reuses_work_format(tmp_path):
+    path = tmp_path / 'ool.xlsx'
+    path.write_bytes(to_xlsx(generate_data(12, 50, seed=6)[2]))
+    cache = ColumnarFileCache(str(tmp_path / 'arbeitsformat'))
+    
+    first, first_valid, first_cached = load_columnar(str(path), 'ool', cache)
+    second, second_valid, second_cached = load_columnar(str(path), 'ool', cache)
+    
+    assert first_valid and second_valid
+    assert (first_cached, second_cached) == (False, True)
+    pd.testing.assert_frame_equal(second, first)
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_processing import extract_codices_from_top50, process_all_data
+
+def reference_process(top50_df, translator_df, ool_df):
+    # Ursprünglicher Abgleich Zeile für Zeile je Codice (Stand vor der Umstellung auf Joins)
+    codices = []
+    for _, row in top50_df.dropna(subset=['Codice']).iterrows():
+        full_codice = row['Codice']
+        codices.append({
+            'full_codice': full_codice,
+            'base_codice': full_codice.split('#')[0] if '#' in str(full_codice) else full_codice,
+            'lagerbestand': row.get('Lagerbestand', None),
+            'kundenauftraege': row.get('Kundenauftraegen', None),
+            'monatlicher_verbrauch': row.get('Montatlicher Verbrauch', None)
+        })
+    
+    match_indices, summary, enrichment = [], [], {}
+    for entry in codices:
+        rows = translator_df[translator_df.iloc[:, 3] == entry['base_codice']]
+        artikelnummern = [str(value) for value in rows.iloc[:, 16] if pd.notna(value)]
+        
+        varianten = set()
+        for art in artikelnummern:
+            varianten.add(art)
+            try:
+                varianten.add(str(int(float(art))))
+            except (ValueError, TypeError, OverflowError):
+                pass
+            if not art.startswith('7') and art.isdigit():
+                varianten.add('7' + art)
+        
+        matched = []
+        for idx, value in ool_df['artikel no'].items():
+            text = str(value)
+            ohne_7 = text[1:] if text.startswith('7') else text
+            if text in varianten or ohne_7 in varianten:
+                match_indices.append(idx)
+                matched.append(text)
+                enrichment[idx] = entry
+        
+        for art in artikelnummern:
+            arts = [art, '7' + art] if not art.startswith('7') and art.isdigit() else [art]
+            found = any(v in m or m in v for v in arts for m in matched)
+            summary.append((entry['full_codice'], entry['base_codice'], art, "Ja" if found else "Nein"))
+    
+    return match_indices, summary, enrichment
+
+def test_process_all_data_matches_reference(inputs):
+    top50_df, translator_df, ool_df = inputs
+    match_indices, summary_data, ool_df_extended = process_all_data(top50_df, translator_df, ool_df)
+    ref_indices, ref_summary, ref_enrichment = reference_process(top50_df, translator_df, ool_df)
+    
+    assert match_indices == ref_indices
+    
+    summary = list(zip(
+        summary_data['codice_full'].astype(object), summary_data['codice_base'].astype(object),
+        summary_data['artikelnummer'], summary_data['gefunden_in_ool']
+    ))
+    assert summary == ref_summary
+    
+    # Letzter Codice gewinnt bei mehrfach gefundenen Zeilen (Regel 'last')
+    expected_codice = [ref_enrichment[idx]['full_codice'] if idx in ref_enrichment else None for idx in ool_df.index]
+    assert ool_df_extended['Codice'].astype(object).where(ool_df_extended['Codice'].notna(), None).tolist() == expected_codice
+    expected_bestand = [ref_enrichment[idx]['lagerbestand'] if idx in ref_enrichment else np.nan for idx in ool_df.index]
+    np.testing.assert_array_equal(ool_df_extended['Lagerbestand'].to_numpy(dtype=float, na_value=np.nan), np.array(expected_bestand, dtype=float))
+
+def test_process_all_data_keeps_ool_columns_and_index(inputs):
+    _, _, ool_df = inputs
+    _, _, ool_df_extended = process_all_data(*inputs)
+    
+    assert ool_df_extended.index.equals(ool_df.index)
+    pd.testing.assert_frame_equal(ool_df_extended[ool_df.columns], ool_df)
+    assert list(ool_df_extended.columns[len(ool_df.columns):]) == ['Lagerbestand', 'Kundenauftraege', 'Monatlicher Verbrauch', 'Codice']
+
+@pytest.mark.parametrize('multi_codice, expected', [('first', 'C1'), ('last', 'C1#2')])
+def test_multi_codice_policy(multi_codice, expected):
+    from tests.conftest import edge_case_data
+    
+    _, _, ool_df_extended = process_all_data(*edge_case_data(), multi_codice=multi_codice)
+    
+    # '12345' wird von C1 und C1#2 gefunden
+    assert ool_df_extended.loc[101, 'Codice'] == expected
+
+def test_multi_codice_all_repeats_rows():
+    from tests.conftest import edge_case_data
+    
+    top50_df, translator_df, ool_df = edge_case_data()
+    match_indices, _, ool_df_extended = process_all_data(top50_df, translator_df, ool_df, multi_codice='all')
+    
+    assert len(ool_df_extended) == len(ool_df) + len(match_indices) - len(set(match_indices))
+    assert ool_df_extended.loc[[101], 'Codice'].tolist() == ['C1', 'C1#2']
+
+def test_extract_codices_without_optional_columns():
+    top50_df = pd.DataFrame({'Codice': [4711, 'C2#3', None, 'C3'], 'Lagerbestand': [1.0, 2.0, 3.0, np.nan]})
+    
+    codices = extract_codices_from_top50(top50_df)
+    
+    assert [(entry['full_codice'], entry['base_codice']) for entry in codices] == [(4711, 4711), ('C2#3', 'C2'), ('C3', 'C3')]
+    assert [entry['lagerbestand'] for entry in codices][:2] == [1.0, 2.0]
+    assert pd.isna(codices[2]['lagerbestand'])
+    assert all(entry['kundenauftraege'] is None and entry['monatlicher_verbrauch'] is None for entry in codices)
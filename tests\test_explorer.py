@@ -0,0 +1,26 @@
+import numpy as np
+
+from tests.conftest import edge_case_data
+from utils.data_processing import process_all_data
+from utils.explorer import SUMMARY_INTERNAL_COLUMNS, STATUS_JA, ResultExplorer
+
+def test_summary_explorer_hides_internal_columns():
+    _, summary, _ = process_all_data(*edge_case_data())
+    
+    explorer = ResultExplorer.from_summary(summary)
+    
+    assert not set(SUMMARY_INTERNAL_COLUMNS) & set(explorer.columns)
+    assert explorer.columns == [column for column in summary.columns if column not in SUMMARY_INTERNAL_COLUMNS]
+    assert not set(SUMMARY_INTERNAL_COLUMNS) & set(explorer.page(explorer.query(), 1, 5).columns)
+
+def test_ool_explorer_filters_and_sorts():
+    match_indices, _, extended = process_all_data(*edge_case_data())
+    explorer = ResultExplorer.from_ool(extended, match_indices)
+    
+    positions = explorer.query(status=STATUS_JA, sort_by='offene Menge', descending=True)
+    page = explorer.page(positions, 1, 100)
+    
+    assert sorted(page.index) == sorted(set(match_indices))
+    assert page['offene Menge'].is_monotonic_decreasing
+    assert page['Markiert'].eq(STATUS_JA).all()
+    assert np.array_equal(explorer.query(artikel_prefix='77'), np.flatnonzero(extended['artikel no'].astype(str).str.startswith('77')))
@@ -0,0 +1,123 @@
+import io
+from datetime import datetime, timezone
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from tests.conftest import edge_case_data, to_xlsx, with_dimension
+from utils.data_processing import process_all_data
+from utils.file_utils import EXCEL_NA_TEXTE, HIGHLIGHT_RULES, check_header, create_chunked_excel, create_downloadable_excel, create_downloadable_summary, create_streaming_excel, read_excel_header
+
+def test_streaming_excel_returns_bytes_with_all_rows():
+    df = pd.DataFrame({'artikel no': ['1', '2', '3'], 'Menge': [1.5, None, 3.0]}, index=[7, 8, 9])
+    
+    data = create_streaming_excel(df, [8])
+    
+    assert isinstance(data, bytes)
+    pd.testing.assert_frame_equal(pd.read_excel(io.BytesIO(data), dtype={'artikel no': str}), df.reset_index(drop=True))
+    
+    # Index 8 ist die zweite Datenzeile (Tabellenzeile 3)
+    worksheet = openpyxl.load_workbook(io.BytesIO(data)).active
+    assert [worksheet.cell(row, 1).fill.fgColor.rgb for row in (2, 3, 4)] == ['00000000', 'FFFFC7CE', '00000000']
+
+def test_streaming_excel_writes_to_output(tmp_path):
+    path = tmp_path / 'ool.xlsx'
+    
+    assert create_streaming_excel(pd.DataFrame({'a': [1, 2]}), output=str(path)) is None
+    assert pd.read_excel(path)['a'].tolist() == [1, 2]
+
+def test_streaming_excel_handles_infinity_and_time_zones():
+    df = pd.DataFrame({
+        'wert': [np.inf, -np.inf, 1.0],
+        'termin': pd.to_datetime(['2025-01-01 10:00', '2025-06-01 12:30', None]).tz_localize('Europe/Berlin'),
+        'objekt': pd.array([datetime(2025, 1, 2, tzinfo=timezone.utc), float('inf'), 'x'], dtype=object)
+    })
+    
+    worksheet = openpyxl.load_workbook(io.BytesIO(create_streaming_excel(df))).active
+    rows = list(worksheet.iter_rows(min_row=2, values_only=True))
+    
+    assert [row[0] for row in rows] == [None, None, 1]
+    assert [row[1] for row in rows] == [datetime(2025, 1, 1, 10, 0), datetime(2025, 6, 1, 12, 30), None]
+    # Spalten mit gemischten Typen haben kein Datumsformat: 45659 ist der 02.01.2025 als Excel-Seriennummer
+    assert [row[2] for row in rows] == [45659, None, 'x']
+
+def test_na_texts_match_read_excel():
+    # Der Streaming-Reader muss dieselben Texte als fehlend lesen wie pandas.read_excel
+    texte = EXCEL_NA_TEXTE + ['NAN', 'nichts', '0']
+    gelesen = pd.read_excel(io.BytesIO(to_xlsx(pd.DataFrame({'Text': texte}))), dtype=object)['Text']
+    
+    assert [text for text, fehlt in zip(texte, gelesen.isna()) if fehlt] == EXCEL_NA_TEXTE
+
+def _headers(data):
+    worksheet = openpyxl.load_workbook(io.BytesIO(data)).active
+    return [cell.value for cell in worksheet[1]]
+
+def test_empty_summary_has_same_headers():
+    _, summary_data, _ = process_all_data(*edge_case_data())
+    
+    headers = _headers(create_downloadable_summary(summary_data))
+    assert 'ool_zeilen' not in headers and 'In OOL gefunden' in headers
+    assert _headers(create_downloadable_summary(summary_data.iloc[:0])) == headers
+
+def test_header_ignores_stale_dimension():
+    df = pd.DataFrame({'Auftrag': [1, 2], 'Position': [1, 1], 'artikel no': ['12345', '67890']})
+    data = with_dimension(to_xlsx(df), 'A1:B5')
+    
+    header, column_count = read_excel_header(data)
+    
+    assert header == ['Auftrag', 'Position', 'artikel no'] and column_count == 3
+    assert check_header(data, 'ool') is None
+
+def test_translator_width_is_measured():
+    translator_df = pd.DataFrame({f"Spalte {chr(65 + i)}": ['x', 'y'] for i in range(17)})
+    
+    # Eine zu kleine Größenangabe darf keine gültige Datei abweisen
+    assert check_header(with_dimension(to_xlsx(translator_df), 'A1:C3'), 'translator') is None
+    assert check_header(to_xlsx(translator_df.iloc[:, :5]), 'translator') is not None
+
+def _fills(data, rows):
+    worksheet = openpyxl.load_workbook(io.BytesIO(data)).active
+    return [worksheet.cell(row, 1).fill.fgColor.rgb for row in rows]
+
+def _rules(data):
+    worksheet = openpyxl.load_workbook(io.BytesIO(data)).active
+    return [(str(entry.sqref), rule.formula[0]) for entry in worksheet.conditional_formatting for rule in entry.rules]
+
+def test_downloadable_excel_highlights_by_position():
+    # Der Index 0 steht an zweiter Stelle; als Position gelesen träfe er die Kopfzeile
+    df = pd.DataFrame({'artikel no': ['1', '2', '3'], 'Menge': [1, 2, 3]}, index=[2, 0, 1])
+    
+    data = create_downloadable_excel(df, [0])
+    
+    assert _fills(data, (1, 2, 3, 4)) == ['00000000', '00000000', 'FFFFC7CE', '00000000']
+
+ROWS_DF = pd.DataFrame({
+    'artikel no': ['1', '2', '3', '4'],
+    'Lagerbestand': [1.0, 5.0, 50.0, 1.0],
+    'Monatlicher Verbrauch': [2.0, 2.0, 2.0, 2.0],
+    'Codice': [None, 'C1', 'C1', 'C2']
+}, index=[40, 30, 20, 10])
+
+def test_rules_replace_row_formats():
+    for data in (create_downloadable_excel(ROWS_DF, [30], HIGHLIGHT_RULES['treffer']), create_streaming_excel(ROWS_DF, [30], highlight_rules=HIGHLIGHT_RULES['treffer'])):
+        # Ohne Spalte 'Konfidenz' entfällt die Regel für unscharfe Treffer
+        assert _rules(data) == [('A2:D5', '$D2<>""')]
+        assert _fills(data, (2, 3, 4, 5)) == ['00000000'] * 4
+
+def test_reichweite_rules_cover_all_chunks():
+    output = io.BytesIO()
+    rows = create_chunked_excel(output, ((ROWS_DF.iloc[i:i + 3], [], []) for i in (0, 3)), highlight_rules=HIGHLIGHT_RULES['reichweite'])
+    
+    assert rows == 4
+    assert _rules(output.getvalue()) == [
+        ('A2:D5', 'AND($D2<>"",$B2<$C2)'),
+        ('A2:D5', 'AND($D2<>"",$B2<3*$C2)'),
+        ('A2:D5', '$D2<>""')
+    ]
+
+def test_chunked_excel_highlights_by_position_within_blocks():
+    output = io.BytesIO()
+    create_chunked_excel(output, [(ROWS_DF.iloc[:2], [30], []), (ROWS_DF.iloc[2:], [10], [20])])
+    
+    assert _fills(output.getvalue(), (2, 3, 4, 5)) == ['00000000', 'FFFFC7CE', 'FFFFEB9C', 'FFFFC7CE']
@@ -0,0 +1,88 @@
+import io
+import random
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from utils.data_processing import process_all_data
+from utils.file_utils import create_downloadable_summary, create_streaming_excel
+from utils.fuzzy import STATUS_UNSCHARF, DeletionIndex, build_fuzzy_index, fuzzy_row_indices, levenshtein
+
+def _vokabular(anzahl, seed):
+    # Kurze Zeichenketten aus wenigen Zeichen, damit viele Einträge nahe beieinander liegen
+    rng = random.Random(seed)
+    return sorted({''.join(rng.choice('1279') for _ in range(rng.randint(1, 6))) for _ in range(anzahl)})
+
+@pytest.mark.parametrize('max_distance', [1, 2])
+def test_deletion_index_finds_all_candidates(max_distance):
+    woerter = _vokabular(300, seed=max_distance)
+    index = DeletionIndex(woerter, max_distance)
+    
+    for suchwort in _vokabular(150, seed=10 + max_distance) + ['', '7']:
+        erwartet = {}
+        for wort in woerter:
+            distanz = levenshtein(suchwort, wort, max_distance)
+            if distanz <= max_distance:
+                erwartet[wort] = distanz
+        assert dict(index.search(suchwort)) == erwartet, suchwort
+
+def test_levenshtein_caps_at_max_distance():
+    assert levenshtein('12345', '12345', 1) == 0
+    assert levenshtein('12345', '13245', 2) == 2
+    assert levenshtein('12345', '13245', 1) == 2
+    assert levenshtein('1', '12345', 2) == 3
+
+def test_fuzzy_index_keeps_origin_of_variants():
+    varianten = pd.DataFrame({'artikel_no': ['42'], 'artikel_numerisch': ['42'], 'artikel_mit_7': ['742']})
+    index, herkunft = build_fuzzy_index([varianten, varianten], 1)
+    
+    assert len(index) == 2
+    assert herkunft == {'42': [(0, '42'), (1, '42')], '742': [(0, '42'), (1, '42')]}
+
+def _fills(data):
+    worksheet = openpyxl.load_workbook(io.BytesIO(data)).active
+    return [worksheet.cell(row, 1).fill.fgColor.rgb for row in (2, 3, 4)]
+
+def fuzzy_data():
+    # C1 und C2 liegen einen Tippfehler auseinander; '987650' findet C2 nur unscharf
+    top50_df = pd.DataFrame({
+        'Codice': ['C1', 'C2'],
+        'Lagerbestand': [1.0, 2.0],
+        'Kundenauftraegen': [1.0, 1.0],
+        'Montatlicher Verbrauch': [1.0, 1.0]
+    })
+    translator_df = pd.DataFrame({f"Spalte {chr(65 + i)}": range(3) for i in range(17)})
+    translator_df['Spalte D'] = ['C1', 'C2', 'C2']
+    translator_df['Spalte Q'] = ['123456', '987654', '123457']
+    ool_df = pd.DataFrame({'artikel no': ['123456', '987650', '111111'], 'Menge': [1, 2, 3]}, index=[10, 11, 12])
+    return top50_df, translator_df, ool_df
+
+@pytest.mark.parametrize('multi_codice', ['first', 'last'])
+def test_exact_hits_win_over_fuzzy_hits(multi_codice):
+    match_indices, _, ool_df_extended = process_all_data(*fuzzy_data(), multi_codice=multi_codice, fuzzy_distance=1)
+    
+    # '123456' liegt auch einen Tippfehler neben '123457' (C2), bleibt aber beim exakten Treffer C1
+    assert match_indices == [10, 11]
+    assert ool_df_extended['Codice'].tolist()[:2] == ['C1', 'C2']
+    assert ool_df_extended['Konfidenz'].tolist()[:2] == [1.0, pytest.approx(5 / 6)]
+    assert pd.isna(ool_df_extended.loc[12, 'Konfidenz'])
+    assert fuzzy_row_indices(ool_df_extended) == [11]
+
+def test_without_fuzzy_distance_nothing_is_fuzzy():
+    match_indices, summary_data, ool_df_extended = process_all_data(*fuzzy_data())
+    
+    assert match_indices == [10]
+    assert 'konfidenz' not in summary_data.columns
+    assert fuzzy_row_indices(ool_df_extended) == []
+
+def test_fuzzy_rows_are_marked_in_summary_and_export():
+    _, summary_data, ool_df_extended = process_all_data(*fuzzy_data(), fuzzy_distance=1)
+    
+    assert summary_data['gefunden_in_ool'].tolist() == ['Ja', STATUS_UNSCHARF, 'Nein']
+    assert summary_data['konfidenz'].tolist()[:2] == [1.0, pytest.approx(5 / 6)]
+    
+    # Exakte Treffer rot, unscharfe gelb; die Zusammenfassung hebt nur unscharfe hervor
+    ool_export = create_streaming_excel(ool_df_extended, [10, 11], fuzzy_indices=fuzzy_row_indices(ool_df_extended))
+    assert _fills(ool_export) == ['FFFFC7CE', 'FFFFEB9C', '00000000']
+    assert _fills(create_downloadable_summary(summary_data)) == ['00000000', 'FFFFEB9C', '00000000']
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from utils.benchmark import generate_data
+from utils.data_processing import process_all_data
+from utils.incremental import STATUS_ENTFERNT, STATUS_GEAENDERT, STATUS_NEU, process_incremental
+
+INPUTS_KEY = 'top50-translator'
+
+def _naechste_version(ool_df):
+    # Zeilen ändern, entfernen und hinzufügen
+    neu = ool_df.copy()
+    neu.loc[neu.index[10:15], 'offene Menge'] += 1
+    return pd.concat([neu.iloc[10:], ool_df.iloc[:3].assign(Auftrag=1)], ignore_index=True)
+
+def test_incremental_equals_full_run():
+    top50_df, translator_df, ool_df = generate_data(12, 400, seed=3)
+    _, _, _, changes, state = process_incremental(top50_df, translator_df, ool_df, INPUTS_KEY)
+    assert changes is None
+    
+    neu = _naechste_version(ool_df)
+    match_indices, summary, extended, changes, _ = process_incremental(top50_df, translator_df, neu, INPUTS_KEY, state)
+    expected_indices, expected_summary, expected_extended = process_all_data(top50_df, translator_df, neu)
+    
+    assert match_indices == expected_indices
+    pd.testing.assert_frame_equal(summary, expected_summary)
+    pd.testing.assert_frame_equal(extended, expected_extended)
+    assert set(changes['Änderung']) == {STATUS_NEU, STATUS_GEAENDERT, STATUS_ENTFERNT}
+
+def test_renamed_key_column_rebuilds():
+    top50_df, translator_df, ool_df = generate_data(12, 200, seed=4)
+    *_, state = process_incremental(top50_df, translator_df, ool_df, INPUTS_KEY)
+    assert 'Auftrag' in state.key_columns
+    
+    umbenannt = ool_df.rename(columns={'Auftrag': 'Auftragsnr.'})
+    match_indices, summary, _, changes, neuer_state = process_incremental(top50_df, translator_df, umbenannt, INPUTS_KEY, state)
+    expected_indices, expected_summary, _ = process_all_data(top50_df, translator_df, umbenannt)
+    
+    assert changes is None
+    assert match_indices == expected_indices
+    pd.testing.assert_frame_equal(summary, expected_summary)
+    assert 'Auftrag' not in neuer_state.key_columns
+
+def test_other_inputs_rebuild():
+    top50_df, translator_df, ool_df = generate_data(12, 200, seed=5)
+    *_, state = process_incremental(top50_df, translator_df, ool_df, INPUTS_KEY)
+    
+    _, _, _, changes, _ = process_incremental(top50_df, translator_df, ool_df, 'andere-dateien', state)
+    
+    assert changes is None
@@ -0,0 +1,65 @@
+import tracemalloc
+
+import pytest
+
+from utils.instrumentation import PipelineMetrics
+
+def test_tracing_only_inside_stages():
+    metrics = PipelineMetrics(trace_memory=True)
+    assert not tracemalloc.is_tracing()
+    
+    with metrics.stage('codices', 3):
+        assert tracemalloc.is_tracing()
+        daten = [bytes(1024) for _ in range(100)]
+    
+    assert not tracemalloc.is_tracing()
+    assert metrics.stages[0]['peak_mb'] > 0
+    assert len(daten) == 100
+
+def test_tracing_stopped_after_failed_stage():
+    # Ein Lauf, der mit einer Ausnahme abbricht, ruft finish() nie auf
+    metrics = PipelineMetrics(trace_memory=True)
+    
+    with pytest.raises(ValueError):
+        with metrics.stage('abgleich'):
+            raise ValueError("Abbruch")
+    
+    assert not tracemalloc.is_tracing()
+    assert metrics.stages[0]['stage'] == 'abgleich'
+
+def test_running_trace_is_left_alone():
+    tracemalloc.start()
+    try:
+        with PipelineMetrics(trace_memory=True).stage('codices'):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+def test_nested_stage_keeps_outer_peak():
+    metrics = PipelineMetrics(trace_memory=True)
+    
+    with metrics.stage('bloecke'):
+        gross = bytearray(8 * 1024 * 1024)
+        del gross
+        with metrics.stage('abgleich'):
+            klein = bytearray(1024 * 1024)
+        del klein
+    
+    innen, aussen = metrics.stages
+    assert innen['stage'] == 'abgleich' and 0.9 < innen['peak_mb'] < 2
+    # Die Spitze vor dem inneren Schritt bleibt dem äußeren erhalten
+    assert aussen['peak_mb'] >= 8
+
+def test_progress_follows_planned_stages():
+    fortschritt = []
+    metrics = PipelineMetrics(['codices', 'abgleich'], on_progress=lambda anteil, name: fortschritt.append((anteil, name)), trace_memory=False)
+    
+    with metrics.stage('codices'):
+        pass
+    metrics.record('index', 0.1)
+    with metrics.stage('abgleich'):
+        pass
+    
+    assert fortschritt == [(0.5, 'codices'), (1.0, 'abgleich')]
+    assert metrics.stages[0]['peak_mb'] is None
@@ -0,0 +1,95 @@
+import io
+import os
+import pickle
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import openpyxl
+import pytest
+
+from tests.conftest import edge_case_data
+from utils.data_processing import process_all_data
+from utils.jobs import OUTPUT_FILES, STATUS_LOCK_STALE_SECONDS, JobManager, _write_status, is_valid_job_id, read_status_file
+
+def _schreiber(job_dir, name):
+    for wert in range(40):
+        _write_status(job_dir, **{name: wert})
+
+def test_concurrent_status_writes_are_not_lost(tmp_path):
+    # Worker und Server ändern verschiedene Felder derselben Statusdatei
+    job_dir = str(tmp_path)
+    _write_status(job_dir, status='laeuft')
+    
+    namen = [f"feld{i}" for i in range(4)]
+    with ProcessPoolExecutor(max_workers=len(namen)) as pool:
+        for future in [pool.submit(_schreiber, job_dir, name) for name in namen]:
+            future.result()
+    
+    status = read_status_file(job_dir)
+    assert status['status'] == 'laeuft'
+    assert all(status[name] == 39 for name in namen)
+    assert sorted(os.listdir(job_dir)) == ['status.json']
+
+def test_stale_lock_is_removed(tmp_path):
+    job_dir = str(tmp_path)
+    lock_path = os.path.join(job_dir, 'status.lock')
+    open(lock_path, 'w').close()
+    alt = time.time() - STATUS_LOCK_STALE_SECONDS - 1
+    os.utime(lock_path, (alt, alt))
+    
+    _write_status(job_dir, status='fertig')
+    
+    assert read_status_file(job_dir)['status'] == 'fertig'
+    assert not os.path.exists(lock_path)
+
+@pytest.mark.parametrize('job_id', ['../x', '..', 'ABCDEF' * 6, '0' * 31, '0' * 32 + '/..', None])
+def test_invalid_job_ids_are_refused(tmp_path, job_id):
+    fremd = tmp_path / 'fremd'
+    fremd.mkdir()
+    (fremd / 'status.json').write_text('{"status": "fertig"}', encoding='utf-8')
+    (fremd / 'result.pkl').write_bytes(b'kein pickle')
+    
+    manager = JobManager(max_workers=1, jobs_dir=str(tmp_path / 'jobs'))
+    try:
+        for ungueltig in (job_id, '../fremd', str(fremd)):
+            assert not is_valid_job_id(ungueltig)
+            for methode in (manager.status, manager.result, manager.cancel):
+                with pytest.raises(ValueError):
+                    methode(ungueltig)
+    finally:
+        manager._executor.shutdown()
+    
+    assert sorted(os.listdir(fremd)) == ['result.pkl', 'status.json']
+
+def test_submitted_job_ids_are_valid():
+    assert is_valid_job_id(uuid.uuid4().hex)
+
+def test_outputs_are_created_on_first_download(tmp_path):
+    match_indices, summary_data, ool_df_extended = process_all_data(*edge_case_data())
+    result = {
+        'match_indices': match_indices, 'summary_data': summary_data, 'ool_df_extended': ool_df_extended,
+        'changes': None, 'fuzzy_indices': [], 'highlight': None
+    }
+    manager = JobManager(max_workers=1, jobs_dir=str(tmp_path))
+    try:
+        job_id = uuid.uuid4().hex
+        job_dir = tmp_path / job_id
+        job_dir.mkdir()
+        with open(job_dir / 'result.pkl', 'wb') as f:
+            pickle.dump(result, f)
+        
+        # Der Auftrag legt keine Exportdateien an; erst der Download erstellt und speichert sie
+        for name, file_name in OUTPUT_FILES.items():
+            assert not (job_dir / file_name).exists()
+            data = manager.output(job_id, name)
+            assert (job_dir / file_name).read_bytes() == data
+            assert manager.output(job_id, name, result) == data
+        
+        worksheet = openpyxl.load_workbook(io.BytesIO(manager.output(job_id, 'ool'))).active
+        assert worksheet.max_row == len(ool_df_extended) + 1
+        
+        with pytest.raises(FileNotFoundError):
+            manager.output(uuid.uuid4().hex, 'ool')
+    finally:
+        manager._executor.shutdown()
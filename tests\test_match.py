@@ -0,0 +1,23 @@
+import os
+
+from utils.match import output_stems
+
+def test_unique_names_are_kept():
+    assert output_stems([os.path.join('a', 'januar.xlsx'), os.path.join('b', 'februar.xlsx')]) == ['januar', 'februar']
+
+def test_same_name_in_different_directories():
+    paths = [os.path.join('werk1', 'ool.xlsx'), os.path.join('werk2', 'ool.xlsx'), 'andere.xlsx']
+    
+    assert output_stems(paths) == ['werk1_ool', 'werk2_ool', 'andere']
+
+def test_remaining_duplicates_are_numbered():
+    # Gleiche Verzeichnisnamen und ein doppelt angegebener Pfad
+    paths = [os.path.join('x', 'werk', 'ool.xlsx'), os.path.join('y', 'werk', 'ool.xlsx'), os.path.join('x', 'werk', 'ool.xlsx')]
+    
+    assert output_stems(paths) == ['werk_ool_1', 'werk_ool_2', 'werk_ool_3']
+
+def test_names_differing_only_in_case_collide():
+    stems = output_stems([os.path.join('a', 'OOL.xlsx'), os.path.join('b', 'ool.xlsx')])
+    
+    assert stems == ['a_OOL', 'b_ool']
+    assert len({stem.lower() for stem in stems}) == 2
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from utils.normalization import (
+    TRANSLATOR_CODICE_NAME,
+    TRANSLATOR_ARTIKEL_NAME,
+    artikel_als_text,
+    ohne_fuehrende_7,
+    numerische_form,
+    mit_fuehrender_7,
+    normalize_ool,
+    normalize_artikel,
+    normalize_translator,
+    translator_spalten
+)
+
+def test_artikel_als_text_matches_str():
+    werte = pd.Series([12345, 12345.0, '0042', None, np.nan, 'AB12'], dtype=object)
+    
+    assert artikel_als_text(werte).tolist() == [str(wert) for wert in werte]
+
+def test_ohne_fuehrende_7():
+    texte = pd.Series(['712345', '12345', '77', '7', 'A7'])
+    
+    assert ohne_fuehrende_7(texte).tolist() == ['12345', '12345', '7', '', 'A7']
+
+def test_numerische_form_like_int_float():
+    texte = pd.Series(['12345.0', '0012', '42.9', '-3', 'AB12', 'nan', 'inf', '1e30'])
+    
+    assert numerische_form(texte).tolist() == ['12345', '12', '42', '-3', None, None, None, None]
+
+def test_mit_fuehrender_7_only_for_digits_without_7():
+    texte = pd.Series(['12345', '712345', 'AB12', '12.5', ''], dtype=object)
+    
+    assert mit_fuehrender_7(texte).tolist() == ['712345', None, None, None, None]
+
+def test_normalize_ool_keys():
+    ool_df = pd.DataFrame({'artikel no': pd.array([712345, '12345', None], dtype=object)}, index=[5, 3, 9])
+    
+    keys = normalize_ool(ool_df)
+    
+    assert keys['ool_pos'].tolist() == [0, 1, 2]
+    assert keys['artikel_no'].tolist() == ['712345', '12345', 'None']
+    assert keys['artikel_ohne_7'].tolist() == ['12345', '12345', 'None']
+
+def test_normalize_artikel_variants():
+    varianten = normalize_artikel(pd.Series(['0042', '712', 'AB12']))
+    
+    assert varianten['artikel_no'].tolist() == ['0042', '712', 'AB12']
+    assert varianten['artikel_numerisch'].tolist() == ['42', '712', None]
+    assert varianten['artikel_mit_7'].tolist() == ['70042', None, None]
+
+def test_translator_columns_by_position_or_name():
+    voll = pd.DataFrame({f"Spalte {chr(65 + i)}": [f"{chr(65 + i)}1", f"{chr(65 + i)}2"] for i in range(17)})
+    schmal = pd.DataFrame({TRANSLATOR_CODICE_NAME: ['D1', 'D2'], TRANSLATOR_ARTIKEL_NAME: ['Q1', 'Q2']})
+    
+    for translator_df in (voll, schmal):
+        codices, artikel = translator_spalten(translator_df)
+        assert codices.tolist() == ['D1', 'D2']
+        assert artikel.tolist() == ['Q1', 'Q2']
+
+def test_normalize_translator_drops_missing_articles():
+    translator_df = pd.DataFrame({TRANSLATOR_CODICE_NAME: ['C1', 'C1', 'C2'], TRANSLATOR_ARTIKEL_NAME: ['12', None, '7']})
+    
+    normalisiert = normalize_translator(translator_df)
+    
+    assert normalisiert['codice'].tolist() == ['C1', 'C2']
+    assert normalisiert['artikel_mit_7'].tolist() == ['712', None]
+
+def test_missing_variants_are_none_for_string_dtype():
+    texte = pd.Series(['12', '712', 'AB'], dtype='str')
+    
+    assert mit_fuehrender_7(texte).tolist() == ['712', None, None]
+    assert numerische_form(texte).tolist() == ['12', '712', None]
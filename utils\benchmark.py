@@ -0,0 +1,251 @@
+"""
+Benchmark der Verarbeitungsschritte mit synthetischen Daten.
+
+Beispiele:
+    python -m utils.benchmark run --out baseline.json
+    python -m utils.benchmark compare --baseline baseline.json --tolerance 0.25
+"""
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.file_utils import load_excel_file, create_downloadable_excel, create_streaming_excel, HIGHLIGHT_RULES
+from utils.data_processing import process_all_data
+
+# Größenraster: (Anzahl Codices in der Top-Liste, Zeilen der Open Order List)
+DEFAULT_SIZES = [(50, 10_000), (500, 100_000), (5000, 1_000_000)]
+QUICK_SIZES = [(50, 10_000), (500, 50_000)]
+
+# Artikelnummern je Basis-Codice in der Übersetzungsdatei
+ARTIKEL_JE_CODICE = 8
+
+# Absolute Mindestabweichung, ab der eine Verschlechterung als Regression gilt (filtert Messrauschen)
+MIN_DELTA = {'seconds': 0.05, 'peak_mb': 1.0}
+
+def generate_data(n_codices: int, n_ool_rows: int, seed: int = 42) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Erzeugt reproduzierbare Testdaten für Top-N-Liste, Übersetzungsdatei und Open Order List.
+    
+    Args:
+        n_codices: Anzahl Codices in der Top-N-Liste
+        n_ool_rows: Anzahl Zeilen der Open Order List
+        seed: Startwert des Zufallsgenerators
+        
+    Returns:
+        Ein Tuple aus Top-N-Liste, Übersetzungsdatei (mindestens 17 Spalten) und Open Order List
+    """
+    rng = np.random.default_rng(seed)
+    
+    # Basis-Codices: doppelt so viele wie in der Top-Liste, damit die Übersetzungsdatei auch fremde Codices enthält
+    n_base = max(n_codices * 2, 10)
+    base_codices = np.array([f"E{code:06d}" for code in rng.choice(1_000_000, size=n_base, replace=False)])
+    
+    # Top-N-Liste: etwa ein Drittel der Codices mit #-Variante
+    top_base = rng.choice(base_codices, size=n_codices)
+    variante = rng.random(n_codices) < 0.3
+    codices = [f"{base}#{rng.integers(1, 10)}" if is_variante else base for base, is_variante in zip(top_base, variante)]
+    top50_df = pd.DataFrame({
+        'Codice': codices,
+        'Lagerbestand': rng.integers(0, 5000, n_codices).astype(float),
+        'Kundenauftraegen': rng.integers(0, 500, n_codices).astype(float),
+        'Montatlicher Verbrauch': np.round(rng.random(n_codices) * 1000, 2)
+    })
+    
+    # Übersetzungsdatei: Spalte D = Basis-Codice, Spalte Q = Artikelnummer
+    n_translator = n_base * ARTIKEL_JE_CODICE
+    artikel = rng.choice(np.arange(100_000, 999_999), size=n_translator, replace=False).astype(str)
+    mit_7 = rng.random(n_translator) < 0.1
+    artikel = np.where(mit_7, np.char.add('7', artikel), artikel)
+    translator_df = pd.DataFrame({f"Spalte {chr(65 + i)}": rng.integers(0, 100, n_translator) for i in range(20)})
+    translator_df['Spalte D'] = np.repeat(base_codices, ARTIKEL_JE_CODICE)
+    translator_df['Spalte Q'] = artikel
+    
+    # Open Order List: numerische Artikelnummern, teils mit führender 7, teils ohne Treffer
+    treffer_artikel = rng.choice(artikel, size=n_ool_rows).astype(str)
+    fremde_artikel = rng.integers(100_000, 999_999, n_ool_rows).astype(str)
+    art = rng.random(n_ool_rows)
+    ool_artikel = np.where(art < 0.3, treffer_artikel, fremde_artikel)
+    ool_artikel = np.where((art < 0.1) & ~np.char.startswith(ool_artikel, '7'), np.char.add('7', ool_artikel), ool_artikel)
+    ool_df = pd.DataFrame({
+        'Auftrag': rng.integers(100_000, 999_999, n_ool_rows),
+        'Position': rng.integers(1, 50, n_ool_rows),
+        'artikel no': ool_artikel.astype(np.int64),
+        'Abmessung': rng.choice(['10x20', '20x30', '50x50', '100x200'], size=n_ool_rows),
+        'Gesamtmenge': rng.integers(1, 1000, n_ool_rows),
+        'offene Menge': rng.integers(0, 1000, n_ool_rows),
+        'Liefertermin': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, n_ool_rows), unit='D')
+    })
+    
+    return top50_df, translator_df, ool_df
+
+def _to_xlsx(df: pd.DataFrame) -> bytes:
+    output = io.BytesIO()
+    df.to_excel(output, index=False)
+    return output.getvalue()
+
+def measure(func: Callable[[], Any], repeat: int = 1) -> Tuple[float, float]:
+    """
+    Misst Laufzeit (bester Wert aus repeat Läufen) und Spitzenspeicher einer Funktion.
+    
+    Args:
+        func: Zu messende Funktion ohne Argumente
+        repeat: Anzahl der Zeitmessungen
+        
+    Returns:
+        Ein Tuple aus Laufzeit in Sekunden und Spitzenspeicher in MB
+    """
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds = min(seconds, time.perf_counter() - start)
+    
+    # Speicher in einem eigenen Lauf messen, da tracemalloc die Laufzeit verfälscht
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return seconds, peak / (1024 * 1024)
+
+def run_benchmarks(sizes: List[Tuple[int, int]], repeat: int = 1, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Führt alle Verarbeitungsschritte über das Größenraster aus.
+    
+    Args:
+        sizes: Liste von (Anzahl Codices, OOL-Zeilen)
+        repeat: Anzahl der Zeitmessungen je Schritt
+        seed: Startwert für die Testdaten
+        
+    Returns:
+        Liste der Messergebnisse je Schritt und Größe
+    """
+    results = []
+    for n_codices, n_ool_rows in sizes:
+        top50_df, translator_df, ool_df = generate_data(n_codices, n_ool_rows, seed)
+        files = {
+            'top50': _to_xlsx(top50_df),
+            'translator': _to_xlsx(translator_df),
+            'ool': _to_xlsx(ool_df)
+        }
+        
+        # Ergebnisse der Verarbeitung als Eingabe für die Export-Schritte
+        match_indices, summary_data, ool_df_extended = process_all_data(top50_df, translator_df, ool_df)
+        
+        stages = {
+            'load_top50': lambda: load_excel_file(io.BytesIO(files['top50']), 'top50'),
+            'load_translator': lambda: load_excel_file(io.BytesIO(files['translator']), 'translator'),
+            'load_ool': lambda: load_excel_file(io.BytesIO(files['ool']), 'ool'),
+            'process_all_data': lambda: process_all_data(top50_df, translator_df, ool_df),
+            'create_downloadable_excel': lambda: create_downloadable_excel(ool_df_extended, match_indices),
+            'create_streaming_excel': lambda: create_streaming_excel(ool_df_extended, match_indices),
+            'create_downloadable_excel_regeln': lambda: create_downloadable_excel(ool_df_extended, highlight_rules=HIGHLIGHT_RULES['treffer']),
+            'create_streaming_excel_regeln': lambda: create_streaming_excel(ool_df_extended, highlight_rules=HIGHLIGHT_RULES['treffer'])
+        }
+        
+        for stage, func in stages.items():
+            seconds, peak_mb = measure(func, repeat)
+            results.append({
+                'stage': stage,
+                'codices': n_codices,
+                'ool_rows': n_ool_rows,
+                'seconds': round(seconds, 4),
+                'peak_mb': round(peak_mb, 2)
+            })
+            print(f"{stage:28s} {n_codices:>6d} Codices {n_ool_rows:>9d} OOL-Zeilen  {seconds:8.3f} s  {peak_mb:9.1f} MB")
+    
+    return results
+
+def compare_results(baseline: List[Dict[str, Any]], current: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """
+    Vergleicht aktuelle Messwerte mit einer Baseline.
+    
+    Args:
+        baseline: Messergebnisse der Baseline
+        current: Aktuelle Messergebnisse
+        tolerance: Erlaubte relative Verschlechterung (0.2 = 20 %)
+        
+    Returns:
+        Liste der gefundenen Regressionen als Text
+    """
+    baseline_by_key = {(r['stage'], r['codices'], r['ool_rows']): r for r in baseline}
+    
+    regressions = []
+    for result in current:
+        reference = baseline_by_key.get((result['stage'], result['codices'], result['ool_rows']))
+        if reference is None:
+            continue
+        for metric, unit in [('seconds', 's'), ('peak_mb', 'MB')]:
+            delta = result[metric] - reference[metric]
+            if result[metric] > reference[metric] * (1 + tolerance) and delta > MIN_DELTA[metric]:
+                regressions.append(
+                    f"{result['stage']} ({result['codices']} Codices, {result['ool_rows']} OOL-Zeilen): "
+                    f"{metric} {reference[metric]} {unit} -> {result[metric]} {unit}"
+                )
+    return regressions
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    n_codices, n_ool_rows = value.lower().split('x')
+    return int(n_codices), int(n_ool_rows)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.benchmark", description="Benchmark des Artikel-Matchings mit synthetischen Daten")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    for name, help_text in [('run', "Messung ausführen und als Baseline speichern"), ('compare', "Messung mit einer Baseline vergleichen")]:
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("--sizes", nargs="+", type=_parse_size, default=None, help="Größen als <Codices>x<OOL-Zeilen>, z.B. 50x10000")
+        sub.add_argument("--quick", action="store_true", help="Kleines Größenraster für einen schnellen Lauf")
+        sub.add_argument("--repeat", type=int, default=1, help="Anzahl der Zeitmessungen je Schritt")
+        sub.add_argument("--seed", type=int, default=42, help="Startwert für die Testdaten")
+    
+    subparsers.choices['run'].add_argument("--out", required=True, help="Zieldatei der Baseline (JSON)")
+    subparsers.choices['compare'].add_argument("--baseline", required=True, help="Baseline-Datei (JSON)")
+    subparsers.choices['compare'].add_argument("--tolerance", type=float, default=0.2, help="Erlaubte relative Verschlechterung")
+    args = parser.parse_args(argv)
+    
+    if args.command == 'compare':
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        # Ohne Angabe werden die Größen der Baseline gemessen
+        default_sizes = sorted({(r['codices'], r['ool_rows']) for r in baseline['results']})
+    else:
+        default_sizes = DEFAULT_SIZES
+    
+    sizes = args.sizes or (QUICK_SIZES if args.quick else default_sizes)
+    results = run_benchmarks(sizes, args.repeat, args.seed)
+    
+    if args.command == 'run':
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'created': datetime.now().isoformat(timespec='seconds'),
+                    'python': platform.python_version(),
+                    'pandas': pd.__version__,
+                    'seed': args.seed
+                },
+                'results': results
+            }, f, indent=2)
+        print(f"Baseline gespeichert: {args.out}")
+        return 0
+    
+    regressions = compare_results(baseline['results'], results, args.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    if not regressions:
+        print("Keine Regressionen gefunden.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+def _default_cache_dir() -> str:
+    # Cache im Benutzerprofil statt im gemeinsamen Temp-Verzeichnis, in das jeder schreiben kann
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'eberle_matching')
+
+# Verzeichnis und Größenbegrenzung des Caches (per Umgebungsvariable anpassbar)
+CACHE_DIR = os.environ.get('EBERLE_CACHE_DIR', _default_cache_dir())
+CACHE_MAX_BYTES = int(os.environ.get('EBERLE_CACHE_MAX_MB', '512')) * 1024 * 1024
+
+# Größenbegrenzung und Lebensdauer des Ergebnis-Caches im Arbeitsspeicher
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('EBERLE_RESULT_CACHE_MB', '256')) * 1024 * 1024
+RESULT_CACHE_TTL_SECONDS = int(os.environ.get('EBERLE_RESULT_CACHE_TTL_H', '8')) * 3600
+
+# Version der gespeicherten Einträge; bei Änderungen an den gespeicherten Objekten erhöhen,
+# damit Einträge einer älteren Programmversion nicht mehr gelesen werden
+CACHE_VERSION = 1
+
+def private_directory(path: str) -> str:
+    """
+    Legt ein Verzeichnis an, auf das nur der aktuelle Benutzer zugreifen kann.
+    
+    Der Cache enthält Pickle-Dateien, die beim Lesen Code ausführen können;
+    wer in das Verzeichnis schreiben darf, könnte darüber Code einschleusen.
+    
+    Args:
+        path: Pfad des Verzeichnisses
+        
+    Returns:
+        Der Pfad des Verzeichnisses
+        
+    Raises:
+        PermissionError: Wenn das Verzeichnis einem anderen Benutzer gehört
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    
+    # Unter Windows schützen die Zugriffsrechte des Benutzerprofils das Verzeichnis
+    if os.name == 'posix':
+        stat = os.stat(path)
+        if stat.st_uid != os.getuid():
+            raise PermissionError(f"Das Cache-Verzeichnis {path} gehört einem anderen Benutzer.")
+        if stat.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    
+    return path
+
+def file_hash(uploaded_file) -> str:
+    """
+    Berechnet den SHA-256-Hash des Inhalts einer hochgeladenen Datei.
+    
+    Args:
+        uploaded_file: Die hochgeladene Datei vom Streamlit-Uploader (oder ein anderes Dateiobjekt)
+        
+    Returns:
+        Hexadezimaler SHA-256-Hash
+    """
+    if hasattr(uploaded_file, 'getvalue'):
+        return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    
+    data = uploaded_file.read()
+    uploaded_file.seek(0)
+    return hashlib.sha256(data).hexdigest()
+
+class ParsedFileCache:
+    """
+    Persistenter Cache für bereits eingelesene Dateien auf der Festplatte.
+    
+    Die Einträge werden über den Inhalts-Hash der hochgeladenen Datei
+    adressiert und als Pickle in einem privaten Verzeichnis gespeichert; die
+    Dateinamen enthalten CACHE_VERSION. Einträge, die sich nicht laden lassen,
+    gelten als nicht vorhanden. Überschreitet der Cache die maximale Größe,
+    werden die am längsten nicht verwendeten Einträge gelöscht.
+    """
+    
+    # Dateiendungen der Einträge, die bei der Verdrängung berücksichtigt werden
+    SUFFIXES = ('.pkl',)
+    
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        private_directory(self.directory)
+    
+    def _path(self, key: str, suffix: str = '.pkl') -> str:
+        return os.path.join(self.directory, f"v{CACHE_VERSION}-{key}{suffix}")
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Liest einen Eintrag aus dem Cache.
+        
+        Args:
+            key: Schlüssel des Eintrags, z.B. Dateityp und Inhalts-Hash
+            
+        Returns:
+            Der gespeicherte Wert oder None, wenn der Eintrag nicht vorhanden ist
+            oder sich nicht laden lässt
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except Exception:
+            # Beschädigte oder nicht mehr passende Einträge (z.B. entfernte Klassen) wie fehlende behandeln
+            return None
+        
+        # Zugriffszeit für die LRU-Verdrängung aktualisieren
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+    
+    def put(self, key: str, value: Any) -> None:
+        """
+        Speichert einen Eintrag im Cache und verdrängt bei Bedarf alte Einträge.
+        
+        Args:
+            key: Schlüssel des Eintrags
+            value: Zu speichernder Wert (muss mit pickle serialisierbar sein)
+        """
+        # Erst in eine temporäre Datei schreiben, damit parallele Leser nie halbe Einträge sehen
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        self._evict()
+    
+    def _evict(self) -> None:
+        """
+        Löscht die am längsten nicht verwendeten Einträge, bis der Cache in die Größenbegrenzung passt.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.SUFFIXES):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+class ResultCache:
+    """
+    Prozessweiter Cache für fertige Verarbeitungsergebnisse im Arbeitsspeicher.
+    
+    Die Einträge werden über die Inhalts-Hashes aller hochgeladenen Dateien und die
+    Einstellungen des Laufs adressiert. Überschreitet der Cache max_bytes, werden die
+    am längsten nicht verwendeten Einträge verdrängt; Einträge, die älter als
+    ttl_seconds sind, gelten als abgelaufen. Treffer, Fehlzugriffe und Verdrängungen
+    werden für die Anzeige gezählt.
+    """
+    
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES, ttl_seconds: float = RESULT_CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Bildet den Schlüssel eines Eintrags.
+        
+        Args:
+            *parts: Inhalts-Hashes der Dateien und Einstellungen des Laufs
+            
+        Returns:
+            Hexadezimaler SHA-256-Hash über alle Bestandteile
+        """
+        return hashlib.sha256("|".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Liest einen Eintrag aus dem Cache.
+        
+        Args:
+            key: Schlüssel des Eintrags (siehe make_key)
+            
+        Returns:
+            Der gespeicherte Wert oder None, wenn der Eintrag fehlt oder abgelaufen ist
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl_seconds:
+                self._remove(key)
+                self.evictions += 1
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            # Zuletzt verwendete Einträge stehen am Ende
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+    
+    def put(self, key: str, value: Any, size: int) -> None:
+        """
+        Speichert einen Eintrag und verdrängt bei Bedarf alte Einträge.
+        
+        Args:
+            key: Schlüssel des Eintrags (siehe make_key)
+            value: Zu speichernder Wert
+            size: Geschätzte Größe des Werts in Bytes
+        """
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time(), size, value)
+            self._bytes += size
+            
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+    
+    def discard(self, key: str) -> None:
+        """
+        Entfernt einen Eintrag, dessen Wert nicht mehr verwendbar ist, z.B. weil der
+        zugehörige Auftrag bereits gelöscht wurde.
+        
+        Args:
+            key: Schlüssel des Eintrags (siehe make_key)
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.evictions += 1
+    
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Liefert die Zähler des Caches.
+        
+        Returns:
+            Dictionary mit 'hits', 'misses', 'evictions', 'entries' und 'bytes'
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
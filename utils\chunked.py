@@ -0,0 +1,130 @@
+import os
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.normalization import normalize_ool
+from utils.data_processing import (
+    TranslatorIndex,
+    prepare_codices,
+    build_artikel_lookup,
+    match_ool_keys,
+    combine_fuzzy_treffer,
+    enrich_ool,
+    build_summary
+)
+from utils.file_utils import iter_excel_chunks, create_chunked_excel
+from utils.fuzzy import build_fuzzy_index, match_ool_fuzzy, fuzzy_row_indices
+from utils.instrumentation import PipelineMetrics
+
+# Zeilen je Block; bestimmt den Spitzenspeicher der blockweisen Verarbeitung (per Umgebungsvariable anpassbar)
+CHUNK_ROWS = int(os.environ.get('EBERLE_CHUNK_ROWS', '50000'))
+
+# Open Order Lists ab dieser Dateigröße werden in der App standardmäßig blockweise verarbeitet
+CHUNKED_MIN_BYTES = int(os.environ.get('EBERLE_CHUNKED_AB_MB', '20')) * 1024 * 1024
+
+# Anzahl Treffer, deren erweiterte Zeilen für die Vorschau aufbewahrt werden
+PREVIEW_MATCHES = 5
+
+def process_ool_chunked(top50_df: pd.DataFrame, translator_df: pd.DataFrame, ool_file, output, translator_index: Optional[TranslatorIndex] = None, metrics: Optional[PipelineMetrics] = None, multi_codice: str = 'last', fuzzy_distance: int = 0, chunk_rows: int = CHUNK_ROWS, on_chunk: Optional[Callable[[int], None]] = None, highlight_rules: Optional[List[Tuple[str, Dict[str, Any]]]] = None) -> Tuple[List[Any], pd.DataFrame, List[Any], pd.DataFrame, int]:
+    """
+    Gleicht eine Open Order List blockweise ab und schreibt die markierte OOL direkt in die Ausgabedatei.
+    
+    Die OOL wird mit einem Streaming-Reader in Blöcken zu chunk_rows Zeilen
+    gelesen, gegen die einmal aufgebaute Nachschlagetabelle abgeglichen und
+    sofort exportiert. Der Spitzenspeicher hängt damit von der Blockgröße ab,
+    nicht von der Dateigröße; aufbewahrt werden nur die Treffer. Markierung,
+    Zusammenfassung und Exportdatei entsprechen einem Lauf mit
+    data_processing.process_all_data.
+    
+    Args:
+        top50_df: DataFrame der Top-50-Liste
+        translator_df: DataFrame der Übersetzungsdatei
+        ool_file: Open Order List als Pfad, Dateiobjekt oder Bytes
+        output: Zieldatei der markierten OOL (Pfad oder beschreibbares Dateiobjekt)
+        translator_index: Optional bereits aufgebauter Index der Übersetzungsdatei
+        metrics: Optionale Messung der Verarbeitungsschritte ('codices', 'uebersetzung',
+            'bloecke', 'zusammenfassung')
+        multi_codice: Regel für OOL-Zeilen, die mehrere Codices finden (siehe data_processing.enrich_ool)
+        fuzzy_distance: Größter Editierabstand für den unscharfen Abgleich (0 = aus)
+        chunk_rows: Anzahl Zeilen je Block
+        on_chunk: Wird nach jedem Block mit der Anzahl bisher verarbeiteter Zeilen aufgerufen,
+            z.B. für Fortschritt und Abbruch
+        highlight_rules: Regeln für die bedingte Formatierung der markierten OOL
+            (siehe file_utils.HIGHLIGHT_RULES) statt Zeilenformaten
+        
+    Returns:
+        Ein Tuple aus:
+        - Liste von Zeilenindizes in der Open Order List, die hervorgehoben werden sollen
+        - Zusammenfassung als DataFrame (siehe data_processing.build_summary)
+        - Zeilenindizes unscharfer Treffer
+        - Erweiterte Zeilen der ersten PREVIEW_MATCHES Treffer für die Vorschau
+        - Anzahl Zeilen der Open Order List
+    """
+    if metrics is None:
+        metrics = PipelineMetrics()
+    
+    codices_data, varianten_listen = prepare_codices(top50_df, translator_df, translator_index, metrics)
+    
+    treffer_bloecke = []
+    fuzzy_bloecke = []
+    markierung_bloecke = []
+    fuzzy_indices = []
+    vorschau_treffer = None
+    vorschau = None
+    zeilen = 0
+    
+    def bloecke():
+        nonlocal vorschau_treffer, vorschau, zeilen
+        
+        # Nachschlagetabelle und Fehlerindex einmal für alle Blöcke aufbauen
+        lookup = build_artikel_lookup(varianten_listen)
+        fuzzy_index = build_fuzzy_index(varianten_listen, fuzzy_distance) if fuzzy_distance > 0 else None
+        
+        for chunk in iter_excel_chunks(ool_file, 'ool', chunk_rows):
+            ool_keys = normalize_ool(chunk)
+            treffer = match_ool_keys(ool_keys, lookup)
+            
+            markierung = treffer
+            if fuzzy_index is not None:
+                fuzzy_treffer = match_ool_fuzzy(ool_keys, varianten_listen, treffer, fuzzy_distance, fuzzy_index)
+                markierung = combine_fuzzy_treffer(treffer, fuzzy_treffer)
+                fuzzy_bloecke.append(fuzzy_treffer.assign(ool_pos=fuzzy_treffer['ool_pos'] + zeilen))
+            
+            chunk_indices, chunk_extended = enrich_ool(chunk, codices_data, markierung, multi_codice)
+            chunk_fuzzy = fuzzy_row_indices(chunk_extended)
+            
+            # Treffer mit Positionen in der gesamten OOL aufbewahren; der Index zählt die Zeilen fort
+            treffer_bloecke.append(treffer.assign(ool_pos=treffer['ool_pos'] + zeilen))
+            markierung_bloecke.append(markierung[['codice_pos', 'ool_pos']].assign(ool_pos=markierung['ool_pos'] + zeilen))
+            fuzzy_indices.extend(chunk_fuzzy)
+            
+            # Vorschau: Zeilen der bisher ersten Treffer in der Reihenfolge der Markierung
+            kandidaten = markierung_bloecke[-1] if vorschau_treffer is None else pd.concat([vorschau_treffer, markierung_bloecke[-1]])
+            vorschau_treffer = kandidaten.sort_values(['codice_pos', 'ool_pos'], kind='stable').head(PREVIEW_MATCHES)
+            neue_zeilen = chunk_extended[chunk_extended.index.isin(vorschau_treffer['ool_pos'])]
+            vorschau = neue_zeilen if vorschau is None else pd.concat([vorschau[vorschau.index.isin(vorschau_treffer['ool_pos'])], neue_zeilen])
+            
+            zeilen += len(chunk)
+            yield chunk_extended, chunk_indices, chunk_fuzzy
+            
+            if on_chunk is not None:
+                on_chunk(zeilen)
+    
+    with metrics.stage('bloecke') as stage:
+        create_chunked_excel(output, bloecke(), highlight_rules)
+        stage['rows'] = zeilen
+    
+    # Gleiche Reihenfolge wie bei der vollständigen Verarbeitung: nach Codice, dann OOL-Zeile
+    markierung = pd.concat(markierung_bloecke, ignore_index=True).sort_values(['codice_pos', 'ool_pos'], kind='stable')
+    match_indices = markierung['ool_pos'].tolist()
+    
+    with metrics.stage('zusammenfassung') as stage:
+        treffer = pd.concat(treffer_bloecke, ignore_index=True).sort_values(['codice_pos', 'ool_pos'], kind='stable')
+        fuzzy_treffer = None
+        if fuzzy_bloecke:
+            fuzzy_treffer = pd.concat(fuzzy_bloecke, ignore_index=True).sort_values(['codice_pos', 'ool_pos'], kind='stable')
+        
+        summary_data = build_summary(codices_data, varianten_listen, treffer, pd.RangeIndex(zeilen), fuzzy_treffer)
+        stage['rows'] = len(summary_data)
+    
+    return match_indices, summary_data, fuzzy_indices, vorschau, zeilen
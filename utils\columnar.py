@@ -0,0 +1,152 @@
+import importlib.util
+import os
+import tempfile
+import pandas as pd
+from typing import Optional, Tuple
+
+from utils.cache import CACHE_DIR, CACHE_MAX_BYTES, ParsedFileCache, file_hash
+from utils.file_utils import load_excel_file, VALIDATORS
+from utils.normalization import OOL_ARTIKEL_SPALTE, TRANSLATOR_CODICE_NAME, TRANSLATOR_ARTIKEL_NAME
+
+# Spaltenorientiertes Arbeitsformat, falls installiert (pip install pyarrow); sonst Pickle
+ARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+if ARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.ipc
+
+# Verzeichnis des Arbeitsformats (unterhalb des Caches für eingelesene Dateien)
+COLUMNAR_DIR = os.path.join(CACHE_DIR, 'arbeitsformat')
+
+# Kennungen mit vielen Wiederholungen werden dictionary-kodiert gespeichert
+DICTIONARY_COLUMNS = {
+    'top50': ['Codice'],
+    'translator': [TRANSLATOR_CODICE_NAME, TRANSLATOR_ARTIKEL_NAME],
+    'ool': [OOL_ARTIKEL_SPALTE]
+}
+
+class ColumnarFileCache(ParsedFileCache):
+    """
+    Arbeitsformat der hochgeladenen Dateien: einmal eingelesen und validiert,
+    danach als Arrow-Datei auf der Festplatte.
+    
+    Die Dateien werden unkomprimiert im Arrow-IPC-Format (Feather v2) geschrieben
+    und beim Lesen speicherabgebildet, sodass ein erneuter Zugriff kein XML
+    parst und die Spalten weitgehend ohne Kopie aus dem Seitencache kommen.
+    Die Spalten aus DICTIONARY_COLUMNS werden dictionary-kodiert und kommen als
+    kategoriale Spalten zurück. Ohne pyarrow, bei Spalten mit gemischten Typen
+    oder Spaltennamen, die keine Texte sind, wird der Eintrag als Pickle gespeichert.
+    """
+    
+    SUFFIXES = ('.arrow', '.pkl')
+    
+    def __init__(self, directory: str = COLUMNAR_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        super().__init__(directory, max_bytes)
+    
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Öffnet eine Datei im Arbeitsformat.
+        
+        Args:
+            key: Schlüssel des Eintrags, z.B. Dateityp und Inhalts-Hash
+            
+        Returns:
+            Speicherabgebildetes DataFrame oder None, wenn der Eintrag nicht vorhanden ist
+            oder sich nicht laden lässt
+        """
+        path = self._path(key, '.arrow')
+        if not ARROW_AVAILABLE or not os.path.exists(path):
+            return super().get(key)
+        
+        try:
+            with pa.memory_map(path, 'r') as source:
+                df = pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+        except Exception:
+            return None
+        
+        # Zugriffszeit für die LRU-Verdrängung aktualisieren
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return df
+    
+    def put(self, key: str, df: pd.DataFrame, file_type: Optional[str] = None) -> pd.DataFrame:
+        """
+        Speichert ein eingelesenes DataFrame im Arbeitsformat.
+        
+        Args:
+            key: Schlüssel des Eintrags
+            df: Eingelesene und validierte Datei
+            file_type: Dateityp ('top50', 'translator' oder 'ool'); bestimmt die dictionary-kodierten Spalten
+            
+        Returns:
+            Das speicherabgebildete DataFrame aus dem Arbeitsformat, mit dem die
+            weiteren Schritte arbeiten sollen (bei Pickle das übergebene DataFrame)
+        """
+        table = self._to_table(df, file_type)
+        if table is None:
+            super().put(key, df)
+            return df
+        
+        # Erst in eine temporäre Datei schreiben, damit parallele Leser nie halbe Einträge sehen
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                with pa.ipc.new_file(f, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, self._path(key, '.arrow'))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        self._evict()
+        mapped = self.get(key)
+        return df if mapped is None else mapped
+    
+    @staticmethod
+    def _to_table(df: pd.DataFrame, file_type: Optional[str]):
+        # Arrow-Tabelle mit dictionary-kodierten Kennungen oder None, wenn sich die Daten nicht verlustfrei abbilden lassen
+        if not ARROW_AVAILABLE or not all(isinstance(column, str) for column in df.columns):
+            return None
+        
+        kategorien = {
+            column: df[column].astype('category')
+            for column in DICTIONARY_COLUMNS.get(file_type, [])
+            if column in df.columns
+        }
+        try:
+            return pa.Table.from_pandas(df.assign(**kategorien))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            return None
+
+def load_columnar(path: str, file_type: str, cache: Optional[ColumnarFileCache] = None) -> Tuple[pd.DataFrame, bool, bool]:
+    """
+    Lädt eine Excel-Datei über das Arbeitsformat, z.B. für wiederholte Läufe der Stapelverarbeitung.
+    
+    Ist die Datei mit demselben Inhalt bereits im Arbeitsformat vorhanden, wird sie
+    speicherabgebildet statt neu geparst; sonst wird sie geladen, validiert und
+    (falls gültig) einmal ins Arbeitsformat übernommen.
+    
+    Args:
+        path: Pfad zur Excel-Datei
+        file_type: Dateityp ('top50', 'translator' oder 'ool')
+        cache: Optional bereits geöffneter ColumnarFileCache
+        
+    Returns:
+        Ein Tuple aus DataFrame, Gültigkeit und ob die Datei aus dem Arbeitsformat kam
+    """
+    if cache is None:
+        cache = ColumnarFileCache()
+    
+    with open(path, 'rb') as f:
+        key = f"{file_type}-{file_hash(f)}"
+    
+    df = cache.get(key)
+    if df is not None:
+        return df, True, True
+    
+    df = load_excel_file(path, file_type)
+    if not VALIDATORS[file_type](df):
+        return df, False, False
+    return cache.put(key, df, file_type), True, False
@@ -1,5 +1,15 @@
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple, Any, Set
+from typing import List, Dict, Tuple, Any, Optional
+
+from utils.normalization import (
+    VARIANTEN_SPALTEN,
+    normalize_artikel,
+    normalize_ool,
+    normalize_translator
+)
+from utils.instrumentation import PipelineMetrics
+from utils.fuzzy import STATUS_UNSCHARF, match_ool_fuzzy
 
 def extract_codices_from_top50(top50_df: pd.DataFrame) -> List[Dict[str, Any]]:
     """
@@ -13,54 +23,202 @@ def extract_codices_from_top50(top50_df: pd.DataFrame) -> List[Dict[str, Any]]:
     """
     # Nur Zeilen mit gültigen Codices betrachten (nicht NaN)
     valid_rows = top50_df.dropna(subset=['Codice'])
+    full_codice = valid_rows['Codice'].astype(object)
+    
+    # Codice in den Teil vor und nach # aufteilen (Codices ohne # bleiben unverändert, auch wenn sie keine Texte sind)
+    text = full_codice.astype(str)
+    base_codice = full_codice.where(~text.str.contains('#', regex=False), text.str.split('#').str[0])
+    
+    # Informationen sammeln; fehlende Spalten ergeben None
+    codices = pd.DataFrame({
+        'full_codice': full_codice,
+        'base_codice': base_codice,
+        'lagerbestand': valid_rows.get('Lagerbestand'),
+        'kundenauftraege': valid_rows.get('Kundenauftraegen'),
+        'monatlicher_verbrauch': valid_rows.get('Montatlicher Verbrauch')
+    }, index=valid_rows.index)
+    
+    return codices.to_dict('records')
+
+class TranslatorIndex:
+    """
+    Index der Übersetzungsdatei, der einmalig aus Spalte D (Basis-Codice) und
+    Spalte Q (Artikelnummer) aufgebaut wird und danach für beliebig viele
+    Codices und Verarbeitungsläufe wiederverwendet werden kann.
+    """
+    
+    def __init__(self, normalisiert: pd.DataFrame):
+        self._normalisiert = normalisiert
+        
+        # Zeilenpositionen je Basis-Codice
+        self._positionen = {}
+        for pos, codice in enumerate(normalisiert['codice']):
+            self._positionen.setdefault(codice, []).append(pos)
+    
+    @classmethod
+    def from_dataframe(cls, translator_df: pd.DataFrame) -> 'TranslatorIndex':
+        """
+        Baut den Index aus der Übersetzungsdatei auf.
+        
+        Args:
+            translator_df: DataFrame der Übersetzungsdatei
+            
+        Returns:
+            TranslatorIndex mit allen Artikelnummern je Basis-Codice
+        """
+        return cls(normalize_translator(translator_df))
     
-    result = []
-    for _, row in valid_rows.iterrows():
-        full_codice = row['Codice']
-        # Codice in den Teil vor und nach # aufteilen
-        if '#' in str(full_codice):
-            base_codice = full_codice.split('#')[0]
-        else:
-            base_codice = full_codice
+    def get(self, base_codice: Any) -> List[str]:
+        """
+        Liefert die Artikelnummern zu einem Basis-Codice in der Reihenfolge der Übersetzungsdatei.
+        
+        Args:
+            base_codice: Der Basis-Codice (ohne #-Teil)
             
-        # Informationen sammeln
-        entry = {
-            'full_codice': full_codice,
-            'base_codice': base_codice,
-            'lagerbestand': row.get('Lagerbestand', None),
-            'kundenauftraege': row.get('Kundenauftraegen', None),
-            'monatlicher_verbrauch': row.get('Montatlicher Verbrauch', None)
-        }
-        result.append(entry)
+        Returns:
+            Eine Liste von Artikelnummern (leer, wenn der Codice unbekannt ist)
+        """
+        return self.varianten(base_codice)['artikel_no'].tolist()
+    
+    def varianten(self, base_codice: Any) -> pd.DataFrame:
+        """
+        Liefert die normalisierten Artikelnummern zu einem Basis-Codice.
         
-    return result
+        Args:
+            base_codice: Der Basis-Codice (ohne #-Teil)
+            
+        Returns:
+            DataFrame mit den Spalten aus normalization.normalize_artikel
+        """
+        positionen = self._positionen.get(base_codice, [])
+        return self._normalisiert.iloc[positionen][VARIANTEN_SPALTEN]
+    
+    def __contains__(self, base_codice: Any) -> bool:
+        return base_codice in self._positionen
+    
+    def __len__(self) -> int:
+        return len(self._positionen)
 
-def get_artikelnummern_for_codice(translator_df: pd.DataFrame, base_codice: str) -> List[str]:
+def get_artikelnummern_for_codice(translator_df: pd.DataFrame, base_codice: str, translator_index: Optional[TranslatorIndex] = None) -> List[str]:
     """
     Findet alle Artikelnummern für einen gegebenen Basis-Codice in der Übersetzungsdatei.
     
     Args:
         translator_df: DataFrame der Übersetzungsdatei
         base_codice: Der Basis-Codice (ohne #-Teil)
+        translator_index: Bereits aufgebauter Index; wird ohne Index aufgerufen,
+            wird er aus translator_df erstellt
         
     Returns:
         Eine Liste von Artikelnummern, die dem Basis-Codice entsprechen
     """
-    # Spalte D (Index 3) enthält den Basis-Codice
-    # Spalte Q (Index 16) enthält die Artikelnummer
+    if translator_index is None:
+        translator_index = TranslatorIndex.from_dataframe(translator_df)
     
-    # Alle Zeilen finden, in denen Spalte D dem Basis-Codice entspricht
-    matching_rows = translator_df[translator_df.iloc[:, 3] == base_codice]
+    return translator_index.get(base_codice)
+
+def build_artikel_lookup(varianten_listen: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Baut eine kombinierte Nachschlagetabelle aller übersetzten Artikelnummern.
     
-    # Artikelnummern aus Spalte Q extrahieren
-    artikelnummern = []
-    for _, row in matching_rows.iterrows():
-        if pd.notna(row.iloc[16]):  # Prüfen, ob die Zelle nicht NaN ist
-            artikelnummern.append(str(row.iloc[16]))
-            
-    return artikelnummern
+    Args:
+        varianten_listen: Normalisierte Artikelnummern je Codice (siehe
+            normalization.normalize_artikel), in der Reihenfolge der Codices
+        
+    Returns:
+        DataFrame mit den Spalten 'schluessel' (Formatvariante) und 'codice_pos'
+        (Position des Codice in varianten_listen)
+    """
+    if not varianten_listen:
+        return pd.DataFrame({'schluessel': pd.Series(dtype=object), 'codice_pos': pd.Series(dtype='int64')})
+    
+    alle = pd.concat(varianten_listen, ignore_index=True)
+    alle['codice_pos'] = np.repeat(np.arange(len(varianten_listen)), [len(v) for v in varianten_listen])
+    
+    # Jede Formatvariante wird zu einem eigenen Schlüssel
+    lookup = alle.melt(id_vars='codice_pos', value_vars=VARIANTEN_SPALTEN, value_name='schluessel')
+    lookup = lookup.dropna(subset=['schluessel']).drop_duplicates(subset=['schluessel', 'codice_pos'])
+    
+    return lookup[['schluessel', 'codice_pos']].astype({'schluessel': object}).reset_index(drop=True)
 
-def find_matches_in_ool(ool_df: pd.DataFrame, artikelnummern: List[str], codice_info: Dict[str, Any]) -> Tuple[List[int], List[Dict[str, Any]]]:
+def match_ool_keys(ool_keys: pd.DataFrame, lookup: pd.DataFrame) -> pd.DataFrame:
+    """
+    Löst alle Übereinstimmungen zwischen OOL und Nachschlagetabelle in einem Join auf.
+    
+    Args:
+        ool_keys: Normalisierte OOL-Schlüssel aus normalization.normalize_ool
+        lookup: Nachschlagetabelle aus build_artikel_lookup
+        
+    Returns:
+        DataFrame mit den Spalten 'codice_pos', 'ool_pos' und 'artikel_no',
+        sortiert nach Codice und anschließend nach OOL-Zeile
+    """
+    direkt = ool_keys.merge(lookup, left_on='artikel_no', right_on='schluessel')
+    ohne_7 = ool_keys.merge(lookup, left_on='artikel_ohne_7', right_on='schluessel')
+    
+    treffer = pd.concat([direkt, ohne_7], ignore_index=True)
+    treffer = treffer.drop_duplicates(subset=['codice_pos', 'ool_pos'])
+    treffer = treffer.sort_values(['codice_pos', 'ool_pos'], kind='stable')
+    
+    return treffer[['codice_pos', 'ool_pos', 'artikel_no']].reset_index(drop=True)
+
+def match_summary_articles(varianten_listen: List[pd.DataFrame], treffer: pd.DataFrame, ool_index: pd.Index) -> List[List[Any]]:
+    """
+    Ermittelt für jede übersetzte Artikelnummer, welche OOL-Zeilen ihres Codice sie abdecken.
+    
+    Eine Artikelnummer gilt als gefunden, wenn sie selbst oder ihre Variante mit
+    führender '7' in einer gefundenen OOL-Artikelnummer desselben Codice enthalten
+    ist oder diese umgekehrt enthält. Die Paare aus Variante und gefundener
+    Artikelnummer je Codice entstehen per Join; nur der Teilzeichenketten-Vergleich
+    je Paar läuft elementweise, da es dafür keine spaltenweise Operation gibt.
+    
+    Args:
+        varianten_listen: Normalisierte Artikelnummern je Codice, in der Reihenfolge der Codices
+        treffer: Ergebnis von match_ool_keys für dieselben Codices
+        ool_index: Index der Open Order List
+        
+    Returns:
+        Je übersetzter Artikelnummer (alle Codices hintereinander) die Liste der
+        OOL-Zeilenindizes (leer, wenn nicht gefunden)
+    """
+    anzahl = [len(varianten) for varianten in varianten_listen]
+    if sum(anzahl) == 0:
+        return []
+    
+    alle = pd.concat(varianten_listen, ignore_index=True)
+    alle['codice_pos'] = np.repeat(np.arange(len(varianten_listen)), anzahl)
+    alle['zeile'] = np.arange(len(alle))
+    
+    # Original und ggf. Variante mit führender 7 je übersetzter Artikelnummer
+    varianten = alle.melt(id_vars=['codice_pos', 'zeile'], value_vars=['artikel_no', 'artikel_mit_7'], value_name='variante')
+    varianten = varianten.dropna(subset=['variante'])
+    
+    # Jede Variante mit jeder gefundenen OOL-Artikelnummer desselben Codice paaren
+    gefundene = treffer[['codice_pos', 'artikel_no']].drop_duplicates()
+    paare = varianten[['codice_pos', 'zeile', 'variante']].merge(gefundene, on='codice_pos')
+    enthalten = np.fromiter(
+        (variante in artikel or artikel in variante for variante, artikel in zip(paare['variante'], paare['artikel_no'])),
+        dtype=bool, count=len(paare)
+    )
+    
+    # OOL-Zeilen der passenden Artikelnummern, je übersetzter Artikelnummer aufsteigend
+    passend = paare.loc[enthalten, ['zeile', 'codice_pos', 'artikel_no']]
+    zeilen = passend.merge(treffer[['codice_pos', 'artikel_no', 'ool_pos']], on=['codice_pos', 'artikel_no'])
+    zeilen = zeilen.drop_duplicates(subset=['zeile', 'ool_pos']).sort_values(['zeile', 'ool_pos'])
+    
+    zeile = zeilen['zeile'].to_numpy()
+    ool_zeilen = ool_index[zeilen['ool_pos'].to_numpy()].tolist()
+    
+    # Zusammenhängende Abschnitte je übersetzter Artikelnummer als Listen übernehmen
+    anfaenge = np.flatnonzero(np.diff(zeile, prepend=-1))
+    enden = np.append(anfaenge[1:], len(zeile))
+    ergebnis = [[] for _ in range(len(alle))]
+    for position, anfang, ende in zip(zeile[anfaenge], anfaenge, enden):
+        ergebnis[position] = ool_zeilen[anfang:ende]
+    
+    return ergebnis
+
+def find_matches_in_ool(ool_df: pd.DataFrame, artikelnummern: List[str], codice_info: Dict[str, Any]) -> Tuple[List[int], pd.DataFrame]:
     """
     Findet Übereinstimmungen zwischen Artikelnummern und der Open Order List.
     Fügt auch zusätzliche Informationen aus dem Codice hinzu.
@@ -73,57 +231,227 @@ def find_matches_in_ool(ool_df: pd.DataFrame, artikelnummern: List[str], codice_
     Returns:
         Ein Tuple aus:
         - Liste von Zeilenindizes mit Übereinstimmungen
-        - Liste von Dictionaries mit den gefundenen Zeilen und Informationen
-    """
-    match_indices = []
-    matched_rows = []
-    
-    # Artikelnummern vorbereiten - verschiedene Formate berücksichtigen
-    artikelnummern_set = set()
-    for art in artikelnummern:
-        # Das Original-Format hinzufügen
-        artikelnummern_set.add(art)
-        
-        # Format für Integer-Vergleich hinzufügen (ohne führende Nullen)
-        try:
-            numeric_art = str(int(float(art)))
-            artikelnummern_set.add(numeric_art)
-        except (ValueError, TypeError):
-            pass
-        
-        # Format mit führender '7' hinzufügen für potenziellen Vergleich mit OOL
-        if not art.startswith('7') and art.isdigit():
-            artikelnummern_set.add('7' + art)
-    
-    # Jede Zeile in der Open Order List überprüfen
-    for idx, row in ool_df.iterrows():
-        # Konvertiere die OOL-Artikelnummer in verschiedene Formate für den Vergleich
-        ool_artikel = row['artikel no']
-        ool_artikel_str = str(ool_artikel)
-        
-        # Auch Format ohne führende '7' in Betracht ziehen
-        ool_ohne_7 = ool_artikel_str[1:] if ool_artikel_str.startswith('7') else ool_artikel_str
-        
-        # Überprüfe alle möglichen Formate
-        if (ool_artikel_str in artikelnummern_set or 
-            ool_ohne_7 in artikelnummern_set):
-            match_indices.append(idx)
-            matched_rows.append({
-                'artikel_no': ool_artikel_str,
-                'abmessung': row.get('Abmessung', ''),
-                'gesamtmenge': row.get('Gesamtmenge', ''),
-                'offene_menge': row.get('offene Menge', ''),
-                # Zusätzliche Informationen aus dem Codice
-                'lagerbestand': codice_info.get('lagerbestand', None),
-                'kundenauftraege': codice_info.get('kundenauftraege', None),
-                'monatlicher_verbrauch': codice_info.get('monatlicher_verbrauch', None),
-                'full_codice': codice_info.get('full_codice', None),
-                'base_codice': codice_info.get('base_codice', None)
-            })
-            
+        - DataFrame mit einer Zeile je Übereinstimmung und den Informationen des Codice
+    """
+    varianten = normalize_artikel(pd.Series(artikelnummern, dtype=object))
+    treffer = match_ool_keys(normalize_ool(ool_df), build_artikel_lookup([varianten]))
+    
+    match_indices = ool_df.index[treffer['ool_pos']].tolist()
+    rows = ool_df.iloc[treffer['ool_pos'].to_numpy()]
+    
+    def ool_spalte(name):
+        # Fehlende Spalten ergeben leere Einträge
+        return rows[name].to_numpy() if name in rows.columns else ''
+    
+    matched_rows = pd.DataFrame({
+        'artikel_no': treffer['artikel_no'].to_numpy(),
+        'abmessung': ool_spalte('Abmessung'),
+        'gesamtmenge': ool_spalte('Gesamtmenge'),
+        'offene_menge': ool_spalte('offene Menge'),
+        # Zusätzliche Informationen aus dem Codice, einmal je Spalte statt je Zeile
+        'lagerbestand': codice_info.get('lagerbestand', None),
+        'kundenauftraege': codice_info.get('kundenauftraege', None),
+        'monatlicher_verbrauch': codice_info.get('monatlicher_verbrauch', None),
+        'full_codice': pd.Categorical([codice_info.get('full_codice', None)] * len(treffer)),
+        'base_codice': pd.Categorical([codice_info.get('base_codice', None)] * len(treffer))
+    })
+    
     return match_indices, matched_rows
 
-def process_all_data(top50_df: pd.DataFrame, translator_df: pd.DataFrame, ool_df: pd.DataFrame) -> Tuple[List[int], List[Dict[str, Any]], pd.DataFrame]:
+def prepare_codices(top50_df: pd.DataFrame, translator_df: pd.DataFrame, translator_index: Optional[TranslatorIndex] = None, metrics: Optional[PipelineMetrics] = None) -> Tuple[List[Dict[str, Any]], List[pd.DataFrame]]:
+    """
+    Extrahiert die Codices und holt die normalisierten Artikelnummern aus dem Übersetzungsindex.
+    
+    Args:
+        top50_df: DataFrame der Top-50-Liste
+        translator_df: DataFrame der Übersetzungsdatei
+        translator_index: Optional bereits aufgebauter Index der Übersetzungsdatei
+        metrics: Optionale Messung der Schritte 'codices' und 'uebersetzung'
+        
+    Returns:
+        Ein Tuple aus:
+        - Liste der Codices (siehe extract_codices_from_top50)
+        - Normalisierte Artikelnummern je Codice
+    """
+    if metrics is None:
+        metrics = PipelineMetrics()
+    
+    # Codices aus der Top-50-Liste extrahieren
+    with metrics.stage('codices', len(top50_df)):
+        codices_data = extract_codices_from_top50(top50_df)
+    
+    with metrics.stage('uebersetzung', len(codices_data)) as stage:
+        # Übersetzungsindex nur einmal aufbauen
+        if translator_index is None:
+            translator_index = TranslatorIndex.from_dataframe(translator_df)
+        
+        # Normalisierte Artikelnummern für alle Basis-Codices aus dem Index holen
+        varianten_listen = [
+            translator_index.varianten(codice_entry['base_codice'])
+            for codice_entry in codices_data
+        ]
+        stage['rows'] = sum(len(varianten) for varianten in varianten_listen)
+    
+    return codices_data, varianten_listen
+
+# Regeln für OOL-Zeilen, die von mehreren Codices gefunden werden (siehe enrich_ool)
+MULTI_CODICE_POLICIES = ('first', 'last', 'all')
+
+# Angaben des Codice, die in die erweiterte OOL übernommen werden
+ENRICHMENT_COLUMNS = {
+    'lagerbestand': 'Lagerbestand',
+    'kundenauftraege': 'Kundenauftraege',
+    'monatlicher_verbrauch': 'Monatlicher Verbrauch',
+    'full_codice': 'Codice'
+}
+
+def enrich_ool(ool_df: pd.DataFrame, codices_data: List[Dict[str, Any]], treffer: pd.DataFrame, multi_codice: str = 'last') -> Tuple[List[Any], pd.DataFrame]:
+    """
+    Markiert die gefundenen Zeilen und ergänzt die OOL um die Informationen des Codice.
+    
+    Die Angaben werden mit einem Join aus der Treffertabelle übernommen; die
+    Spalten erhalten Datentypen mit fehlenden Werten (z.B. Float64, string).
+    Enthält treffer die Spalte 'konfidenz' (unscharfer Abgleich, siehe
+    combine_fuzzy_treffer), erhält die OOL zusätzlich die Spalte 'Konfidenz'.
+    Wird eine OOL-Zeile von mehreren Codices gefunden, gilt multi_codice:
+    
+    - 'first': Angaben des ersten Codice (Reihenfolge der Top-50-Liste)
+    - 'last': Angaben des letzten Codice (bisheriges Verhalten)
+    - 'all': die Zeile erscheint einmal je Codice, direkt untereinander
+    
+    Args:
+        ool_df: DataFrame der Open Order List
+        codices_data: Liste der Codices (siehe extract_codices_from_top50)
+        treffer: Ergebnis von match_ool_keys
+        multi_codice: Regel für mehrfach gefundene Zeilen, einer der MULTI_CODICE_POLICIES
+        
+    Returns:
+        Ein Tuple aus:
+        - Liste von Zeilenindizes in der Open Order List, die hervorgehoben werden sollen
+        - Erweitertes OOL DataFrame mit zusätzlichen Spalten
+    """
+    if multi_codice not in MULTI_CODICE_POLICIES:
+        raise ValueError(f"Unbekannte Regel für mehrfach gefundene Zeilen: {multi_codice!r}")
+    
+    # Alle zu markierenden Zeilenindizes in der Reihenfolge der Codices
+    all_match_indices = ool_df.index[treffer['ool_pos'].to_numpy()].tolist()
+    
+    zuordnung = treffer[['ool_pos', 'codice_pos'] + (['konfidenz'] if 'konfidenz' in treffer.columns else [])]
+    if multi_codice != 'all':
+        zuordnung = zuordnung.drop_duplicates(subset='ool_pos', keep=multi_codice)
+    
+    # Jede OOL-Zeile ihren Codices zuordnen; Zeilen ohne Treffer erhalten Position -1
+    zeilen = pd.DataFrame({'ool_pos': np.arange(len(ool_df))}).merge(zuordnung, on='ool_pos', how='left')
+    codice_pos = zeilen['codice_pos'].fillna(-1).astype('int64').to_numpy()
+    
+    codices = pd.DataFrame(codices_data, columns=list(ENRICHMENT_COLUMNS))
+    angaben = codices.reindex(codice_pos).rename(columns=ENRICHMENT_COLUMNS).convert_dtypes()
+    if 'konfidenz' in zeilen.columns:
+        angaben['Konfidenz'] = pd.array(zeilen['konfidenz'].to_numpy(), dtype='Float64')
+    
+    if multi_codice == 'all':
+        # Mehrfach gefundene Zeilen werden wiederholt; nur hier ist eine Kopie der OOL nötig
+        basis = ool_df.take(zeilen['ool_pos'].to_numpy())
+    else:
+        # Eine Zeile je OOL-Zeile: die vorhandenen Spalten werden ohne Kopie übernommen
+        basis = ool_df
+    
+    angaben.index = basis.index
+    ool_df_extended = basis.assign(**{column: angaben[column] for column in angaben.columns})
+    
+    return all_match_indices, ool_df_extended
+
+def combine_fuzzy_treffer(treffer: pd.DataFrame, fuzzy_treffer: pd.DataFrame) -> pd.DataFrame:
+    """
+    Führt exakte und unscharfe Treffer zu einer Treffertabelle zusammen.
+    
+    Args:
+        treffer: Exakte Treffer aus match_ool_keys
+        fuzzy_treffer: Unscharfe Treffer aus fuzzy.match_ool_fuzzy
+        
+    Returns:
+        DataFrame wie match_ool_keys mit der zusätzlichen Spalte 'konfidenz'
+        (1.0 für exakte Treffer)
+    """
+    alle = pd.concat([
+        treffer.assign(konfidenz=1.0),
+        fuzzy_treffer[['codice_pos', 'ool_pos', 'artikel_no', 'konfidenz']]
+    ], ignore_index=True)
+    alle = alle.astype({'codice_pos': 'int64', 'ool_pos': 'int64', 'konfidenz': 'float64'})
+    
+    return alle.sort_values(['codice_pos', 'ool_pos'], kind='stable').reset_index(drop=True)
+
+# Spalten der Zusammenfassung (siehe build_summary)
+SUMMARY_COLUMNS = [
+    'codice_full', 'codice_base', 'artikelnummer', 'lagerbestand',
+    'kundenauftraege', 'monatlicher_verbrauch', 'gefunden_in_ool', 'ool_zeilen'
+]
+
+def build_summary(codices_data: List[Dict[str, Any]], varianten_listen: List[pd.DataFrame], treffer: pd.DataFrame, ool_index: pd.Index, fuzzy_treffer: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Erstellt die Daten für die Zusammenfassungsdatei spaltenweise.
+    
+    Jede übersetzte Artikelnummer ergibt eine Zeile; die Angaben des Codice werden
+    über seine Position übernommen statt je Zeile kopiert.
+    
+    Args:
+        codices_data: Liste der Codices (siehe extract_codices_from_top50)
+        varianten_listen: Normalisierte Artikelnummern je Codice
+        treffer: Ergebnis von match_ool_keys
+        ool_index: Index der Open Order List
+        fuzzy_treffer: Optionale unscharfe Treffer aus fuzzy.match_ool_fuzzy; nicht exakt
+            gefundene Artikelnummern mit unscharfem Treffer erhalten den Status "Unscharf"
+        
+    Returns:
+        DataFrame mit den Spalten aus SUMMARY_COLUMNS (mit fuzzy_treffer zusätzlich
+        'konfidenz'); 'codice_full' und 'codice_base' sind kategorial, 'ool_zeilen'
+        enthält je Zeile die Liste der OOL-Zeilenindizes
+    """
+    columns = SUMMARY_COLUMNS + (['konfidenz'] if fuzzy_treffer is not None else [])
+    if not codices_data:
+        return pd.DataFrame({column: pd.Series(dtype=object) for column in columns})
+    
+    # Abdeckung der Artikelnummern für die Zusammenfassung bestimmen
+    ool_zeilen = match_summary_articles(varianten_listen, treffer, ool_index)
+    
+    # Position des Codice je Artikelnummer
+    codice_pos = np.repeat(np.arange(len(varianten_listen)), [len(varianten) for varianten in varianten_listen])
+    codices = pd.DataFrame(codices_data).take(codice_pos)
+    
+    artikelnummern = [varianten['artikel_no'].to_numpy() for varianten in varianten_listen]
+    gefunden = np.fromiter((len(zeilen) > 0 for zeilen in ool_zeilen), dtype=bool, count=len(ool_zeilen))
+    
+    summary = pd.DataFrame({
+        'codice_full': pd.Categorical(codices['full_codice']),
+        'codice_base': pd.Categorical(codices['base_codice']),
+        'artikelnummer': np.concatenate(artikelnummern) if artikelnummern else np.array([], dtype=object),
+        'lagerbestand': codices['lagerbestand'].to_numpy(),
+        'kundenauftraege': codices['kundenauftraege'].to_numpy(),
+        'monatlicher_verbrauch': codices['monatlicher_verbrauch'].to_numpy(),
+        'gefunden_in_ool': np.where(gefunden, "Ja", "Nein").astype(object),
+        'ool_zeilen': pd.Series(ool_zeilen, dtype=object).to_numpy()
+    })
+    
+    if fuzzy_treffer is not None:
+        summary['konfidenz'] = np.where(gefunden, 1.0, np.nan)
+        
+        # Beste unscharfe Treffer je Codice und übersetzter Artikelnummer
+        unscharf = fuzzy_treffer.assign(zeile=ool_index[fuzzy_treffer['ool_pos'].to_numpy()])
+        unscharf = unscharf.groupby(['codice_pos', 'uebersetzt'], sort=False).agg(
+            zeilen=('zeile', list), konfidenz=('konfidenz', 'max')
+        )
+        
+        schluessel = pd.MultiIndex.from_arrays([codice_pos, summary['artikelnummer'].to_numpy()])
+        passend = unscharf.reindex(schluessel)
+        ersetzen = ~gefunden & passend['konfidenz'].notna().to_numpy()
+        
+        summary.loc[ersetzen, 'gefunden_in_ool'] = STATUS_UNSCHARF
+        summary.loc[ersetzen, 'konfidenz'] = passend['konfidenz'].to_numpy()[ersetzen]
+        summary.loc[ersetzen, 'ool_zeilen'] = pd.Series(passend['zeilen'].to_numpy()[ersetzen], index=summary.index[ersetzen], dtype=object)
+    
+    return summary
+
+def process_all_data(top50_df: pd.DataFrame, translator_df: pd.DataFrame, ool_df: pd.DataFrame, translator_index: Optional[TranslatorIndex] = None, metrics: Optional[PipelineMetrics] = None, multi_codice: str = 'last', fuzzy_distance: int = 0) -> Tuple[List[int], pd.DataFrame, pd.DataFrame]:
     """
     Verarbeitet alle Daten und führt den gesamten Matchingprozess durch.
     
@@ -131,74 +459,40 @@ def process_all_data(top50_df: pd.DataFrame, translator_df: pd.DataFrame, ool_df
         top50_df: DataFrame der Top-50-Liste
         translator_df: DataFrame der Übersetzungsdatei
         ool_df: DataFrame der Open Order List
+        translator_index: Optional bereits aufgebauter Index der Übersetzungsdatei,
+            z.B. aus einem früheren Lauf
+        metrics: Optionale Messung der Verarbeitungsschritte ('codices', 'uebersetzung',
+            'abgleich', 'zusammenfassung')
+        multi_codice: Regel für OOL-Zeilen, die mehrere Codices finden (siehe enrich_ool)
+        fuzzy_distance: Größter Editierabstand für den unscharfen Abgleich von OOL-Zeilen
+            ohne exakten Treffer (0 = aus)
         
     Returns:
         Ein Tuple aus:
         - Liste von Zeilenindizes in der Open Order List, die hervorgehoben werden sollen
-        - Liste von Dictionaries für die Zusammenfassungsdatei
+        - Zusammenfassung als DataFrame (siehe build_summary)
         - Erweitertes OOL DataFrame mit zusätzlichen Spalten
     """
-    # Alle zu markierenden Zeilenindizes sammeln
-    all_match_indices = []
+    if metrics is None:
+        metrics = PipelineMetrics()
     
-    # Daten für die Zusammenfassungsdatei
-    summary_data = []
+    codices_data, varianten_listen = prepare_codices(top50_df, translator_df, translator_index, metrics)
     
-    # Zusätzliche Spalten für die OOL-Datei erstellen
-    ool_df_extended = ool_df.copy()
-    ool_df_extended['Lagerbestand'] = None
-    ool_df_extended['Kundenauftraege'] = None
-    ool_df_extended['Monatlicher Verbrauch'] = None
-    ool_df_extended['Codice'] = None
+    with metrics.stage('abgleich', len(ool_df)):
+        # Alle Übereinstimmungen in der Open Order List mit einem einzigen Join finden
+        ool_keys = normalize_ool(ool_df)
+        treffer = match_ool_keys(ool_keys, build_artikel_lookup(varianten_listen))
+        
+        fuzzy_treffer = None
+        markierung = treffer
+        if fuzzy_distance > 0:
+            fuzzy_treffer = match_ool_fuzzy(ool_keys, varianten_listen, treffer, fuzzy_distance)
+            markierung = combine_fuzzy_treffer(treffer, fuzzy_treffer)
+        
+        match_indices, ool_df_extended = enrich_ool(ool_df, codices_data, markierung, multi_codice)
     
-    # Codices aus der Top-50-Liste extrahieren
-    codices_data = extract_codices_from_top50(top50_df)
-    
-    # Für jeden Codice den Prozess durchführen
-    for codice_entry in codices_data:
-        full_codice = codice_entry['full_codice']
-        base_codice = codice_entry['base_codice']
-        
-        # Artikelnummern für den Basis-Codice finden
-        artikelnummern = get_artikelnummern_for_codice(translator_df, base_codice)
-        
-        # Übereinstimmungen in der Open Order List finden
-        match_indices, matched_rows = find_matches_in_ool(ool_df, artikelnummern, codice_entry)
-        
-        # Indizes für die zu markierenden Zeilen sammeln
-        all_match_indices.extend(match_indices)
-        
-        # Zusätzliche Daten in die erweiterte OOL-Datei eintragen
-        for idx in match_indices:
-            ool_df_extended.at[idx, 'Lagerbestand'] = codice_entry.get('lagerbestand')
-            ool_df_extended.at[idx, 'Kundenauftraege'] = codice_entry.get('kundenauftraege')
-            ool_df_extended.at[idx, 'Monatlicher Verbrauch'] = codice_entry.get('monatlicher_verbrauch')
-            ool_df_extended.at[idx, 'Codice'] = full_codice
-        
-        # Zusammenfassungsdaten für jeden gefundenen Artikel sammeln
-        for artikel_no in artikelnummern:
-            # Formatvarianten der aktuellen Artikelnummer erstellen
-            artikel_no_variants = [artikel_no]  # Original
-            if not artikel_no.startswith('7') and artikel_no.isdigit():
-                artikel_no_variants.append('7' + artikel_no)  # Mit führender 7
-            
-            # Prüfen, ob eine der Varianten in den Übereinstimmungen gefunden wurde
-            matched = False
-            for variant in artikel_no_variants:
-                if any(variant in row['artikel_no'] or row['artikel_no'] in variant for row in matched_rows):
-                    matched = True
-                    break
-            
-            # Zusammenfassungseintrag erstellen
-            summary_entry = {
-                'codice_full': full_codice,
-                'codice_base': base_codice,
-                'artikelnummer': artikel_no,
-                'lagerbestand': codice_entry['lagerbestand'],
-                'kundenauftraege': codice_entry['kundenauftraege'],
-                'monatlicher_verbrauch': codice_entry['monatlicher_verbrauch'],
-                'gefunden_in_ool': "Ja" if matched else "Nein"
-            }
-            summary_data.append(summary_entry)
-    
-    return all_match_indices, summary_data, ool_df_extended 
\ No newline at end of file
+    with metrics.stage('zusammenfassung') as stage:
+        summary_data = build_summary(codices_data, varianten_listen, treffer, ool_df.index, fuzzy_treffer)
+        stage['rows'] = len(summary_data)
+    
+    return match_indices, summary_data, ool_df_extended 
\ No newline at end of file
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+
+from utils.fuzzy import STATUS_UNSCHARF
+from utils.normalization import OOL_ARTIKEL_SPALTE
+
+# Status einer Zeile im Ergebnis-Explorer (wie 'gefunden_in_ool' in der Zusammenfassung)
+STATUS_JA = "Ja"
+STATUS_NEIN = "Nein"
+
+# Interne Spalten der Zusammenfassung, die im Explorer weder angezeigt noch sortiert werden
+SUMMARY_INTERNAL_COLUMNS = ['ool_zeilen']
+
+# Obere Grenze für die Präfixsuche in sortierten Texten
+_PREFIX_ENDE = '\U0010ffff'
+
+def _positions_by_value(values: pd.Series) -> Dict[Any, np.ndarray]:
+    # Zeilenpositionen je Wert (ohne fehlende Werte), aufsteigend sortiert
+    gruppen = pd.Series(np.arange(len(values)), index=values.to_numpy()).groupby(level=0, sort=True, observed=True)
+    return {wert: np.sort(positionen.to_numpy()) for wert, positionen in gruppen}
+
+class ResultExplorer:
+    """
+    Hält eine Ergebnistabelle serverseitig und liefert gefilterte, sortierte Seiten.
+    
+    Beim Aufbau werden Indizes für Codice, Status und Artikelnummer (sortiert für
+    die Präfixsuche) berechnet; die Sortierreihenfolge einer Spalte wird beim ersten
+    Sortieren berechnet und danach wiederverwendet. Eine Abfrage liefert nur
+    Zeilenpositionen, sodass erst die angezeigte Seite als DataFrame entsteht.
+    """
+    
+    def __init__(self, df: pd.DataFrame, codice_column: str, artikel_column: str, status: pd.Series):
+        self._df = df
+        self.status_column = status.name
+        self._status = status.to_numpy()
+        
+        self._codice_index = _positions_by_value(df[codice_column])
+        self._status_index = _positions_by_value(status)
+        
+        # Artikelnummern als Text sortiert; fehlende Werte werden nie gefunden
+        artikel = df[artikel_column]
+        texte = artikel.map(str).astype(object).where(artikel.notna(), None).to_numpy()
+        vorhanden = np.flatnonzero(pd.notna(texte))
+        self._artikel_order = vorhanden[np.argsort(texte[vorhanden].astype(str), kind='stable')]
+        self._artikel_sorted = texte[self._artikel_order].astype(str)
+        
+        self._ranks: Dict[str, tuple] = {}
+    
+    @classmethod
+    def from_ool(cls, ool_df_extended: pd.DataFrame, match_indices: List[Any], fuzzy_indices: Optional[List[Any]] = None) -> 'ResultExplorer':
+        """
+        Baut den Explorer für die erweiterte Open Order List auf.
+        
+        Args:
+            ool_df_extended: Erweitertes OOL DataFrame (siehe data_processing.enrich_ool)
+            match_indices: Hervorgehobene Zeilenindizes
+            fuzzy_indices: Zeilenindizes unscharfer Treffer
+            
+        Returns:
+            ResultExplorer mit dem Status "Ja", "Nein" oder "Unscharf" je Zeile
+        """
+        markiert = ool_df_extended.index.isin(match_indices)
+        unscharf = ool_df_extended.index.isin(fuzzy_indices or [])
+        status = pd.Series(np.where(unscharf, STATUS_UNSCHARF, np.where(markiert, STATUS_JA, STATUS_NEIN)), name="Markiert", dtype=object)
+        return cls(ool_df_extended, 'Codice', OOL_ARTIKEL_SPALTE, status)
+    
+    @classmethod
+    def from_summary(cls, summary_data: pd.DataFrame) -> 'ResultExplorer':
+        """
+        Baut den Explorer für die Zusammenfassung auf.
+        
+        Args:
+            summary_data: Zusammenfassung als DataFrame (siehe data_processing.build_summary)
+            
+        Returns:
+            ResultExplorer mit dem Status aus 'gefunden_in_ool', ohne SUMMARY_INTERNAL_COLUMNS
+        """
+        sichtbar = summary_data.drop(columns=SUMMARY_INTERNAL_COLUMNS, errors='ignore')
+        return cls(sichtbar, 'codice_full', 'artikelnummer', summary_data['gefunden_in_ool'])
+    
+    def __len__(self) -> int:
+        return len(self._df)
+    
+    @property
+    def columns(self) -> List[Any]:
+        return list(self._df.columns)
+    
+    def codices(self) -> List[Any]:
+        """
+        Liefert alle Codices, nach denen gefiltert werden kann.
+        
+        Returns:
+            Sortierte Liste der Codices
+        """
+        return list(self._codice_index)
+    
+    def statuses(self) -> List[Any]:
+        """
+        Liefert alle vorkommenden Status.
+        
+        Returns:
+            Sortierte Liste der Status
+        """
+        return list(self._status_index)
+    
+    def _rank(self, column: Any) -> tuple:
+        # Rang jeder Zeile in der aufsteigenden Sortierung der Spalte (fehlende Werte zuletzt)
+        if column not in self._ranks:
+            values = pd.Series(self._df[column].to_numpy(), copy=False)
+            try:
+                order = values.sort_values(kind='stable', na_position='last').index.to_numpy()
+            except TypeError:
+                # Gemischte Typen (z.B. Zahlen und Texte) nach ihrer Textform sortieren
+                order = values.map(str).where(values.notna(), None).sort_values(kind='stable', na_position='last').index.to_numpy()
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self._ranks[column] = (rank, values.isna().to_numpy())
+        return self._ranks[column]
+    
+    def query(self, codice: Any = None, artikel_prefix: str = '', status: Any = None, sort_by: Any = None, descending: bool = False) -> np.ndarray:
+        """
+        Filtert und sortiert die Tabelle über die Indizes.
+        
+        Args:
+            codice: Nur Zeilen dieses Codice (None = alle)
+            artikel_prefix: Nur Zeilen, deren Artikelnummer so beginnt ('' = alle)
+            status: Nur Zeilen mit diesem Status (None = alle)
+            sort_by: Spalte, nach der sortiert wird (None = Reihenfolge der Tabelle)
+            descending: Absteigend sortieren; fehlende Werte stehen immer am Ende
+            
+        Returns:
+            Zeilenpositionen in der angezeigten Reihenfolge
+        """
+        auswahl = None
+        
+        if codice is not None:
+            auswahl = self._codice_index.get(codice, np.array([], dtype=np.int64))
+        
+        if status is not None:
+            positionen = self._status_index.get(status, np.array([], dtype=np.int64))
+            auswahl = positionen if auswahl is None else np.intersect1d(auswahl, positionen, assume_unique=True)
+        
+        if artikel_prefix:
+            start = np.searchsorted(self._artikel_sorted, artikel_prefix, side='left')
+            ende = np.searchsorted(self._artikel_sorted, artikel_prefix + _PREFIX_ENDE, side='left')
+            positionen = np.sort(self._artikel_order[start:ende])
+            auswahl = positionen if auswahl is None else np.intersect1d(auswahl, positionen, assume_unique=True)
+        
+        if auswahl is None:
+            auswahl = np.arange(len(self._df))
+        
+        if sort_by is not None:
+            rank, fehlend = self._rank(sort_by)
+            schluessel = -rank[auswahl] if descending else rank[auswahl]
+            auswahl = auswahl[np.lexsort((schluessel, fehlend[auswahl]))]
+        
+        return auswahl
+    
+    def page(self, positions: np.ndarray, page: int, page_size: int) -> pd.DataFrame:
+        """
+        Liefert eine Seite der Abfrage als DataFrame.
+        
+        Args:
+            positions: Ergebnis von query
+            page: Seitennummer (ab 1)
+            page_size: Anzahl Zeilen je Seite
+            
+        Returns:
+            DataFrame mit den Zeilen der Seite; die Statusspalte wird vorangestellt,
+            falls sie nicht zur Tabelle gehört
+        """
+        seite = positions[(page - 1) * page_size:page * page_size]
+        rows = self._df.iloc[seite]
+        if self.status_column not in rows.columns:
+            rows = rows.copy()
+            rows.insert(0, self.status_column, self._status[seite])
+        return rows
@@ -1,20 +1,256 @@
+import numpy as np
 import pandas as pd
 import io
-import base64
+import math
+import re
+import time
+from datetime import datetime
+import importlib.util
+import openpyxl
 import xlsxwriter
-from typing import Tuple, Dict, List, Any, Optional
+from xlsxwriter.utility import xl_col_to_name, xl_range
+from typing import Tuple, Dict, List, Any, Optional, Set, Iterable, Iterator
 
-def load_excel_file(uploaded_file) -> pd.DataFrame:
+from utils.fuzzy import STATUS_UNSCHARF
+from utils.normalization import (
+    OOL_ARTIKEL_SPALTE,
+    TRANSLATOR_CODICE_SPALTE,
+    TRANSLATOR_ARTIKEL_SPALTE,
+    TRANSLATOR_CODICE_NAME,
+    TRANSLATOR_ARTIKEL_NAME
+)
+
+# Schnellerer Excel-Reader, falls installiert (pip install python-calamine)
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') is not None else None
+
+# Texte, die pandas.read_excel als fehlende Werte liest (z.B. 'nan', 'N/A');
+# der Streaming-Reader behandelt sie ebenso
+EXCEL_NA_TEXTE = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+# Spalten der Open Order List, die für den Abgleich benötigt werden
+OOL_MATCHING_SPALTEN = [OOL_ARTIKEL_SPALTE, 'Abmessung', 'Gesamtmenge', 'offene Menge']
+
+# Ladeprofile je Dateityp: Kennungen werden als Text gelesen, damit z.B. aus
+# der Artikelnummer 12345 nicht 12345.0 wird
+LOAD_PROFILES = {
+    'top50': {
+        'dtype': {'Codice': str}
+    },
+    'translator': {
+        # Für den Abgleich werden nur Spalte D (Basis-Codice) und Q (Artikelnummer) benötigt
+        'usecols': [TRANSLATOR_CODICE_SPALTE, TRANSLATOR_ARTIKEL_SPALTE],
+        'dtype': str,
+        'names': [TRANSLATOR_CODICE_NAME, TRANSLATOR_ARTIKEL_NAME]
+    },
+    'ool': {
+        'dtype': {OOL_ARTIKEL_SPALTE: str}
+    }
+}
+
+def load_excel_file(uploaded_file, file_type: Optional[str] = None, matching_only: bool = False) -> pd.DataFrame:
     """
     Lädt eine hochgeladene Excel-Datei und gibt sie als DataFrame zurück.
     
     Args:
         uploaded_file: Die hochgeladene Datei vom Streamlit-Uploader
+        file_type: Dateityp ('top50', 'translator' oder 'ool'); bestimmt das Ladeprofil
+        matching_only: Bei der Open Order List nur die für den Abgleich benötigten Spalten laden
         
     Returns:
         DataFrame mit den Daten aus der Excel-Datei
     """
-    return pd.read_excel(uploaded_file)
+    profile = LOAD_PROFILES.get(file_type, {})
+    
+    read_kwargs = {'engine': EXCEL_ENGINE}
+    if 'dtype' in profile:
+        read_kwargs['dtype'] = profile['dtype']
+    if file_type == 'ool' and matching_only:
+        read_kwargs['usecols'] = lambda column: column in OOL_MATCHING_SPALTEN
+    
+    if 'usecols' not in profile:
+        return pd.read_excel(uploaded_file, **read_kwargs)
+    
+    try:
+        df = pd.read_excel(uploaded_file, usecols=profile['usecols'], **read_kwargs)
+    except pd.errors.ParserError:
+        # Die Datei hat weniger Spalten als erwartet: vollständig laden,
+        # damit die Validierung das falsche Format meldet
+        if hasattr(uploaded_file, 'seek'):
+            uploaded_file.seek(0)
+        return pd.read_excel(uploaded_file, **read_kwargs)
+    
+    df.columns = profile['names']
+    return df
+
+def _column_names(header: Tuple[Any, ...]) -> List[Any]:
+    # Überschriften wie bei pd.read_excel: leere werden zu 'Unnamed: i', doppelte erhalten '.1', '.2', ...
+    names = []
+    seen = {}
+    for pos, name in enumerate(header):
+        if name is None:
+            name = f"Unnamed: {pos}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def iter_excel_chunks(uploaded_file, file_type: Optional[str] = None, chunk_rows: int = 50000) -> Iterator[pd.DataFrame]:
+    """
+    Liest das erste Tabellenblatt einer Excel-Datei blockweise mit dem Streaming-Reader von openpyxl.
+    
+    Es liegt nie mehr als ein Block als DataFrame im Speicher. Die Blöcke
+    entsprechen zusammen dem Ergebnis von load_excel_file: der Index zählt die
+    Zeilen der ganzen Tabelle fort, Kennungen des Ladeprofils werden als Text
+    gelesen, Texte aus EXCEL_NA_TEXTE werden zu fehlenden Werten und leere Zeilen
+    am Tabellenende entfallen. Spalten rechts der letzten Überschrift werden nicht
+    gelesen. Die Größenangabe (<dimension>) der Datei wird ignoriert, da eine
+    veraltete Angabe Zeilen und Spalten abschneiden würde.
+    
+    Args:
+        uploaded_file: Pfad, Dateiobjekt oder Inhalt der Excel-Datei als Bytes
+        file_type: Dateityp ('top50' oder 'ool'); bestimmt die Textspalten
+        chunk_rows: Anzahl Zeilen je Block
+        
+    Yields:
+        DataFrame je Block; mindestens ein (ggf. leerer) Block
+    """
+    if isinstance(uploaded_file, bytes):
+        uploaded_file = io.BytesIO(uploaded_file)
+    
+    dtype = LOAD_PROFILES.get(file_type, {}).get('dtype')
+    text_columns = [column for column, column_type in dtype.items() if column_type is str] if isinstance(dtype, dict) else []
+    
+    workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        worksheet.reset_dimensions()
+        rows = worksheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        while header and header[-1] is None:
+            header.pop()
+        columns = _column_names(header)
+        width = len(columns)
+        
+        def to_frame(block, start):
+            chunk = pd.DataFrame(block, columns=columns, index=pd.RangeIndex(start, start + len(block)))
+            chunk = chunk.mask(chunk.isin(EXCEL_NA_TEXTE))
+            for column in text_columns:
+                if column in chunk.columns:
+                    values = chunk[column]
+                    chunk[column] = values.map(str, na_action='ignore').where(values.notna(), np.nan)
+            return chunk
+        
+        empty_row = (None,) * width
+        block = []
+        empty_rows = 0
+        start = 0
+        for row in rows:
+            row = tuple(row[:width]) + empty_row[len(row):]
+            if row == empty_row:
+                # Leere Zeilen nur übernehmen, wenn danach noch Daten folgen
+                empty_rows += 1
+                continue
+            block.extend([empty_row] * empty_rows)
+            empty_rows = 0
+            block.append(row)
+            while len(block) >= chunk_rows:
+                yield to_frame(block[:chunk_rows], start)
+                start += chunk_rows
+                block = block[chunk_rows:]
+        
+        if block or start == 0:
+            yield to_frame(block, start)
+    finally:
+        workbook.close()
+
+# Pflichtspalten je Dateityp (Überschriften in der ersten Zeile)
+REQUIRED_COLUMNS = {
+    'top50': ['Codice', 'Lagerbestand', 'Kundenauftraegen', 'Montatlicher Verbrauch'],
+    'ool': [OOL_ARTIKEL_SPALTE]
+}
+
+# Die Übersetzungsdatei hat keine klaren Spaltenbezeichnungen: benötigt werden Spalten bis Q
+TRANSLATOR_MIN_SPALTEN = TRANSLATOR_ARTIKEL_SPALTE + 1
+
+# Anzahl Zeilen, über die read_excel_header die Spaltenanzahl misst
+HEADER_SAMPLE_ROWS = 20
+
+# Bezeichnungen der Dateitypen in Meldungen
+FILE_TYPE_LABELS = {
+    'top50': "Die Top-50-Datei",
+    'translator': "Die Übersetzungsdatei",
+    'ool': "Die Open Order List"
+}
+
+def read_excel_header(uploaded_file) -> Tuple[List[Any], Optional[int]]:
+    """
+    Liest nur die Kopfzeile des ersten Tabellenblatts, ohne die Datei vollständig einzulesen.
+    
+    Die Größenangabe (<dimension>) in der Datei wird nicht verwendet, da andere Programme
+    sie veraltet oder falsch schreiben können; die Spaltenanzahl wird an den ersten
+    HEADER_SAMPLE_ROWS Zeilen gemessen.
+    
+    Args:
+        uploaded_file: Die hochgeladene Datei, Dateiinhalt als Bytes oder Pfad
+        
+    Returns:
+        Ein Tuple aus den Werten der Kopfzeile und der größten Spaltenanzahl der gelesenen
+        Zeilen (bis zur letzten gefüllten Zelle; None, wenn das Blatt leer ist)
+    """
+    if isinstance(uploaded_file, bytes):
+        uploaded_file = io.BytesIO(uploaded_file)
+    
+    # read_only liest die Zeilen als Stream; nach den ersten Zeilen wird abgebrochen
+    workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        worksheet.reset_dimensions()
+        rows = [list(row) for row in worksheet.iter_rows(max_row=HEADER_SAMPLE_ROWS, values_only=True)]
+        
+        widths = [max((i + 1 for i, value in enumerate(row) if value is not None), default=0) for row in rows]
+        column_count = max(widths, default=0) or None
+        return (rows[0] if rows else []), column_count
+    finally:
+        workbook.close()
+        if hasattr(uploaded_file, 'seek'):
+            uploaded_file.seek(0)
+
+def check_header(uploaded_file, file_type: str) -> Optional[str]:
+    """
+    Prüft anhand der Kopfzeile, ob eine Datei zum Dateityp passt, bevor sie vollständig geladen wird.
+    
+    Args:
+        uploaded_file: Die hochgeladene Datei, Dateiinhalt als Bytes oder Pfad
+        file_type: Dateityp ('top50', 'translator' oder 'ool')
+        
+    Returns:
+        Fehlermeldung mit den fehlenden Spalten oder None, wenn die Kopfzeile passt
+        (oder nicht gelesen werden konnte; dann prüft die Validierung nach dem Laden)
+    """
+    try:
+        header, column_count = read_excel_header(uploaded_file)
+    except Exception:
+        return None
+    
+    if file_type == 'translator':
+        # Bei einem leeren Blatt entscheidet die Validierung nach dem Laden
+        if column_count is not None and column_count < TRANSLATOR_MIN_SPALTEN:
+            return (f"{FILE_TYPE_LABELS[file_type]} hat nicht das erwartete Format: sie hat nur {column_count} Spalten, "
+                    f"benötigt werden mindestens {TRANSLATOR_MIN_SPALTEN} (bis Spalte Q).")
+        return None
+    
+    columns = {str(value) for value in header if value is not None}
+    missing = [column for column in REQUIRED_COLUMNS[file_type] if column not in columns]
+    if missing:
+        return (f"{FILE_TYPE_LABELS[file_type]} hat nicht das erwartete Format: es fehlen die Spalten "
+                f"{', '.join(repr(column) for column in missing)}.")
+    return None
 
 def validate_top50_file(df: pd.DataFrame) -> bool:
     """
@@ -26,13 +262,8 @@ def validate_top50_file(df: pd.DataFrame) -> bool:
     Returns:
         True, wenn die Datei gültig ist, sonst False
     """
-    # Prüfen, ob die Datei mindestens eine 'Codice'-Spalte hat
-    if 'Codice' not in df.columns:
-        return False
-    
-    # Prüfen, ob wichtige Spalten vorhanden sind
-    required_columns = ['Lagerbestand', 'Kundenauftraegen', 'Montatlicher Verbrauch']
-    for col in required_columns:
+    # Prüfen, ob die 'Codice'-Spalte und die wichtigen Spalten vorhanden sind
+    for col in REQUIRED_COLUMNS['top50']:
         if col not in df.columns:
             return False
     
@@ -48,9 +279,13 @@ def validate_translator_file(df: pd.DataFrame) -> bool:
     Returns:
         True, wenn die Datei gültig ist, sonst False
     """
+    # Mit dem Ladeprofil 'translator' sind nur die Spalten D und Q geladen
+    if TRANSLATOR_CODICE_NAME in df.columns and TRANSLATOR_ARTIKEL_NAME in df.columns:
+        return True
+    
     # Da die Übersetzungsdatei keine klaren Spaltenbezeichnungen hat, 
     # prüfen wir, ob genügend Spalten vorhanden sind
-    return df.shape[1] >= 17  # Wir benötigen mindestens 17 Spalten (bis Q)
+    return df.shape[1] >= TRANSLATOR_MIN_SPALTEN  # Wir benötigen mindestens 17 Spalten (bis Q)
 
 def validate_ool_file(df: pd.DataFrame) -> bool:
     """
@@ -65,81 +300,371 @@ def validate_ool_file(df: pd.DataFrame) -> bool:
     # Prüfen, ob die 'artikel no'-Spalte vorhanden ist
     return 'artikel no' in df.columns
 
-def create_downloadable_excel(df: pd.DataFrame, highlight_indices: List[int] = None) -> str:
+# Prüfung je Dateityp
+VALIDATORS = {
+    'top50': validate_top50_file,
+    'translator': validate_translator_file,
+    'ool': validate_ool_file
+}
+
+def load_and_validate(data: bytes, file_type: str) -> Tuple[pd.DataFrame, bool, Dict[str, float]]:
+    """
+    Lädt und prüft eine Datei in einem Schritt, z.B. in einem eigenen Prozess.
+    
+    Args:
+        data: Inhalt der hochgeladenen Excel-Datei
+        file_type: Dateityp ('top50', 'translator' oder 'ool')
+        
+    Returns:
+        Ein Tuple aus dem geladenen DataFrame, dem Ergebnis der Prüfung und
+        der Dauer von Laden und Prüfung in Sekunden ('laden', 'validierung')
+    """
+    start = time.perf_counter()
+    df = load_excel_file(io.BytesIO(data), file_type)
+    loaded = time.perf_counter()
+    valid = VALIDATORS[file_type](df)
+    
+    return df, valid, {'laden': loaded - start, 'validierung': time.perf_counter() - loaded}
+
+# Hervorhebung gefundener Zeilen
+HIGHLIGHT_FORMAT = {'bg_color': '#FFC7CE', 'font_color': '#9C0006'}
+
+# Hervorhebung unscharfer Treffer, deutlich unterscheidbar von der roten Markierung
+FUZZY_FORMAT = {'bg_color': '#FFEB9C', 'font_color': '#9C5700'}
+
+# Hervorhebung ausreichend bevorrateter Zeilen (Regelsatz 'reichweite')
+COVERED_FORMAT = {'bg_color': '#C6EFCE', 'font_color': '#006100'}
+
+# Regelsätze für die Hervorhebung per bedingter Formatierung (siehe add_highlight_rules).
+# Je Regel eine Excel-Formel und ein Format; {Spalte} steht für die Zelle dieser Spalte
+# in derselben Zeile. Es gilt die erste zutreffende Regel.
+HIGHLIGHT_RULES = {
+    # Wie die Zeilenformate: gefundene Zeilen rot, unscharfe Treffer gelb
+    'treffer': [
+        ('AND({Konfidenz}<>"",{Konfidenz}<1)', FUZZY_FORMAT),
+        ('{Codice}<>""', HIGHLIGHT_FORMAT)
+    ],
+    # Gefundene Zeilen nach Reichweite des Lagerbestands: unter einem Monatsverbrauch rot,
+    # unter drei Monatsverbräuchen gelb, sonst grün
+    'reichweite': [
+        ('AND({Codice}<>"",{Lagerbestand}<{Monatlicher Verbrauch})', HIGHLIGHT_FORMAT),
+        ('AND({Codice}<>"",{Lagerbestand}<3*{Monatlicher Verbrauch})', FUZZY_FORMAT),
+        ('{Codice}<>""', COVERED_FORMAT)
+    ]
+}
+
+_RULE_COLUMN = re.compile(r'\{([^{}]+)\}')
+
+def add_highlight_rules(workbook: xlsxwriter.Workbook, worksheet, columns: List[Any], rows: int, rules: List[Tuple[str, Dict[str, Any]]]) -> int:
+    """
+    Hebt die Datenzeilen eines Tabellenblatts per bedingter Formatierung hervor.
+    
+    Jede Regel wird als ein einziger Bereich über alle Datenzeilen angelegt,
+    statt jede Zeile einzeln zu formatieren. Das hält die Datei klein und
+    beschleunigt Schreiben und Öffnen. Regeln, deren Spalten fehlen (z.B.
+    'Konfidenz' ohne unscharfen Abgleich), werden übersprungen.
+    
+    Args:
+        workbook: Arbeitsmappe des Tabellenblatts
+        worksheet: Tabellenblatt mit Kopfzeile in Zeile 0
+        columns: Spaltenüberschriften in der Reihenfolge des Blatts
+        rows: Anzahl Datenzeilen
+        rules: Regeln aus (Formel, Format), z.B. ein Eintrag aus HIGHLIGHT_RULES
+        
+    Returns:
+        Anzahl angelegter Regeln
+    """
+    if rows == 0 or not columns:
+        return 0
+    
+    # Spaltenbezug absolut, Zeilenbezug relativ zur ersten Datenzeile
+    references = {str(column): f"${xl_col_to_name(position)}2" for position, column in enumerate(columns)}
+    cell_range = xl_range(1, 0, rows, len(columns) - 1)
+    
+    added = 0
+    for formula, cell_format in rules:
+        names = _RULE_COLUMN.findall(formula)
+        if any(name not in references for name in names):
+            continue
+        worksheet.conditional_format(cell_range, {
+            'type': 'formula',
+            'criteria': '=' + _RULE_COLUMN.sub(lambda match: references[match.group(1)], formula),
+            'format': workbook.add_format(cell_format),
+            'stop_if_true': True
+        })
+        added += 1
+    
+    return added
+
+def create_downloadable_excel(df: pd.DataFrame, highlight_indices: List[int] = None, highlight_rules: Optional[List[Tuple[str, Dict[str, Any]]]] = None) -> bytes:
     """
     Erstellt eine herunterladbare Excel-Datei aus einem DataFrame mit optionaler Hervorhebung bestimmter Zeilen.
     
     Args:
         df: DataFrame, der exportiert werden soll
         highlight_indices: Liste von Zeilenindizes, die hervorgehoben werden sollen
+        highlight_rules: Regeln für die bedingte Formatierung (siehe HIGHLIGHT_RULES);
+            ersetzen die Hervorhebung über highlight_indices
         
     Returns:
-        Base64-kodierter Excel-Inhalt
+        Inhalt der Excel-Datei als Bytes
     """
     output = io.BytesIO()
     
     # Excel-Datei mit XlsxWriter erstellen (für Formatierung)
     with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
         df.to_excel(writer, index=False, sheet_name='Sheet1')
+        workbook = writer.book
+        worksheet = writer.sheets['Sheet1']
         
-        # Format für die hervorzuhebenden Zeilen erstellen
-        if highlight_indices:
-            workbook = writer.book
-            worksheet = writer.sheets['Sheet1']
-            red_format = workbook.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006'})
+        if highlight_rules:
+            add_highlight_rules(workbook, worksheet, list(df.columns), len(df), highlight_rules)
+        elif highlight_indices:
+            red_format = workbook.add_format(HIGHLIGHT_FORMAT)
             
-            # Zeilen hervorheben
-            for idx in highlight_indices:
-                # +1 für die Excel-Zeilennummerierung (beginnt bei 1) und +1 für Header
-                row_idx = idx + 2
-                # Alle Spalten hervorheben
-                worksheet.set_row(row_idx, None, red_format)
+            # Zeilenindizes sind Labels; hervorgehoben wird nach Position (Zeile 0 ist die Kopfzeile)
+            for pos in sorted(_row_positions(df, highlight_indices)):
+                worksheet.set_row(pos + 1, None, red_format)
+    
+    return output.getvalue()
 
-    # In Base64 konvertieren für Download
-    b64 = base64.b64encode(output.getvalue()).decode()
-    return b64
+def _excel_value(value: Any) -> Any:
+    """
+    Wandelt einen Zellwert in einen Typ um, den XlsxWriter direkt schreiben kann.
+    
+    Args:
+        value: Zellwert aus dem DataFrame
+        
+    Returns:
+        Python-Wert; fehlende und unendliche Werte werden zu None (leere Zelle),
+        Zeitpunkte mit Zeitzone verlieren die Zeitzone (Excel kennt keine)
+    """
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        value = value.tz_localize(None) if value.tzinfo is not None else value
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    if isinstance(value, float) and math.isinf(value):
+        return None
+    return value
 
-def create_downloadable_summary(summary_data: List[Dict[str, Any]]) -> str:
+def _streaming_formats(workbook: xlsxwriter.Workbook) -> Dict[str, Any]:
+    """
+    Legt die Formate für den zeilenweisen Export an (wie beim Export über pandas).
+    
+    Args:
+        workbook: Arbeitsmappe, in der die Formate angelegt werden
+        
+    Returns:
+        Dictionary Formatname -> XlsxWriter-Format
+    """
+    return {
+        'header': workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}),
+        'red': workbook.add_format(HIGHLIGHT_FORMAT),
+        'date': workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'}),
+        'red_date': workbook.add_format({**HIGHLIGHT_FORMAT, 'num_format': 'yyyy-mm-dd hh:mm:ss'}),
+        'fuzzy': workbook.add_format(FUZZY_FORMAT),
+        'fuzzy_date': workbook.add_format({**FUZZY_FORMAT, 'num_format': 'yyyy-mm-dd hh:mm:ss'})
+    }
+
+def _row_positions(df: pd.DataFrame, indices: Optional[List[Any]]) -> Set[int]:
+    # Positionen der Zeilen mit den angegebenen Indizes als Menge für den schnellen Test beim Schreiben
+    if not indices:
+        return set()
+    return set(np.flatnonzero(df.index.isin(indices)).tolist())
+
+def _write_streaming_rows(worksheet, df: pd.DataFrame, formats: Dict[str, Any], first_row: int, highlight_positions: Set[int] = frozenset(), fuzzy_positions: Set[int] = frozenset()) -> int:
+    """
+    Schreibt die Zeilen eines DataFrames ab einer Tabellenzeile in ein Tabellenblatt.
+    
+    Args:
+        worksheet: Tabellenblatt einer Arbeitsmappe im 'constant_memory'-Modus
+        df: DataFrame, dessen Zeilen geschrieben werden
+        formats: Formate aus _streaming_formats
+        first_row: Tabellenzeile der ersten Datenzeile
+        highlight_positions: Zeilenpositionen, die hervorgehoben werden sollen
+        fuzzy_positions: Zeilenpositionen unscharfer Treffer (eigene Hervorhebungsfarbe)
+        
+    Returns:
+        Tabellenzeile nach der letzten geschriebenen Zeile
+    """
+    # Datumsspalten benötigen ein Zahlenformat, sonst erscheint die serielle Zahl
+    is_date_column = [pd.api.types.is_datetime64_any_dtype(dtype) for dtype in df.dtypes]
+    normal_formats = [formats['date'] if is_date else None for is_date in is_date_column]
+    highlight_formats = [formats['red_date'] if is_date else formats['red'] for is_date in is_date_column]
+    fuzzy_formats = [formats['fuzzy_date'] if is_date else formats['fuzzy'] for is_date in is_date_column]
+    
+    for pos, values in enumerate(df.itertuples(index=False, name=None)):
+        row_idx = first_row + pos
+        if pos in fuzzy_positions:
+            row_formats = fuzzy_formats
+        elif pos in highlight_positions:
+            row_formats = highlight_formats
+        else:
+            row_formats = normal_formats
+        for col_idx, value in enumerate(values):
+            worksheet.write(row_idx, col_idx, _excel_value(value), row_formats[col_idx])
+    
+    return first_row + len(df)
+
+def _write_streaming_sheet(workbook: xlsxwriter.Workbook, name: str, df: pd.DataFrame, formats: Dict[str, Any], highlight_positions: Set[int] = frozenset(), fuzzy_positions: Set[int] = frozenset(), highlight_rules: Optional[List[Tuple[str, Dict[str, Any]]]] = None) -> None:
+    """
+    Schreibt ein DataFrame zeilenweise in ein neues Tabellenblatt.
+    
+    Args:
+        workbook: Arbeitsmappe im 'constant_memory'-Modus
+        name: Name des Tabellenblatts
+        df: DataFrame, der exportiert werden soll
+        formats: Formate aus _streaming_formats
+        highlight_positions: Zeilenpositionen, die hervorgehoben werden sollen
+        fuzzy_positions: Zeilenpositionen unscharfer Treffer (eigene Hervorhebungsfarbe)
+        highlight_rules: Regeln für die bedingte Formatierung (siehe HIGHLIGHT_RULES)
+    """
+    worksheet = workbook.add_worksheet(name)
+    worksheet.write_row(0, 0, [str(column) for column in df.columns], formats['header'])
+    
+    # Zeile 0 ist die Kopfzeile
+    _write_streaming_rows(worksheet, df, formats, 1, highlight_positions, fuzzy_positions)
+    
+    if highlight_rules:
+        add_highlight_rules(workbook, worksheet, list(df.columns), len(df), highlight_rules)
+
+def create_streaming_excel(df: pd.DataFrame, highlight_indices: List[int] = None, output=None, extra_sheets: Optional[Dict[str, pd.DataFrame]] = None, fuzzy_indices: List[int] = None, highlight_rules: Optional[List[Tuple[str, Dict[str, Any]]]] = None) -> Optional[bytes]:
+    """
+    Erstellt die Excel-Datei zeilenweise mit konstantem Speicherbedarf.
+    
+    Die Zeilen werden im 'constant_memory'-Modus von XlsxWriter nacheinander
+    geschrieben; markierte Zeilen erhalten das Hervorhebungsformat direkt beim
+    Schreiben. Mit highlight_rules entfallen diese Zellformate und die
+    Hervorhebung folgt aus bedingten Formatierungen über das ganze Blatt.
+    Mit output wird direkt in die Zieldatei geschrieben, ohne den Inhalt im
+    Arbeitsspeicher zu halten.
+    
+    Args:
+        df: DataFrame, der exportiert werden soll
+        highlight_indices: Liste von Zeilenindizes, die hervorgehoben werden sollen
+        output: Zieldatei (Pfad oder beschreibbares Dateiobjekt); ohne output wird
+            der Inhalt als Bytes zurückgegeben
+        extra_sheets: Weitere Tabellenblätter (Name -> DataFrame), die nach 'Sheet1' folgen
+        fuzzy_indices: Zeilenindizes unscharfer Treffer, die gelb statt rot hervorgehoben werden
+        highlight_rules: Regeln für die bedingte Formatierung von 'Sheet1' (siehe HIGHLIGHT_RULES);
+            ersetzen highlight_indices und fuzzy_indices
+        
+    Returns:
+        Inhalt der Excel-Datei als Bytes, wenn kein output angegeben ist, sonst None
+    """
+    target = io.BytesIO() if output is None else output
+    
+    workbook = xlsxwriter.Workbook(target, {'constant_memory': True})
+    formats = _streaming_formats(workbook)
+    
+    if highlight_rules:
+        _write_streaming_sheet(workbook, 'Sheet1', df, formats, highlight_rules=highlight_rules)
+    else:
+        _write_streaming_sheet(workbook, 'Sheet1', df, formats, _row_positions(df, highlight_indices), _row_positions(df, fuzzy_indices))
+    
+    # Im 'constant_memory'-Modus werden die Blätter nacheinander vollständig geschrieben
+    for name, sheet_df in (extra_sheets or {}).items():
+        _write_streaming_sheet(workbook, name, sheet_df, formats)
+    
+    workbook.close()
+    return target.getvalue() if output is None else None
+
+def create_chunked_excel(output, chunks: Iterable[Tuple[pd.DataFrame, List[Any], List[Any]]], highlight_rules: Optional[List[Tuple[str, Dict[str, Any]]]] = None) -> int:
+    """
+    Schreibt die markierte Open Order List blockweise in eine Excel-Datei.
+    
+    Gegenstück zu create_streaming_excel für Daten, die nie vollständig im
+    Speicher liegen: jeder Block wird sofort im 'constant_memory'-Modus
+    geschrieben und kann danach verworfen werden. Die Spaltenüberschriften
+    stammen aus dem ersten Block.
+    
+    Args:
+        output: Zieldatei (Pfad oder beschreibbares Dateiobjekt)
+        chunks: Blöcke aus DataFrame, hervorzuhebenden Zeilenindizes und
+            Zeilenindizes unscharfer Treffer
+        highlight_rules: Regeln für die bedingte Formatierung (siehe HIGHLIGHT_RULES);
+            ersetzen die Zeilenindizes der Blöcke
+        
+    Returns:
+        Anzahl geschriebener Datenzeilen
+    """
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    formats = _streaming_formats(workbook)
+    worksheet = workbook.add_worksheet('Sheet1')
+    
+    # Zeile 0 ist die Kopfzeile
+    next_row = 1
+    columns = []
+    for number, (chunk_df, highlight_indices, fuzzy_indices) in enumerate(chunks):
+        if number == 0:
+            columns = list(chunk_df.columns)
+            worksheet.write_row(0, 0, [str(column) for column in columns], formats['header'])
+        if highlight_rules:
+            next_row = _write_streaming_rows(worksheet, chunk_df, formats, next_row)
+        else:
+            next_row = _write_streaming_rows(worksheet, chunk_df, formats, next_row, _row_positions(chunk_df, highlight_indices), _row_positions(chunk_df, fuzzy_indices))
+    
+    # Die Regeln gelten für alle Blöcke zusammen
+    if highlight_rules:
+        add_highlight_rules(workbook, worksheet, columns, next_row - 1, highlight_rules)
+    
+    workbook.close()
+    return next_row - 1
+
+def create_downloadable_summary(summary_data: pd.DataFrame) -> bytes:
     """
     Erstellt eine herunterladbare Excel-Datei mit der Zusammenfassung der gefundenen Übereinstimmungen.
     
     Args:
-        summary_data: Liste von Dictionaries mit den Zusammenfassungsdaten
+        summary_data: Zusammenfassung als DataFrame (siehe data_processing.build_summary)
         
     Returns:
-        Base64-kodierter Excel-Inhalt
-    """
-    # DataFrame aus den Zusammenfassungsdaten erstellen
-    df = pd.DataFrame(summary_data)
-    
-    # Spaltenreihenfolge und Spaltenüberschriften anpassen
-    if len(df) > 0:
-        # Spalten umbenennen
-        column_mapping = {
-            'codice_full': 'Codice (vollständig)',
-            'codice_base': 'Codice (Basis)',
-            'artikelnummer': 'Artikelnummer',
-            'lagerbestand': 'Lagerbestand',
-            'kundenauftraege': 'Kundenaufträge',
-            'monatlicher_verbrauch': 'Monatlicher Verbrauch',
-            'gefunden_in_ool': 'In OOL gefunden'
-        }
-        df = df.rename(columns=column_mapping)
-        
-        # Spaltenreihenfolge definieren
-        columns_order = [
-            'Codice (vollständig)', 'Codice (Basis)', 'Artikelnummer', 
-            'Lagerbestand', 'Kundenaufträge', 'Monatlicher Verbrauch', 
-            'In OOL gefunden'
-        ]
-        
-        # Spalten in der gewünschten Reihenfolge auswählen
-        df = df[columns_order]
+        Inhalt der Excel-Datei als Bytes
+    """
+    df = summary_data
+    
+    # Spaltenreihenfolge und Spaltenüberschriften anpassen (auch bei leerer Zusammenfassung)
+    # Spalten umbenennen
+    column_mapping = {
+        'codice_full': 'Codice (vollständig)',
+        'codice_base': 'Codice (Basis)',
+        'artikelnummer': 'Artikelnummer',
+        'lagerbestand': 'Lagerbestand',
+        'kundenauftraege': 'Kundenaufträge',
+        'monatlicher_verbrauch': 'Monatlicher Verbrauch',
+        'gefunden_in_ool': 'In OOL gefunden',
+        'konfidenz': 'Konfidenz'
+    }
+    df = df.rename(columns=column_mapping)
+    
+    # Spaltenreihenfolge definieren
+    columns_order = [
+        'Codice (vollständig)', 'Codice (Basis)', 'Artikelnummer', 
+        'Lagerbestand', 'Kundenaufträge', 'Monatlicher Verbrauch', 
+        'In OOL gefunden'
+    ]
+    if 'Konfidenz' in df.columns:
+        columns_order.append('Konfidenz')
+    
+    # Spalten in der gewünschten Reihenfolge auswählen
+    df = df.reindex(columns=columns_order)
     
     # Excel-Datei erstellen
     output = io.BytesIO()
-    df.to_excel(output, index=False)
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name='Sheet1')
+        
+        # Unscharf gefundene Artikelnummern wie in der markierten OOL hervorheben
+        if 'In OOL gefunden' in df.columns:
+            fuzzy_format = writer.book.add_format(FUZZY_FORMAT)
+            worksheet = writer.sheets['Sheet1']
+            for pos in np.flatnonzero((df['In OOL gefunden'] == STATUS_UNSCHARF).to_numpy()):
+                # Zeile 0 ist die Kopfzeile
+                worksheet.set_row(pos + 1, None, fuzzy_format)
     
-    # In Base64 konvertieren für Download
-    b64 = base64.b64encode(output.getvalue()).decode()
-    return b64 
\ No newline at end of file
+    return output.getvalue() 
\ No newline at end of file
@@ -0,0 +1,210 @@
+import pandas as pd
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from utils.normalization import VARIANTEN_SPALTEN
+
+# Standardabstand für den unscharfen Abgleich (Anzahl Tippfehler je Artikelnummer)
+FUZZY_MAX_DISTANCE = 1
+
+# Bezeichnung unscharf gefundener Artikelnummern in der Zusammenfassung
+STATUS_UNSCHARF = "Unscharf"
+
+# Spalten der unscharfen Treffer (siehe match_ool_fuzzy)
+FUZZY_DTYPES = {
+    'codice_pos': 'int64',
+    'ool_pos': 'int64',
+    'artikel_no': object,
+    'uebersetzt': object,
+    'distanz': 'int64',
+    'konfidenz': 'float64'
+}
+
+def levenshtein(a: str, b: str, max_distance: int) -> int:
+    """
+    Berechnet den Editierabstand zweier Zeichenketten.
+    
+    Die Berechnung bricht ab, sobald der Abstand sicher größer als max_distance ist.
+    
+    Args:
+        a: Erste Zeichenkette
+        b: Zweite Zeichenkette
+        max_distance: Größter Abstand, der genau berechnet werden muss
+        
+    Returns:
+        Editierabstand, oder max_distance + 1 wenn er größer als max_distance ist
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    
+    return min(previous[-1], max_distance + 1)
+
+def _loeschvarianten(word: str, max_distance: int) -> Set[str]:
+    """
+    Erzeugt alle Zeichenketten, die durch Löschen von bis zu max_distance Zeichen entstehen.
+    """
+    varianten = {word}
+    aktuell = {word}
+    for _ in range(max_distance):
+        aktuell = {variante[:i] + variante[i + 1:] for variante in aktuell for i in range(len(variante))}
+        varianten |= aktuell
+    return varianten
+
+class DeletionIndex:
+    """
+    Invertierter Index über Löschvarianten für die Suche nach allen Einträgen
+    mit Editierabstand höchstens k, ohne jeden Eintrag einzeln zu vergleichen.
+    
+    Zwei Zeichenketten mit Editierabstand höchstens k haben eine gemeinsame
+    Variante, die durch Löschen von jeweils höchstens k Zeichen entsteht. Die
+    Suche schlägt daher nur die Löschvarianten des Suchworts nach und prüft die
+    wenigen Kandidaten mit dem genauen Abstand. Ein BK-Baum erreicht bei kurzen
+    Artikelnummern aus Ziffern kaum Pruning, da fast alle Abstände gleich groß sind.
+    """
+    
+    def __init__(self, words: List[str], max_distance: int):
+        self.max_distance = max_distance
+        self._words = set()
+        self._postings = {}
+        for word in words:
+            self.add(word)
+    
+    def add(self, word: str) -> None:
+        """
+        Fügt eine Zeichenkette hinzu (doppelte Einträge werden ignoriert).
+        """
+        if word in self._words:
+            return
+        self._words.add(word)
+        for variante in _loeschvarianten(word, self.max_distance):
+            self._postings.setdefault(variante, []).append(word)
+    
+    def search(self, word: str) -> Iterator[Tuple[str, int]]:
+        """
+        Findet alle Einträge mit Editierabstand höchstens max_distance.
+        
+        Args:
+            word: Gesuchte Zeichenkette
+            
+        Returns:
+            Paare aus gefundenem Eintrag und Abstand
+        """
+        kandidaten = set()
+        for variante in _loeschvarianten(word, self.max_distance):
+            kandidaten.update(self._postings.get(variante, ()))
+        
+        for kandidat in kandidaten:
+            distance = levenshtein(word, kandidat, self.max_distance)
+            if distance <= self.max_distance:
+                yield kandidat, distance
+    
+    def __len__(self) -> int:
+        return len(self._words)
+
+def build_fuzzy_index(varianten_listen: List[pd.DataFrame], max_distance: int = FUZZY_MAX_DISTANCE) -> Tuple[DeletionIndex, Dict[str, List[Tuple[int, str]]]]:
+    """
+    Baut den Suchindex über alle Formatvarianten der übersetzten Artikelnummern.
+    
+    Args:
+        varianten_listen: Normalisierte Artikelnummern je Codice (siehe
+            normalization.normalize_artikel), in der Reihenfolge der Codices
+        max_distance: Größter Editierabstand, für den der Index aufgebaut wird
+        
+    Returns:
+        Ein Tuple aus:
+        - Löschvarianten-Index über alle Formatvarianten
+        - Dictionary Formatvariante -> Liste von (Position des Codice, übersetzte Artikelnummer)
+    """
+    herkunft = {}
+    for codice_pos, varianten in enumerate(varianten_listen):
+        for column in VARIANTEN_SPALTEN:
+            for variante, artikel_no in zip(varianten[column], varianten['artikel_no']):
+                if variante is None or pd.isna(variante):
+                    continue
+                eintraege = herkunft.setdefault(variante, [])
+                if (codice_pos, artikel_no) not in eintraege:
+                    eintraege.append((codice_pos, artikel_no))
+    
+    return DeletionIndex(list(herkunft), max_distance), herkunft
+
+def match_ool_fuzzy(ool_keys: pd.DataFrame, varianten_listen: List[pd.DataFrame], treffer: pd.DataFrame, max_distance: int = FUZZY_MAX_DISTANCE, fuzzy_index: Optional[Tuple[DeletionIndex, Dict[str, List[Tuple[int, str]]]]] = None) -> pd.DataFrame:
+    """
+    Sucht für OOL-Zeilen ohne exakten Treffer übersetzte Artikelnummern mit Tippfehlern.
+    
+    Gesucht wird mit der Artikelnummer und ihrer Form ohne führende '7'; jede
+    unterschiedliche Artikelnummer wird nur einmal im Index gesucht.
+    
+    Args:
+        ool_keys: Normalisierte OOL-Schlüssel aus normalization.normalize_ool
+        varianten_listen: Normalisierte Artikelnummern je Codice
+        treffer: Exakte Treffer aus data_processing.match_ool_keys
+        max_distance: Größter erlaubter Editierabstand
+        fuzzy_index: Optional bereits mit build_fuzzy_index aufgebauter Index, z.B.
+            bei der blockweisen Verarbeitung
+        
+    Returns:
+        DataFrame mit den Spalten 'codice_pos', 'ool_pos', 'artikel_no' (aus der OOL),
+        'uebersetzt' (übersetzte Artikelnummer), 'distanz' und 'konfidenz'
+        (1 - Abstand / Länge der längeren Artikelnummer), sortiert wie match_ool_keys
+    """
+    columns = list(FUZZY_DTYPES)
+    offen = ool_keys[~ool_keys['ool_pos'].isin(treffer['ool_pos'])]
+    if offen.empty or max_distance < 1:
+        return pd.DataFrame(columns=columns).astype(FUZZY_DTYPES)
+    
+    if fuzzy_index is None:
+        fuzzy_index = build_fuzzy_index(varianten_listen, max_distance)
+    index, herkunft = fuzzy_index
+    
+    # Jede unterschiedliche Artikelnummer nur einmal suchen
+    gefunden = {}
+    for artikel_no, ohne_7 in offen[['artikel_no', 'artikel_ohne_7']].drop_duplicates().itertuples(index=False, name=None):
+        kandidaten = {}
+        for suchwort in {artikel_no, ohne_7}:
+            for variante, distanz in index.search(suchwort):
+                konfidenz = 1 - distanz / max(len(suchwort), len(variante))
+                for codice_pos, uebersetzt in herkunft[variante]:
+                    bisher = kandidaten.get((codice_pos, uebersetzt))
+                    if bisher is None or konfidenz > bisher[1]:
+                        kandidaten[(codice_pos, uebersetzt)] = (distanz, konfidenz)
+        if kandidaten:
+            gefunden[(artikel_no, ohne_7)] = kandidaten
+    
+    zeilen = []
+    for ool_pos, artikel_no, ohne_7 in offen[['ool_pos', 'artikel_no', 'artikel_ohne_7']].itertuples(index=False, name=None):
+        for (codice_pos, uebersetzt), (distanz, konfidenz) in gefunden.get((artikel_no, ohne_7), {}).items():
+            zeilen.append((codice_pos, ool_pos, artikel_no, uebersetzt, distanz, konfidenz))
+    
+    fuzzy = pd.DataFrame(zeilen, columns=columns).astype(FUZZY_DTYPES)
+    fuzzy = fuzzy.sort_values(['codice_pos', 'ool_pos', 'konfidenz'], ascending=[True, True, False], kind='stable')
+    
+    # Je Codice und OOL-Zeile nur die beste übersetzte Artikelnummer als Treffer zählen
+    return fuzzy.drop_duplicates(subset=['codice_pos', 'ool_pos']).reset_index(drop=True)
+
+def fuzzy_row_indices(ool_df_extended: pd.DataFrame) -> List:
+    """
+    Bestimmt die Zeilenindizes der erweiterten OOL, die nur unscharf gefunden wurden.
+    
+    Args:
+        ool_df_extended: Erweiterte OOL mit der Spalte 'Konfidenz'
+        
+    Returns:
+        Liste von Zeilenindizes (leer ohne unscharfen Abgleich)
+    """
+    if 'Konfidenz' not in ool_df_extended.columns:
+        return []
+    
+    unscharf = (ool_df_extended['Konfidenz'] < 1).fillna(False).to_numpy(dtype=bool)
+    return ool_df_extended.index[unscharf].tolist()
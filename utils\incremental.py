@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+from typing import Any, List, Optional, Tuple
+
+from utils.normalization import OOL_ARTIKEL_SPALTE, normalize_ool
+from utils.data_processing import (
+    TranslatorIndex,
+    prepare_codices,
+    build_artikel_lookup,
+    match_ool_keys,
+    combine_fuzzy_treffer,
+    enrich_ool,
+    build_summary
+)
+from utils.fuzzy import match_ool_fuzzy
+from utils.instrumentation import PipelineMetrics
+
+# Auftragsspalten, die zusammen mit der Artikelnummer eine OOL-Zeile identifizieren (sofern vorhanden)
+ORDER_KEY_COLUMNS = ['Auftrag', 'Auftragsnr', 'Auftragsnummer', 'Position', 'Pos']
+
+# Bezeichnungen in der Spalte 'Änderung'
+STATUS_NEU = "Neu"
+STATUS_GEAENDERT = "Geändert"
+STATUS_UNVERAENDERT = "Unverändert"
+STATUS_ENTFERNT = "Entfernt"
+
+def default_key_columns(ool_df: pd.DataFrame) -> List[str]:
+    """
+    Bestimmt die Schlüsselspalten einer Open Order List: Artikelnummer plus vorhandene Auftragsspalten.
+    
+    Args:
+        ool_df: DataFrame der Open Order List
+        
+    Returns:
+        Liste der Schlüsselspalten
+    """
+    return [OOL_ARTIKEL_SPALTE] + [column for column in ORDER_KEY_COLUMNS if column in ool_df.columns]
+
+def _row_identity(ool_df: pd.DataFrame, key_columns: List[str]) -> pd.DataFrame:
+    """
+    Berechnet Schlüssel und Inhalts-Hash jeder OOL-Zeile.
+    
+    Mehrfach vorkommende Schlüssel werden über ihre laufende Nummer unterschieden.
+    """
+    key = pd.util.hash_pandas_object(ool_df[key_columns], index=False).to_numpy()
+    identity = pd.DataFrame({'key': key})
+    identity['nr'] = identity.groupby('key').cumcount()
+    identity['hash'] = pd.util.hash_pandas_object(ool_df, index=False).to_numpy()
+    return identity
+
+class MatchState:
+    """
+    Stand des letzten Verarbeitungslaufs, auf dem ein inkrementeller Abgleich aufsetzt.
+    
+    inputs_key identifiziert die Top-50-Liste und Übersetzungsdatei des Laufs; nur
+    wenn beide unverändert sind, können die Treffer unveränderter Zeilen übernommen werden.
+    """
+    
+    def __init__(self, inputs_key: str, ool_df: pd.DataFrame, key_columns: List[str], treffer: pd.DataFrame):
+        self.inputs_key = inputs_key
+        self.ool_df = ool_df
+        self.key_columns = key_columns
+        self.identity = _row_identity(ool_df, key_columns)
+        self.treffer = treffer[['codice_pos', 'ool_pos']].reset_index(drop=True)
+
+def diff_ool(previous: MatchState, ool_df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Vergleicht eine neue Open Order List mit dem Stand des letzten Laufs.
+    
+    Args:
+        previous: Stand des letzten Laufs
+        ool_df: Neue Open Order List
+        
+    Returns:
+        Ein Tuple aus:
+        - DataFrame je neuer Zeile mit 'status' und 'alte_pos' (Position im letzten Lauf, -1 wenn neu)
+        - Positionen der Zeilen des letzten Laufs, die nicht mehr vorhanden sind
+    """
+    neu = _row_identity(ool_df, previous.key_columns)
+    alt = previous.identity.assign(alte_pos=np.arange(len(previous.identity)))
+    
+    zuordnung = neu.merge(alt, on=['key', 'nr'], how='left', suffixes=('', '_alt'))
+    gefunden = zuordnung['alte_pos'].notna().to_numpy()
+    gleich = gefunden & (zuordnung['hash'].to_numpy() == zuordnung['hash_alt'].to_numpy())
+    
+    status = np.where(gleich, STATUS_UNVERAENDERT, np.where(gefunden, STATUS_GEAENDERT, STATUS_NEU))
+    zeilen = pd.DataFrame({
+        'status': status,
+        'alte_pos': zuordnung['alte_pos'].fillna(-1).astype('int64').to_numpy()
+    })
+    
+    entfernt = np.setdiff1d(np.arange(len(alt)), zeilen['alte_pos'].to_numpy())
+    return zeilen, entfernt
+
+def build_changes_sheet(previous: MatchState, ool_df: pd.DataFrame, zeilen: pd.DataFrame, entfernt: np.ndarray) -> pd.DataFrame:
+    """
+    Erstellt das Blatt "Änderungen seit letztem Lauf".
+    
+    Args:
+        previous: Stand des letzten Laufs
+        ool_df: Neue Open Order List
+        zeilen: Ergebnis von diff_ool je neuer Zeile
+        entfernt: Positionen entfernter Zeilen aus diff_ool
+        
+    Returns:
+        DataFrame mit der Spalte 'Änderung' und den Spalten der OOL
+    """
+    geaendert = (zeilen['status'] != STATUS_UNVERAENDERT).to_numpy()
+    neue_zeilen = ool_df.iloc[np.flatnonzero(geaendert)]
+    alte_zeilen = previous.ool_df.iloc[entfernt]
+    
+    changes = pd.concat([
+        neue_zeilen.assign(**{'Änderung': zeilen['status'].to_numpy()[geaendert]}),
+        alte_zeilen.assign(**{'Änderung': STATUS_ENTFERNT})
+    ], ignore_index=True)
+    return changes[['Änderung'] + [column for column in changes.columns if column != 'Änderung']]
+
+def process_incremental(top50_df: pd.DataFrame, translator_df: pd.DataFrame, ool_df: pd.DataFrame, inputs_key: str, previous: Optional[MatchState] = None, translator_index: Optional[TranslatorIndex] = None, metrics: Optional[PipelineMetrics] = None, multi_codice: str = 'last', fuzzy_distance: int = 0) -> Tuple[List[Any], pd.DataFrame, pd.DataFrame, Optional[pd.DataFrame], MatchState]:
+    """
+    Verarbeitet eine Open Order List inkrementell gegenüber dem letzten Lauf.
+    
+    Nur neue und geänderte Zeilen werden abgeglichen; für unveränderte Zeilen werden
+    die Treffer des letzten Laufs übernommen. Die Ergebnisse entsprechen einem
+    vollständigen Lauf mit process_all_data. Ohne passenden letzten Lauf (oder bei
+    geänderter Top-50-Liste bzw. Übersetzungsdatei oder fehlenden Schlüsselspalten
+    des letzten Laufs, z.B. nach einer Umbenennung) wird vollständig abgeglichen.
+    
+    Args:
+        top50_df: DataFrame der Top-50-Liste
+        translator_df: DataFrame der Übersetzungsdatei
+        ool_df: DataFrame der Open Order List
+        inputs_key: Kennung von Top-50-Liste und Übersetzungsdatei, z.B. aus den Inhalts-Hashes
+        previous: Stand des letzten Laufs
+        translator_index: Optional bereits aufgebauter Index der Übersetzungsdatei
+        metrics: Optionale Messung der Verarbeitungsschritte
+        multi_codice: Regel für OOL-Zeilen, die mehrere Codices finden (siehe data_processing.enrich_ool)
+        fuzzy_distance: Größter Editierabstand für den unscharfen Abgleich (0 = aus); er wird
+            für alle Zeilen ohne exakten Treffer neu berechnet
+        
+    Returns:
+        Ein Tuple aus:
+        - Liste von Zeilenindizes in der Open Order List, die hervorgehoben werden sollen
+        - Zusammenfassung als DataFrame (siehe data_processing.build_summary)
+        - Erweitertes OOL DataFrame mit zusätzlichen Spalten
+        - Änderungen seit dem letzten Lauf (None bei vollständigem Abgleich)
+        - Neuer Stand für den nächsten Lauf
+    """
+    if metrics is None:
+        metrics = PipelineMetrics()
+    
+    codices_data, varianten_listen = prepare_codices(top50_df, translator_df, translator_index, metrics)
+    
+    if previous is not None and previous.inputs_key != inputs_key:
+        previous = None
+    
+    # Ohne die Schlüsselspalten des letzten Laufs lassen sich die Zeilen nicht zuordnen
+    if previous is not None and not set(previous.key_columns) <= set(ool_df.columns):
+        previous = None
+    
+    with metrics.stage('abgleich') as stage:
+        lookup = build_artikel_lookup(varianten_listen)
+        
+        ool_keys = normalize_ool(ool_df)
+        if previous is None:
+            treffer = match_ool_keys(ool_keys, lookup)
+            changes = None
+            stage['rows'] = len(ool_df)
+        else:
+            zeilen, entfernt = diff_ool(previous, ool_df)
+            unveraendert = (zeilen['status'] == STATUS_UNVERAENDERT).to_numpy()
+            
+            # Treffer unveränderter Zeilen aus dem letzten Lauf auf die neuen Positionen übertragen
+            neue_pos_je_alter_pos = np.full(len(previous.ool_df), -1, dtype='int64')
+            neue_pos_je_alter_pos[zeilen['alte_pos'].to_numpy()[unveraendert]] = np.flatnonzero(unveraendert)
+            alte_treffer = previous.treffer.assign(ool_pos=neue_pos_je_alter_pos[previous.treffer['ool_pos'].to_numpy()])
+            alte_treffer = alte_treffer[alte_treffer['ool_pos'] >= 0]
+            alte_treffer = alte_treffer.assign(artikel_no=ool_keys['artikel_no'].to_numpy()[alte_treffer['ool_pos'].to_numpy()])
+            
+            # Nur neue und geänderte Zeilen abgleichen
+            zu_pruefen = np.flatnonzero(~unveraendert)
+            neue_treffer = match_ool_keys(ool_keys.iloc[zu_pruefen], lookup)
+            
+            treffer = pd.concat([alte_treffer, neue_treffer], ignore_index=True)
+            treffer = treffer.sort_values(['codice_pos', 'ool_pos'], kind='stable').reset_index(drop=True)
+            changes = build_changes_sheet(previous, ool_df, zeilen, entfernt)
+            stage['rows'] = len(zu_pruefen)
+        
+        fuzzy_treffer = None
+        markierung = treffer
+        if fuzzy_distance > 0:
+            fuzzy_treffer = match_ool_fuzzy(ool_keys, varianten_listen, treffer, fuzzy_distance)
+            markierung = combine_fuzzy_treffer(treffer, fuzzy_treffer)
+        
+        match_indices, ool_df_extended = enrich_ool(ool_df, codices_data, markierung, multi_codice)
+    
+    with metrics.stage('zusammenfassung') as stage:
+        summary_data = build_summary(codices_data, varianten_listen, treffer, ool_df.index, fuzzy_treffer)
+        stage['rows'] = len(summary_data)
+    
+    key_columns = previous.key_columns if previous is not None else default_key_columns(ool_df)
+    state = MatchState(inputs_key, ool_df, key_columns, treffer)
+    return match_indices, summary_data, ool_df_extended, changes, state
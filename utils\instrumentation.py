@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# Speichermessung mit tracemalloc einschalten (verlangsamt die Verarbeitung spürbar)
+TRACE_MEMORY = os.environ.get('EBERLE_TRACE_MEMORY', '').lower() in ('1', 'true', 'ja')
+
+# Verarbeitungsschritte mit Anzeigenamen
+STAGE_LABELS = {
+    'laden:top50': "Top-50 Liste geladen",
+    'laden:translator': "Übersetzungsdatei geladen",
+    'laden:ool': "Open Order List geladen",
+    'validierung': "Dateien validiert",
+    'index': "Übersetzungsindex aufgebaut",
+    'arbeitsformat': "Dateien ins Arbeitsformat übernommen",
+    'codices': "Codices extrahiert",
+    'uebersetzung': "Artikelnummern übersetzt",
+    'abgleich': "Open Order List abgeglichen",
+    'bloecke': "Open Order List blockweise abgeglichen und exportiert",
+    'zusammenfassung': "Zusammenfassung erstellt",
+    'export:ool': "Markierte Open Order List exportiert",
+    'export:zusammenfassung': "Zusammenfassungsdatei exportiert"
+}
+
+# Schritte, die bei jedem Verarbeitungslauf durchlaufen werden
+# (der Index wird aus dem Cache übernommen)
+PIPELINE_STAGES = [
+    'laden:top50', 'laden:translator', 'laden:ool', 'validierung',
+    'codices', 'uebersetzung', 'abgleich', 'zusammenfassung'
+]
+
+# Schritte eines Hintergrundauftrags (die Exportdateien entstehen erst beim Download)
+JOB_STAGES = PIPELINE_STAGES
+
+# Schritte eines Auftrags mit blockweiser Verarbeitung der Open Order List
+# (Laden, Abgleich und Export der OOL geschehen gemeinsam je Block)
+CHUNKED_JOB_STAGES = [
+    'laden:top50', 'laden:translator', 'validierung', 'codices', 'uebersetzung',
+    'bloecke', 'zusammenfassung'
+]
+
+def get_metrics_logger() -> logging.Logger:
+    """
+    Liefert den Logger für die strukturierten Laufzeit-Logzeilen (eine JSON-Zeile je Eintrag).
+    
+    Returns:
+        Logger 'eberle.metrics', der auf stderr schreibt
+    """
+    logger = logging.getLogger('eberle.metrics')
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+class PipelineMetrics:
+    """
+    Sammelt Dauer, Zeilenzahlen und optional den Spitzenspeicher je Verarbeitungsschritt.
+    
+    Nach jedem abgeschlossenen Schritt aus planned_stages wird on_progress mit dem
+    erreichten Anteil (0.0 bis 1.0) und dem Schrittnamen aufgerufen, sodass eine
+    Fortschrittsanzeige dem tatsächlichen Stand folgt.
+    
+    Die Speichermessung läuft nur innerhalb von stage(): tracemalloc wird dort gestartet
+    und auch bei Ausnahmen wieder gestoppt, sodass kein Lauf die Messung aktiv zurücklässt.
+    Schritte dürfen geschachtelt werden; die Spitze eines inneren Schritts zählt auch
+    für die äußeren.
+    """
+    
+    def __init__(self, planned_stages: Optional[List[str]] = None, on_progress: Optional[Callable[[float, str], None]] = None, trace_memory: bool = TRACE_MEMORY):
+        self.planned_stages = planned_stages or []
+        self.on_progress = on_progress
+        self.trace_memory = trace_memory
+        self.stages: List[Dict[str, Any]] = []
+        self._completed = set()
+        # Bisher höchster Speicherstand je offenem Schritt (innerster zuletzt)
+        self._open_peaks: List[int] = []
+        self._started = time.perf_counter()
+    
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Misst einen Verarbeitungsschritt.
+        
+        Args:
+            name: Name des Schritts (siehe STAGE_LABELS)
+            rows: Anzahl verarbeiteter Zeilen; kann auch nachträglich im gelieferten Dictionary gesetzt werden
+            
+        Yields:
+            Dictionary des Schritts, z.B. um 'rows' nach der Verarbeitung zu setzen
+        """
+        info = {'rows': rows}
+        started_tracing = False
+        if self.trace_memory:
+            # Eine bereits laufende Messung (z.B. eines äußeren Schritts) wird mitbenutzt
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            # reset_peak() verwirft auch die Spitze der äußeren Schritte: vorher sichern
+            self._note_peak(tracemalloc.get_traced_memory()[1])
+            self._open_peaks.append(0)
+            tracemalloc.reset_peak()
+            base_memory = tracemalloc.get_traced_memory()[0]
+        
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            seconds = time.perf_counter() - start
+            peak_mb = None
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], self._open_peaks.pop())
+                self._note_peak(peak)
+                peak_mb = (peak - base_memory) / (1024 * 1024)
+                if started_tracing:
+                    tracemalloc.stop()
+            self.record(name, seconds, info['rows'], peak_mb)
+    
+    def _note_peak(self, peak: int) -> None:
+        self._open_peaks = [max(open_peak, peak) for open_peak in self._open_peaks]
+    
+    def record(self, name: str, seconds: float, rows: Optional[int] = None, peak_mb: Optional[float] = None, **extra: Any) -> None:
+        """
+        Trägt einen bereits gemessenen Schritt ein, z.B. aus einem anderen Prozess.
+        
+        Args:
+            name: Name des Schritts
+            seconds: Dauer in Sekunden
+            rows: Anzahl verarbeiteter Zeilen
+            peak_mb: Spitzenspeicher in MB
+            **extra: Weitere Angaben, z.B. cache=True
+        """
+        entry = {'stage': name, 'seconds': round(seconds, 4), 'rows': rows, 'peak_mb': None if peak_mb is None else round(peak_mb, 2)}
+        entry.update(extra)
+        self.stages.append(entry)
+        
+        if name in self.planned_stages:
+            self._completed.add(name)
+            if self.on_progress is not None:
+                self.on_progress(len(self._completed) / len(self.planned_stages), name)
+    
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Liefert die Messwerte als Tabelle für die Anzeige.
+        
+        Returns:
+            DataFrame mit einer Zeile je Schritt
+        """
+        frame = pd.DataFrame(self.stages, columns=['stage', 'seconds', 'rows', 'peak_mb'])
+        frame.insert(1, 'Schritt', frame['stage'].map(STAGE_LABELS).fillna(frame['stage']))
+        return frame
+    
+    def finish(self, **extra: Any) -> Dict[str, Any]:
+        """
+        Schließt die Messung ab und schreibt eine JSON-Logzeile für das Monitoring.
+        
+        Args:
+            **extra: Zusätzliche Felder der Logzeile, z.B. Anzahl markierter Zeilen
+            
+        Returns:
+            Der geloggte Eintrag
+        """
+        entry = {
+            'event': 'pipeline_run',
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'total_seconds': round(time.perf_counter() - self._started, 4),
+            'stages': self.stages
+        }
+        entry.update(extra)
+        get_metrics_logger().info(json.dumps(entry, ensure_ascii=False, default=str))
+        return entry
@@ -0,0 +1,553 @@
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from utils.cache import CACHE_DIR, ParsedFileCache, ResultCache, private_directory
+from utils.chunked import process_ool_chunked, CHUNK_ROWS
+from utils.columnar import ColumnarFileCache
+from utils.data_processing import process_all_data, TranslatorIndex
+from utils.file_utils import load_and_validate, check_header, create_streaming_excel, create_downloadable_summary, HIGHLIGHT_RULES
+from utils.fuzzy import fuzzy_row_indices
+from utils.incremental import process_incremental, STATUS_NEU, STATUS_GEAENDERT, STATUS_ENTFERNT
+from utils.instrumentation import PipelineMetrics, JOB_STAGES, CHUNKED_JOB_STAGES
+
+# Verzeichnis der Aufträge, Anzahl paralleler Aufträge und Länge der Warteschlange (per Umgebungsvariable anpassbar)
+JOBS_DIR = os.environ.get('EBERLE_JOBS_DIR', os.path.join(CACHE_DIR, 'jobs'))
+JOB_WORKERS = int(os.environ.get('EBERLE_JOB_WORKERS', '2'))
+JOB_QUEUE_SIZE = int(os.environ.get('EBERLE_JOB_QUEUE', '4'))
+
+# Abgeschlossene Aufträge werden nach dieser Zeit gelöscht
+JOB_MAX_AGE_SECONDS = int(os.environ.get('EBERLE_JOB_MAX_AGE_H', '24')) * 3600
+
+# Auftrags-IDs sind uuid4-Hexwerte (siehe JobManager.submit)
+JOB_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+# Eine Sperrdatei der Statusdatei, die älter ist, stammt von einem abgestürzten Schreiber
+STATUS_LOCK_STALE_SECONDS = 10
+
+# Zustände eines Auftrags
+STATUS_WARTEND = 'wartend'
+STATUS_LAEUFT = 'laeuft'
+STATUS_FERTIG = 'fertig'
+STATUS_FEHLER = 'fehler'
+STATUS_ABGEBROCHEN = 'abgebrochen'
+
+FINISHED_STATUSES = (STATUS_FERTIG, STATUS_FEHLER, STATUS_ABGEBROCHEN)
+
+# Ergebnisdateien eines Auftrags
+OUTPUT_FILES = {
+    'ool': 'OOL_markiert.xlsx',
+    'zusammenfassung': 'Zusammenfassung.xlsx'
+}
+
+class JobCancelled(Exception):
+    """Der Auftrag wurde vom Benutzer abgebrochen."""
+
+class JobQueueFull(Exception):
+    """Die Warteschlange ist voll; der Auftrag wurde nicht angenommen."""
+
+def is_valid_job_id(job_id: Any) -> bool:
+    """
+    Prüft, ob eine Auftrags-ID das Format der von JobManager.submit vergebenen IDs hat.
+    
+    Args:
+        job_id: Zu prüfende ID, z.B. aus dem URL-Parameter 'job'
+        
+    Returns:
+        True, wenn die ID aus genau 32 Hexadezimalzeichen besteht
+    """
+    return isinstance(job_id, str) and JOB_ID_PATTERN.fullmatch(job_id) is not None
+
+def _job_dir(jobs_dir: str, job_id: str) -> str:
+    # Die ID stammt aus der URL: nur das Format von submit zulassen, damit sie nicht
+    # aus dem Auftragsverzeichnis herausführt (z.B. '../..' oder ein absoluter Pfad)
+    if not is_valid_job_id(job_id):
+        raise ValueError(f"Ungültige Auftrags-ID: {job_id!r}")
+    return os.path.join(jobs_dir, job_id)
+
+@contextmanager
+def _status_lock(job_dir: str) -> Iterator[None]:
+    """
+    Sperrt die Statusdatei eines Auftrags über alle Prozesse hinweg.
+    
+    Worker und Server ändern dieselbe Statusdatei; ohne Sperre könnte ein Schreiber
+    die Änderung des anderen zwischen Lesen und Ersetzen überschreiben. Die Sperre
+    ist eine exklusiv angelegte Datei und funktioniert daher auch unter Windows.
+    """
+    lock_path = os.path.join(job_dir, 'status.lock')
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > STATUS_LOCK_STALE_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                # Die Sperre wurde gerade freigegeben
+                continue
+            time.sleep(0.005)
+    
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+def _write_status(job_dir: str, **fields: Any) -> None:
+    """
+    Aktualisiert die Statusdatei eines Auftrags (atomar, damit Leser nie eine halbe Datei
+    sehen, und unter Sperre, damit keine Änderung eines anderen Prozesses verloren geht).
+    """
+    with _status_lock(job_dir):
+        status = read_status_file(job_dir) or {}
+        status.update(fields)
+        status['updated'] = time.time()
+        
+        fd, tmp_path = tempfile.mkstemp(dir=job_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(status, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(job_dir, 'status.json'))
+
+def read_status_file(job_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Liest die Statusdatei eines Auftrags.
+    
+    Args:
+        job_dir: Verzeichnis des Auftrags
+        
+    Returns:
+        Status als Dictionary oder None, wenn der Auftrag nicht existiert
+    """
+    try:
+        with open(os.path.join(job_dir, 'status.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _load_uploads(uploads: Dict[str, bytes], file_types: list) -> Dict[str, tuple]:
+    # Direkt im Worker einlesen: parallel laufen die Aufträge im Pool des JobManagers,
+    # ein eigener Prozesspool je Auftrag kostete mehr Startzeit, als er einsparte
+    return {file_type: load_and_validate(uploads[file_type], file_type) for file_type in file_types}
+
+def run_job(job_dir: str, uploads: Dict[str, bytes], options: Dict[str, Any]) -> None:
+    """
+    Führt einen Verarbeitungsauftrag in einem Worker-Prozess aus.
+    
+    Lädt und validiert die Dateien (bereits eingelesene Dateien aus dem Cache) und
+    gleicht die Open Order List ab. Die Exportdateien entstehen erst beim Download
+    (siehe JobManager.output). Fortschritt,
+    Ergebnis und Fehler werden im Auftragsverzeichnis abgelegt. Ein Abbruch wird
+    nach jedem abgeschlossenen Verarbeitungsschritt geprüft. Mit der Option
+    'chunked' wird die OOL blockweise verarbeitet (siehe chunked.process_ool_chunked);
+    das Ergebnis enthält dann statt der erweiterten OOL nur die Vorschauzeilen, und
+    die markierte OOL wird je Block direkt in ihre Exportdatei geschrieben.
+    Die Option 'highlight' wählt einen Regelsatz aus file_utils.HIGHLIGHT_RULES
+    für die Hervorhebung in der markierten OOL (None = Zeilenformate).
+    
+    Args:
+        job_dir: Verzeichnis des Auftrags
+        uploads: Dateiinhalte je Dateityp ('top50', 'translator', 'ool')
+        options: Einstellungen des Auftrags ('uploads_key', 'cache_key', 'hashes', 'incremental', 'state_scope', 'chunked', 'multi_codice', 'fuzzy_distance', 'highlight')
+    """
+    cancel_path = os.path.join(job_dir, 'cancel')
+    
+    def show_progress(fraction, stage):
+        if os.path.exists(cancel_path):
+            raise JobCancelled()
+        _write_status(job_dir, fraction=fraction, stage=stage, detail=None)
+    
+    def show_chunk_progress(rows):
+        if os.path.exists(cancel_path):
+            raise JobCancelled()
+        _write_status(job_dir, detail=f"Open Order List wird blockweise abgeglichen: {rows} Zeilen verarbeitet")
+    
+    chunked = options.get('chunked', False)
+    highlight_rules = HIGHLIGHT_RULES.get(options.get('highlight'))
+    
+    try:
+        if os.path.exists(cancel_path):
+            raise JobCancelled()
+        _write_status(job_dir, status=STATUS_LAEUFT, started=time.time())
+        
+        metrics = PipelineMetrics(CHUNKED_JOB_STAGES if chunked else JOB_STAGES, on_progress=show_progress)
+        messages = []
+        
+        # Bereits eingelesene Dateien speicherabgebildet aus dem Arbeitsformat öffnen statt neu zu parsen;
+        # bei blockweiser Verarbeitung wird die OOL erst beim Abgleich gelesen
+        parsed_cache = ParsedFileCache()
+        columnar_cache = ColumnarFileCache()
+        file_types = ('top50', 'translator') if chunked else ('top50', 'translator', 'ool')
+        keys = {file_type: f"{file_type}-{options['hashes'][file_type]}" for file_type in file_types}
+        top50_key = keys['top50']
+        translator_key = keys['translator']
+        loaded = {}
+        
+        for file_type in file_types:
+            start = time.perf_counter()
+            df = columnar_cache.get(keys[file_type])
+            if df is not None:
+                loaded[file_type] = (df, True)
+                metrics.record(f"laden:{file_type}", time.perf_counter() - start, len(df), cache=True)
+        cached = [file_type for file_type in file_types if file_type in loaded]
+        
+        validation_seconds = 0.0
+        pending = [file_type for file_type in file_types if file_type not in loaded]
+        for file_type, (df, valid, timings) in _load_uploads(uploads, pending).items():
+            loaded[file_type] = (df, valid)
+            validation_seconds += timings['validierung']
+            metrics.record(f"laden:{file_type}", timings['laden'], len(df))
+        
+        if chunked:
+            ool_message = check_header(uploads['ool'], 'ool')
+            loaded['ool'] = (None, ool_message is None)
+        else:
+            ool_message = "Die Open Order List hat nicht das erwartete Format."
+        metrics.record('validierung', validation_seconds)
+        
+        for file_type, message in [
+            ('top50', "Die Top-50-Datei hat nicht das erwartete Format."),
+            ('translator', "Die Übersetzungsdatei hat nicht das erwartete Format."),
+            ('ool', ool_message)
+        ]:
+            if not loaded[file_type][1]:
+                _write_status(job_dir, status=STATUS_FEHLER, message=message, finished=time.time())
+                return
+        
+        # Gültige Dateien einmal ins Arbeitsformat übernehmen; die weiteren Schritte
+        # arbeiten auf der speicherabgebildeten Kopie
+        if pending:
+            with metrics.stage('arbeitsformat', sum(len(loaded[file_type][0]) for file_type in pending)):
+                for file_type in pending:
+                    loaded[file_type] = (columnar_cache.put(keys[file_type], loaded[file_type][0], file_type), True)
+        
+        top50_df = loaded['top50'][0]
+        translator_df = loaded['translator'][0]
+        ool_df = loaded['ool'][0]
+        
+        # Den Übersetzungsindex je Übersetzungsdatei nur einmal aufbauen
+        index_key = f"index-{options['hashes']['translator']}"
+        translator_index = parsed_cache.get(index_key)
+        if translator_index is None:
+            with metrics.stage('index', len(translator_df)):
+                translator_index = TranslatorIndex.from_dataframe(translator_df)
+            parsed_cache.put(index_key, translator_index)
+        
+        labels = {'top50': "Top-50 Liste", 'translator': "Übersetzungsdatei", 'ool': "Open Order List"}
+        if cached:
+            messages.append(f"Aus dem Cache geladen: {', '.join(labels[file_type] for file_type in cached)}")
+        
+        # Datenverarbeitung
+        changes = None
+        ool_df_extended = None
+        ool_preview = None
+        if chunked:
+            # Die markierte OOL wird je Block direkt in die Exportdatei geschrieben
+            match_indices, summary_data, fuzzy_indices, ool_preview, ool_rows = process_ool_chunked(
+                top50_df, translator_df, uploads['ool'], os.path.join(job_dir, OUTPUT_FILES['ool']),
+                translator_index, metrics, options['multi_codice'], options['fuzzy_distance'],
+                on_chunk=show_chunk_progress, highlight_rules=highlight_rules
+            )
+            messages.append(f"Die Open Order List wurde blockweise verarbeitet ({ool_rows} Zeilen in Blöcken zu {CHUNK_ROWS} Zeilen).")
+        elif options['incremental']:
+            # Stand des letzten Laufs derselben Sitzung und OOL-Quelle ('state_scope') mit derselben
+            # Top-50-Liste, Übersetzungsdatei und denselben Einstellungen
+            inputs_key = f"{top50_key}-{translator_key}"
+            state_key = "state-" + ResultCache.make_key(
+                options.get('state_scope'), inputs_key, options['multi_codice'], options['fuzzy_distance']
+            )
+            previous_state = parsed_cache.get(state_key)
+            
+            match_indices, summary_data, ool_df_extended, changes, state = process_incremental(
+                top50_df, translator_df, ool_df, inputs_key, previous_state, translator_index, metrics,
+                options['multi_codice'], options['fuzzy_distance']
+            )
+            parsed_cache.put(state_key, state)
+            
+            if changes is None and previous_state is not None:
+                messages.append("Die Schlüsselspalten des letzten Laufs fehlen in der Open Order List: sie wurde vollständig neu abgeglichen.")
+            elif changes is None:
+                messages.append("Kein früherer Lauf gefunden: die Open Order List wurde vollständig abgeglichen.")
+            else:
+                counts = changes['Änderung'].value_counts()
+                messages.append(
+                    f"Änderungen seit dem letzten Lauf: {counts.get(STATUS_NEU, 0)} neu, "
+                    f"{counts.get(STATUS_GEAENDERT, 0)} geändert, {counts.get(STATUS_ENTFERNT, 0)} entfernt"
+                )
+        else:
+            match_indices, summary_data, ool_df_extended = process_all_data(
+                top50_df, translator_df, ool_df, translator_index, metrics,
+                options['multi_codice'], options['fuzzy_distance']
+            )
+        
+        if not chunked:
+            # Unscharfe Treffer erhalten in der markierten OOL eine eigene Farbe
+            fuzzy_indices = fuzzy_row_indices(ool_df_extended)
+        
+        metrics.finish(job=os.path.basename(job_dir), markierte_zeilen=len(match_indices), zusammenfassung_zeilen=len(summary_data))
+        
+        result = {
+            'key': options.get('uploads_key'),
+            'cache_key': options.get('cache_key'),
+            'match_indices': match_indices,
+            'summary_data': summary_data,
+            'ool_df_extended': ool_df_extended,
+            'ool_preview': ool_preview,
+            'changes': changes,
+            'fuzzy_indices': fuzzy_indices,
+            'highlight': options.get('highlight'),
+            'messages': messages,
+            'metrics': metrics.to_frame(),
+            'trace_memory': metrics.trace_memory
+        }
+        with open(os.path.join(job_dir, 'result.pkl'), 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        _write_status(job_dir, status=STATUS_FERTIG, fraction=1.0, finished=time.time())
+    
+    except JobCancelled:
+        _write_status(job_dir, status=STATUS_ABGEBROCHEN, finished=time.time())
+    except Exception as e:
+        _write_status(job_dir, status=STATUS_FEHLER, message=f"Bei der Verarbeitung ist ein Fehler aufgetreten: {str(e)}", finished=time.time())
+
+def _create_output(job_id: str, result: Dict[str, Any], name: str) -> bytes:
+    """
+    Erstellt eine Exportdatei aus dem Ergebnis eines Auftrags und schreibt eine JSON-Logzeile dazu.
+    
+    Args:
+        job_id: ID des Auftrags (für die Logzeile)
+        result: Ergebnis-Dictionary (siehe run_job)
+        name: 'ool' oder 'zusammenfassung'
+        
+    Returns:
+        Inhalt der Excel-Datei als Bytes
+    """
+    metrics = PipelineMetrics()
+    if name == 'ool':
+        changes = result['changes']
+        with metrics.stage('export:ool', len(result['ool_df_extended'])):
+            data = create_streaming_excel(
+                result['ool_df_extended'], result['match_indices'],
+                extra_sheets={"Änderungen seit letztem Lauf": changes} if changes is not None else None,
+                fuzzy_indices=result['fuzzy_indices'], highlight_rules=HIGHLIGHT_RULES.get(result.get('highlight'))
+            )
+    else:
+        with metrics.stage('export:zusammenfassung', len(result['summary_data'])):
+            data = create_downloadable_summary(result['summary_data'])
+    metrics.finish(event='export', job=job_id)
+    return data
+
+def estimate_result_bytes(result: Dict[str, Any]) -> int:
+    """
+    Schätzt den Speicherbedarf eines Ergebnisses, z.B. für den Ergebnis-Cache.
+    
+    Args:
+        result: Ergebnis-Dictionary (siehe run_job)
+        
+    Returns:
+        Geschätzte Größe in Bytes
+    """
+    size = 0
+    for name in ('ool_df_extended', 'ool_preview', 'summary_data', 'changes'):
+        if result.get(name) is not None:
+            size += int(result[name].memory_usage(deep=True).sum())
+    return size + 8 * len(result['match_indices'])
+
+class JobManager:
+    """
+    Führt Verarbeitungsaufträge in einem Pool von Worker-Prozessen aus.
+    
+    Die Streamlit-Sitzung übergibt nur die Dateien und fragt danach den Status ab,
+    sodass lange Läufe weder die Sitzung noch den GIL des Servers blockieren.
+    Status, Ergebnis und Exportdateien liegen im Auftragsverzeichnis und sind über
+    die Auftrags-ID auch nach einem Neuladen der Seite abrufbar. Die Anzahl laufender
+    und wartender Aufträge ist begrenzt.
+    """
+    
+    def __init__(self, max_workers: int = JOB_WORKERS, max_queued: int = JOB_QUEUE_SIZE, jobs_dir: str = JOBS_DIR):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.jobs_dir = jobs_dir
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        private_directory(self.jobs_dir)
+    
+    def _active_jobs(self) -> int:
+        return sum(1 for future in self._futures.values() if not future.done())
+    
+    def submit(self, uploads: Dict[str, bytes], options: Dict[str, Any]) -> str:
+        """
+        Nimmt einen Verarbeitungsauftrag an.
+        
+        Args:
+            uploads: Dateiinhalte je Dateityp ('top50', 'translator', 'ool')
+            options: Einstellungen des Auftrags (siehe run_job)
+            
+        Returns:
+            ID des Auftrags
+            
+        Raises:
+            JobQueueFull: Wenn bereits max_workers + max_queued Aufträge laufen oder warten
+        """
+        with self._lock:
+            self._cleanup()
+            if self._active_jobs() >= self.max_workers + self.max_queued:
+                raise JobQueueFull()
+            
+            job_id = uuid.uuid4().hex
+            job_dir = _job_dir(self.jobs_dir, job_id)
+            os.makedirs(job_dir)
+            _write_status(job_dir, status=STATUS_WARTEND, fraction=0.0, stage=None, key=options.get('uploads_key'), created=time.time())
+            
+            try:
+                future = self._executor.submit(run_job, job_dir, uploads, options)
+            except BrokenProcessPool:
+                # Ein abgestürzter Worker macht den Pool unbrauchbar: neu aufbauen
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                future = self._executor.submit(run_job, job_dir, uploads, options)
+            
+            self._futures[job_id] = future
+            return job_id
+    
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Liefert den Status eines Auftrags.
+        
+        Args:
+            job_id: ID des Auftrags
+            
+        Returns:
+            Dictionary mit 'status', 'fraction', 'stage' und ggf. 'message',
+            oder None, wenn der Auftrag nicht existiert
+            
+        Raises:
+            ValueError: Wenn die Auftrags-ID ungültig ist
+        """
+        job_dir = _job_dir(self.jobs_dir, job_id)
+        with self._lock:
+            status = read_status_file(job_dir)
+            future = self._futures.get(job_id)
+        
+        if status is None or status['status'] in FINISHED_STATUSES:
+            return status
+        
+        if future is None:
+            # Der Auftrag gehört zu einem früheren Serverprozess und läuft nicht mehr
+            _write_status(job_dir, status=STATUS_FEHLER, message="Die Verarbeitung wurde unterbrochen (Server neu gestartet).", finished=time.time())
+            return read_status_file(job_dir)
+        
+        if future.done() and future.exception() is not None:
+            _write_status(job_dir, status=STATUS_FEHLER, message=f"Bei der Verarbeitung ist ein Fehler aufgetreten: {future.exception()}", finished=time.time())
+            return read_status_file(job_dir)
+        
+        return status
+    
+    def cancel(self, job_id: str) -> None:
+        """
+        Bricht einen Auftrag ab. Wartende Aufträge starten nicht mehr, laufende
+        enden nach dem aktuellen Verarbeitungsschritt.
+        
+        Args:
+            job_id: ID des Auftrags
+            
+        Raises:
+            ValueError: Wenn die Auftrags-ID ungültig ist
+        """
+        job_dir = _job_dir(self.jobs_dir, job_id)
+        if not os.path.isdir(job_dir):
+            return
+        
+        open(os.path.join(job_dir, 'cancel'), 'w').close()
+        
+        # Noch nicht gestartete Aufträge sofort als abgebrochen melden; der Worker
+        # prüft die Markierung vor dem Start ebenfalls
+        future = self._futures.get(job_id)
+        status = read_status_file(job_dir)
+        if (future is not None and future.cancel()) or (status is not None and status['status'] == STATUS_WARTEND):
+            _write_status(job_dir, status=STATUS_ABGEBROCHEN, finished=time.time())
+    
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Liest das Ergebnis eines abgeschlossenen Auftrags.
+        
+        Args:
+            job_id: ID des Auftrags
+            
+        Returns:
+            Ergebnis-Dictionary (siehe run_job) oder None, wenn kein Ergebnis vorliegt
+            
+        Raises:
+            ValueError: Wenn die Auftrags-ID ungültig ist
+        """
+        result_path = os.path.join(_job_dir(self.jobs_dir, job_id), 'result.pkl')
+        try:
+            with open(result_path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+    
+    def output(self, job_id: str, name: str, result: Optional[Dict[str, Any]] = None) -> bytes:
+        """
+        Liefert eine Exportdatei eines abgeschlossenen Auftrags.
+        
+        Die Datei wird erst beim ersten Abruf (dem Klick auf den Download) aus dem
+        Ergebnis erstellt und danach im Auftragsverzeichnis wiederverwendet.
+        
+        Args:
+            job_id: ID des Auftrags
+            name: 'ool' oder 'zusammenfassung'
+            result: Bereits gelesenes Ergebnis des Auftrags (sonst aus dem Auftragsverzeichnis)
+            
+        Returns:
+            Inhalt der Excel-Datei als Bytes
+            
+        Raises:
+            ValueError: Wenn die Auftrags-ID ungültig ist
+            FileNotFoundError: Wenn kein Ergebnis des Auftrags mehr vorliegt
+        """
+        job_dir = _job_dir(self.jobs_dir, job_id)
+        path = os.path.join(job_dir, OUTPUT_FILES[name])
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        
+        if result is None:
+            result = self.result(job_id)
+            if result is None:
+                raise FileNotFoundError(f"Das Ergebnis des Auftrags {job_id} ist nicht mehr vorhanden.")
+        data = _create_output(job_id, result, name)
+        
+        # Atomar ersetzen: ein gleichzeitiger zweiter Download liest nie eine halbe Datei
+        fd, tmp_path = tempfile.mkstemp(dir=job_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return data
+    
+    def _cleanup(self) -> None:
+        # Abgeschlossene Aufträge nach JOB_MAX_AGE_SECONDS löschen
+        now = time.time()
+        for job_id in os.listdir(self.jobs_dir):
+            if not is_valid_job_id(job_id):
+                continue
+            job_dir = _job_dir(self.jobs_dir, job_id)
+            status = read_status_file(job_dir)
+            if status is None or status['status'] not in FINISHED_STATUSES:
+                continue
+            if now - status.get('finished', now) > JOB_MAX_AGE_SECONDS:
+                shutil.rmtree(job_dir, ignore_errors=True)
+                self._futures.pop(job_id, None)
@@ -0,0 +1,196 @@
+"""
+Kommandozeilen-Einstieg für das Artikel-Matching ohne Streamlit-Oberfläche.
+
+Beispiel:
+    python -m utils.match --top50 top50.xlsx --translator JNEB-EBITA-ARTIKEL.xlsx --ool a.xlsx b.xlsx --out ergebnisse/
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from utils.file_utils import (
+    check_header,
+    create_streaming_excel,
+    create_downloadable_summary,
+    HIGHLIGHT_RULES
+)
+from utils.columnar import load_columnar
+from utils.data_processing import process_all_data, TranslatorIndex, MULTI_CODICE_POLICIES
+from utils.chunked import process_ool_chunked
+from utils.fuzzy import fuzzy_row_indices
+
+# Top-50-Liste und Übersetzungsindex je Worker-Prozess (einmalig per Initializer gesetzt)
+_worker_top50_df = None
+_worker_translator_index = None
+
+def _init_worker(top50_df, translator_index) -> None:
+    global _worker_top50_df, _worker_translator_index
+    _worker_top50_df = top50_df
+    _worker_translator_index = translator_index
+
+def output_stems(paths: List[str]) -> List[str]:
+    """
+    Bestimmt eindeutige Namensstämme für die Ausgabedateien der Open Order Lists.
+    
+    Gleichnamige Dateien aus verschiedenen Verzeichnissen erhalten den Namen ihres
+    Verzeichnisses als Präfix, verbleibende Doppelungen eine laufende Nummer.
+    Verglichen wird ohne Groß-/Kleinschreibung, da Windows-Dateisysteme diese ignorieren.
+    
+    Args:
+        paths: Pfade der Open Order Lists in der Reihenfolge der Kommandozeile
+        
+    Returns:
+        Liste der Namensstämme in derselben Reihenfolge
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    counts = Counter(stem.lower() for stem in stems)
+    
+    for i, path in enumerate(paths):
+        if counts[stems[i].lower()] > 1:
+            parent = os.path.basename(os.path.dirname(os.path.abspath(path)))
+            stems[i] = f"{parent}_{stems[i]}" if parent else stems[i]
+    
+    counts = Counter(stem.lower() for stem in stems)
+    seen = Counter()
+    for i, stem in enumerate(stems):
+        if counts[stem.lower()] > 1:
+            seen[stem.lower()] += 1
+            stems[i] = f"{stem}_{seen[stem.lower()]}"
+    
+    return stems
+
+def process_ool_file(ool_path: str, out_dir: str, multi_codice: str = 'last', fuzzy_distance: int = 0, chunk_rows: int = 0, highlight: Optional[str] = None, stem: Optional[str] = None) -> Tuple[str, bool, str, float]:
+    """
+    Verarbeitet eine Open Order List und schreibt die markierte OOL und die Zusammenfassung.
+    
+    Args:
+        ool_path: Pfad zur Open Order List
+        out_dir: Ausgabeverzeichnis
+        multi_codice: Regel für OOL-Zeilen, die mehrere Codices finden (siehe data_processing.enrich_ool)
+        fuzzy_distance: Größter Editierabstand für den unscharfen Abgleich (0 = aus)
+        chunk_rows: OOL blockweise mit dieser Anzahl Zeilen je Block verarbeiten (0 = vollständig laden)
+        highlight: Regelsatz für die bedingte Formatierung (siehe file_utils.HIGHLIGHT_RULES, None = Zeilenformate)
+        stem: Namensstamm der Ausgabedateien (Standard: Dateiname der OOL, siehe output_stems)
+        
+    Returns:
+        Ein Tuple aus Pfad, Erfolg, Meldung und Laufzeit in Sekunden
+    """
+    start = time.perf_counter()
+    
+    # Falsche Dateien anhand der Kopfzeile erkennen, bevor sie vollständig geladen werden
+    message = check_header(ool_path, 'ool')
+    if message:
+        return ool_path, False, message, time.perf_counter() - start
+    
+    if stem is None:
+        stem = os.path.splitext(os.path.basename(ool_path))[0]
+    highlight_rules = HIGHLIGHT_RULES.get(highlight)
+    
+    if chunk_rows > 0:
+        # Die markierte OOL wird je Block direkt in die Ausgabedatei geschrieben
+        match_indices, summary_data, _, _, _ = process_ool_chunked(
+            _worker_top50_df, None, ool_path, os.path.join(out_dir, f"{stem}_markiert.xlsx"), _worker_translator_index,
+            multi_codice=multi_codice, fuzzy_distance=fuzzy_distance, chunk_rows=chunk_rows, highlight_rules=highlight_rules
+        )
+        with open(os.path.join(out_dir, f"{stem}_Zusammenfassung.xlsx"), 'wb') as f:
+            f.write(create_downloadable_summary(summary_data))
+        return ool_path, True, f"{len(match_indices)} markierte Zeilen", time.perf_counter() - start
+    
+    # Wiederholte Läufe mit derselben Datei lesen das Arbeitsformat statt der Excel-Datei
+    ool_df, ool_valid, _ = load_columnar(ool_path, 'ool')
+    if not ool_valid:
+        return ool_path, False, "Die Open Order List hat nicht das erwartete Format.", time.perf_counter() - start
+    
+    match_indices, summary_data, ool_df_extended = process_all_data(
+        _worker_top50_df, None, ool_df, _worker_translator_index, multi_codice=multi_codice, fuzzy_distance=fuzzy_distance
+    )
+    
+    create_streaming_excel(
+        ool_df_extended, match_indices, os.path.join(out_dir, f"{stem}_markiert.xlsx"),
+        fuzzy_indices=fuzzy_row_indices(ool_df_extended), highlight_rules=highlight_rules
+    )
+    with open(os.path.join(out_dir, f"{stem}_Zusammenfassung.xlsx"), 'wb') as f:
+        f.write(create_downloadable_summary(summary_data))
+    
+    return ool_path, True, f"{len(match_indices)} markierte Zeilen", time.perf_counter() - start
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Führt das Matching für mehrere Open Order Lists aus.
+    
+    Args:
+        argv: Kommandozeilenargumente (Standard: sys.argv)
+        
+    Returns:
+        Exit-Code: 0 bei Erfolg, 1 wenn mindestens eine OOL fehlschlug, 2 bei ungültiger Top-50- oder Übersetzungsdatei
+    """
+    parser = argparse.ArgumentParser(prog="python -m utils.match", description="Artikelnummern-Matching für Open Order Lists")
+    parser.add_argument("--top50", required=True, help="Top-50 Excel-Datei (Eberle Italia)")
+    parser.add_argument("--translator", required=True, help="Übersetzungsdatei (JNEB-EBITA-ARTIKEL)")
+    parser.add_argument("--ool", required=True, nargs="+", help="Eine oder mehrere Open Order Lists")
+    parser.add_argument("--out", required=True, help="Ausgabeverzeichnis")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl paralleler Prozesse (Standard: Anzahl CPUs)")
+    parser.add_argument("--multi-codice", choices=MULTI_CODICE_POLICIES, default='last', help="Angaben für OOL-Zeilen, die mehrere Codices finden: erster, letzter oder alle Codices (Standard: last)")
+    parser.add_argument("--fuzzy", type=int, default=0, metavar="K", help="Unscharfer Abgleich für OOL-Zeilen ohne exakten Treffer mit bis zu K Tippfehlern (Standard: 0 = aus)")
+    parser.add_argument("--chunk-rows", type=int, default=0, metavar="N", help="Open Order Lists speicherschonend in Blöcken zu N Zeilen verarbeiten (Standard: 0 = vollständig laden)")
+    parser.add_argument("--highlight", choices=list(HIGHLIGHT_RULES), default=None, help="Hervorhebung per bedingter Formatierung: treffer (gefundene Zeilen) oder reichweite (Lagerbestand gegen Monatlichen Verbrauch); Standard: Zeilenformate")
+    args = parser.parse_args(argv)
+    
+    start = time.perf_counter()
+    
+    # Kopfzeilen prüfen, bevor eine Datei vollständig geladen wird
+    for path, file_type in [(args.top50, 'top50'), (args.translator, 'translator')]:
+        message = check_header(path, file_type)
+        if message:
+            print(f"Fehler: {path}: {message}", file=sys.stderr)
+            return 2
+    
+    # Top-50-Liste und Übersetzungsdatei nur einmal laden (bei Wiederholung aus dem Arbeitsformat)
+    top50_df, top50_valid, _ = load_columnar(args.top50, 'top50')
+    if not top50_valid:
+        print(f"Fehler: {args.top50}: Die Top-50-Datei hat nicht das erwartete Format.", file=sys.stderr)
+        return 2
+    
+    translator_df, translator_valid, _ = load_columnar(args.translator, 'translator')
+    if not translator_valid:
+        print(f"Fehler: {args.translator}: Die Übersetzungsdatei hat nicht das erwartete Format.", file=sys.stderr)
+        return 2
+    
+    translator_index = TranslatorIndex.from_dataframe(translator_df)
+    print(f"Top-50 und Übersetzungsdatei geladen ({time.perf_counter() - start:.2f} s)")
+    
+    os.makedirs(args.out, exist_ok=True)
+    
+    # Gleichnamige OOLs aus verschiedenen Verzeichnissen dürfen ihre Ergebnisse nicht überschreiben
+    stems = output_stems(args.ool)
+    for path, stem in zip(args.ool, stems):
+        if stem != os.path.splitext(os.path.basename(path))[0]:
+            print(f"Hinweis: {path}: Ergebnisse werden als {stem}_markiert.xlsx und {stem}_Zusammenfassung.xlsx gespeichert")
+    
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(top50_df, translator_index)) as executor:
+        futures = {
+            executor.submit(process_ool_file, path, args.out, args.multi_codice, args.fuzzy, args.chunk_rows, args.highlight, stem): path
+            for path, stem in zip(args.ool, stems)
+        }
+        for future in as_completed(futures):
+            try:
+                path, ok, message, duration = future.result()
+            except Exception as e:
+                path, ok, message, duration = futures[future], False, f"Bei der Verarbeitung ist ein Fehler aufgetreten: {e}", 0.0
+            
+            if ok:
+                print(f"{path}: {message} ({duration:.2f} s)")
+            else:
+                failed += 1
+                print(f"Fehler: {path}: {message}", file=sys.stderr)
+    
+    print(f"{len(args.ool) - failed} von {len(args.ool)} Dateien verarbeitet ({time.perf_counter() - start:.2f} s)")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+# Spalte der Open Order List mit der Artikelnummer
+OOL_ARTIKEL_SPALTE = 'artikel no'
+
+# Spalten der Übersetzungsdatei (Positionen)
+TRANSLATOR_CODICE_SPALTE = 3   # Spalte D: Basis-Codice
+TRANSLATOR_ARTIKEL_SPALTE = 16  # Spalte Q: Artikelnummer
+
+# Spaltennamen, wenn die Übersetzungsdatei nur mit den Spalten D und Q geladen wurde
+TRANSLATOR_CODICE_NAME = 'Codice (Spalte D)'
+TRANSLATOR_ARTIKEL_NAME = 'Artikelnummer (Spalte Q)'
+
+# Spalten der normalisierten Artikelnummern
+VARIANTEN_SPALTEN = ['artikel_no', 'artikel_numerisch', 'artikel_mit_7']
+
+def artikel_als_text(werte: pd.Series) -> pd.Series:
+    """
+    Wandelt Artikelnummern in ihre Textform um, genau wie str() es für jeden Wert tun würde.
+    
+    Args:
+        werte: Spalte mit Artikelnummern beliebigen Typs
+        
+    Returns:
+        Spalte mit Artikelnummern als Text (fehlende Werte werden zu 'nan' bzw. 'None')
+    """
+    return werte.map(str).astype(object)
+
+def ohne_fuehrende_7(texte: pd.Series) -> pd.Series:
+    """
+    Entfernt eine führende '7' aus den Artikelnummern.
+    
+    Args:
+        texte: Artikelnummern als Text
+        
+    Returns:
+        Artikelnummern ohne führende '7' (unverändert, wenn keine '7' vorne steht)
+    """
+    return texte.where(~texte.str.startswith('7'), texte.str[1:])
+
+def numerische_form(texte: pd.Series) -> pd.Series:
+    """
+    Bringt numerische Artikelnummern in die Integer-Schreibweise (z.B. '12345.0' -> '12345', '0012' -> '12').
+    
+    Entspricht str(int(float(text))); Nachkommastellen werden abgeschnitten. Nicht
+    numerische oder nicht endliche Werte ergeben None.
+    
+    Args:
+        texte: Artikelnummern als Text
+        
+    Returns:
+        Integer-Schreibweise der Artikelnummern oder None
+    """
+    zahlen = pd.to_numeric(texte, errors='coerce').astype('float64')
+    ganzzahlig = np.isfinite(zahlen) & (zahlen.abs() < 2 ** 63)
+    
+    # Über ein NumPy-Array, damit nicht zutreffende Werte None bleiben und nicht zu NaN werden
+    ergebnis = np.full(len(texte), None, dtype=object)
+    maske = ganzzahlig.to_numpy()
+    ergebnis[maske] = np.trunc(zahlen[ganzzahlig]).astype('int64').astype(str).to_numpy(dtype=object)
+    return pd.Series(ergebnis, index=texte.index, dtype=object)
+
+def mit_fuehrender_7(texte: pd.Series) -> pd.Series:
+    """
+    Ergänzt eine führende '7' bei rein numerischen Artikelnummern, die noch keine haben.
+    
+    Args:
+        texte: Artikelnummern als Text
+        
+    Returns:
+        Artikelnummern mit führender '7' oder None, wenn die Regel nicht greift
+    """
+    zutreffend = texte.str.isdigit().astype(bool) & ~texte.str.startswith('7').astype(bool)
+    return ('7' + texte).astype(object).where(zutreffend, None)
+
+def normalize_ool(ool_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Berechnet einmalig die Abgleichsschlüssel der Open Order List.
+    
+    Args:
+        ool_df: DataFrame der Open Order List
+        
+    Returns:
+        DataFrame mit den Spalten 'ool_pos' (Zeilenposition), 'artikel_no' (als Text)
+        und 'artikel_ohne_7' (ohne führende '7')
+    """
+    artikel = artikel_als_text(ool_df[OOL_ARTIKEL_SPALTE])
+    
+    return pd.DataFrame({
+        'ool_pos': np.arange(len(ool_df)),
+        'artikel_no': artikel.to_numpy(),
+        'artikel_ohne_7': ohne_fuehrende_7(artikel).to_numpy()
+    })
+
+def normalize_artikel(artikel: pd.Series) -> pd.DataFrame:
+    """
+    Berechnet einmalig alle Formatvarianten übersetzter Artikelnummern.
+    
+    Args:
+        artikel: Artikelnummern, z.B. Spalte Q der Übersetzungsdatei (ohne fehlende Werte)
+        
+    Returns:
+        DataFrame mit den Spalten 'artikel_no' (Original als Text), 'artikel_numerisch'
+        (Integer-Schreibweise) und 'artikel_mit_7' (mit führender '7'); nicht zutreffende
+        Varianten sind None
+    """
+    texte = artikel_als_text(artikel)
+    
+    return pd.DataFrame({
+        'artikel_no': texte,
+        'artikel_numerisch': numerische_form(texte),
+        'artikel_mit_7': mit_fuehrender_7(texte)
+    }, index=artikel.index)
+
+def translator_spalten(translator_df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+    """
+    Liefert die Spalten D (Basis-Codice) und Q (Artikelnummer) der Übersetzungsdatei.
+    
+    Args:
+        translator_df: DataFrame der Übersetzungsdatei, vollständig oder nur mit den Spalten D und Q geladen
+        
+    Returns:
+        Ein Tuple aus Codice-Spalte und Artikelnummer-Spalte
+    """
+    if TRANSLATOR_CODICE_NAME in translator_df.columns and TRANSLATOR_ARTIKEL_NAME in translator_df.columns:
+        return translator_df[TRANSLATOR_CODICE_NAME], translator_df[TRANSLATOR_ARTIKEL_NAME]
+    
+    return translator_df.iloc[:, TRANSLATOR_CODICE_SPALTE], translator_df.iloc[:, TRANSLATOR_ARTIKEL_SPALTE]
+
+def normalize_translator(translator_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalisiert die Übersetzungsdatei (Spalte D -> Spalte Q) für den Abgleich.
+    
+    Args:
+        translator_df: DataFrame der Übersetzungsdatei
+        
+    Returns:
+        DataFrame mit der Spalte 'codice' und den Spalten aus normalize_artikel;
+        Zeilen ohne Artikelnummer werden verworfen
+    """
+    codices, artikel = translator_spalten(translator_df)
+    
+    # Nur Zeilen mit Artikelnummer berücksichtigen
+    gueltig = artikel.notna()
+    
+    normalisiert = normalize_artikel(artikel[gueltig])
+    normalisiert.insert(0, 'codice', codices[gueltig].astype(object))
+    return normalisiert.reset_index(drop=True)